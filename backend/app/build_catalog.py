@@ -0,0 +1,284 @@
+"""
+Build the place catalog (merged.db) from the SQLite shards in backend/app.
+
+Usage (from backend/):
+    python -m app.build_catalog [--output app/merged.db] [shard.db ...]
+
+Without explicit shards, every merged*.db and test*.db next to this file is
+used; a cleaned/updated variant (test2_cleaned.db) replaces its raw shard
+(test2.db). Shards are read in order and the first row seen for a place_id
+wins. Rows are streamed in batches, so memory stays bounded by the batch
+size regardless of catalog size.
+
+The catalog is written to a temporary file and moved over the output only
+once it is complete, so a running server never opens a half-built catalog.
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+
+from sqlalchemy import create_engine
+
+from .place_models import PlaceBase
+from .services.opening_hours_service import ensure_place_hours
+from .services.place_index_service import ensure_place_indexes, haversine_m
+from .services.place_search_service import ensure_search_index
+from .services.place_projection_service import PLACE_COLUMNS
+from .services.price_service import price_columns
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(APP_DIR, "merged.db")
+BATCH_SIZE = 1000
+
+# city_name values used by the planner, with their centers for shards that
+# predate the city_name column
+CITY_CENTERS = {
+    "HCMC, Vietnam": (10.7769, 106.7009),
+    "Dalat, Vietnam": (11.9404, 108.4583),
+    "Hue, Vietnam": (16.4637, 107.5909),
+}
+CITY_RADIUS_M = 60000
+
+
+def default_shards(directory: str = APP_DIR) -> list:
+    """merged*.db first, then test*.db with cleaned/updated variants preferred."""
+    merged = sorted(
+        p
+        for p in glob.glob(os.path.join(directory, "merged*.db"))
+        if re.fullmatch(r"merged\d+\.db", os.path.basename(p))
+    )
+    tests = {}
+    for path in sorted(glob.glob(os.path.join(directory, "test*.db"))):
+        match = re.fullmatch(r"(test\d+)(_\w+)?\.db", os.path.basename(path))
+        if not match:
+            continue
+        base, variant = match.groups()
+        if variant or base not in tests:
+            tests[base] = path
+    return merged + [tests[base] for base in sorted(tests)]
+
+
+def city_for(latitude, longitude):
+    """Name of the nearest known city within CITY_RADIUS_M, else None."""
+    if latitude is None or longitude is None:
+        return None
+    name, distance = min(
+        (
+            (name, haversine_m(latitude, longitude, lat, lon))
+            for name, (lat, lon) in CITY_CENTERS.items()
+        ),
+        key=lambda item: item[1],
+    )
+    return name if distance <= CITY_RADIUS_M else None
+
+
+def _derive(place: dict) -> dict:
+    # Fill the enrichment columns older shards do not carry
+    if place.get("city_name") is None or place.get("POI_score") is None:
+        try:
+            gps = json.loads(place.get("gps_coordinates") or "null") or {}
+        except (TypeError, ValueError):
+            gps = {}
+        if place.get("city_name") is None and isinstance(gps, dict):
+            place["city_name"] = city_for(gps.get("latitude"), gps.get("longitude"))
+        if place.get("POI_score") is None and place.get("rating") is not None:
+            place["POI_score"] = round(
+                place["rating"] * math.log1p(place.get("reviews") or 0), 4
+            )
+    if place.get("best_type_id") is None:
+        place["best_type_id"] = place.get("type_id")
+    place.update(price_columns(place.get("price")))
+    return place
+
+
+def _quoted(columns: list) -> str:
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+def _load_shard(out: sqlite3.Connection, path: str, batch_size: int) -> tuple:
+    """Copy one shard into places; returns (rows read, rows inserted)."""
+    columns = [c for c in PLACE_COLUMNS if c != "id"]
+    insert_sql = (
+        f"INSERT OR IGNORE INTO places ({_quoted(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        available = {row[1] for row in src.execute("PRAGMA table_info(places)")}
+        shard_columns = [c for c in columns if c in available]
+        cursor = src.execute(
+            f"SELECT {_quoted(shard_columns)} FROM places "
+            "WHERE place_id IS NOT NULL ORDER BY id"
+        )
+        read = inserted = 0
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            rows = []
+            for row in batch:
+                place = _derive(dict(zip(shard_columns, row)))
+                rows.append(tuple(place.get(c) for c in columns))
+            before = out.total_changes
+            out.executemany(insert_sql, rows)
+            inserted += out.total_changes - before
+            read += len(rows)
+        return read, inserted
+    finally:
+        src.close()
+
+
+def _build_derived_tables(out: sqlite3.Connection):
+    out.executescript(
+        """
+        BEGIN;
+        -- English/Vietnamese label of each type: the most common
+        -- best_type_id_en/_vi of places with that best type, else the id
+        -- with spaces (and the English label for Vietnamese)
+        CREATE TEMP TABLE type_label_counts AS
+        SELECT best_type_id AS type_id, best_type_id_en AS label_en,
+            best_type_id_vi AS label_vi, count(*) AS n
+        FROM places
+        WHERE best_type_id IS NOT NULL
+            AND (best_type_id_en IS NOT NULL OR best_type_id_vi IS NOT NULL)
+        GROUP BY 1, 2, 3;
+        CREATE TEMP TABLE type_labels AS
+        SELECT type_id,
+            (SELECT label_en FROM type_label_counts c
+             WHERE c.type_id = t.type_id AND label_en IS NOT NULL
+             ORDER BY n DESC, label_en LIMIT 1) AS label_en,
+            (SELECT label_vi FROM type_label_counts c
+             WHERE c.type_id = t.type_id AND label_vi IS NOT NULL
+             ORDER BY n DESC, label_vi LIMIT 1) AS label_vi
+        FROM (SELECT DISTINCT type_id FROM type_label_counts) t;
+
+        CREATE TABLE type_stats (
+            city_name VARCHAR,
+            type_id VARCHAR,
+            type_id_en VARCHAR,
+            type_id_vi VARCHAR,
+            place_count INTEGER,
+            type_score FLOAT
+        );
+        INSERT INTO type_stats (city_name, type_id, place_count, type_score)
+        SELECT city_name, type_id, count(*), sum(POI_score)
+        FROM place_types
+        WHERE city_name IS NOT NULL
+        GROUP BY city_name, type_id;
+        UPDATE type_stats SET
+            type_id_en = coalesce(
+                (SELECT label_en FROM type_labels l WHERE l.type_id = type_stats.type_id),
+                replace(type_id, '_', ' ')
+            );
+        UPDATE type_stats SET
+            type_id_vi = coalesce(
+                (SELECT label_vi FROM type_labels l WHERE l.type_id = type_stats.type_id),
+                type_id_en
+            );
+        CREATE INDEX ix_type_stats_city_score ON type_stats (city_name, type_score);
+
+        INSERT INTO city_types (city_name, type_name)
+        SELECT city_name, type_id FROM type_stats ORDER BY city_name, type_id;
+
+        CREATE VIRTUAL TABLE types_search USING fts5(type_id);
+        INSERT INTO types_search (type_id)
+        SELECT DISTINCT type_id FROM place_types ORDER BY type_id;
+
+        INSERT INTO types_search (types_search) VALUES ('optimize');
+        COMMIT;
+        """
+    )
+
+
+def build_catalog(shards: list, output: str = DEFAULT_OUTPUT, batch_size: int = BATCH_SIZE) -> dict:
+    """Build a fresh catalog from `shards` at `output`; returns build counters."""
+    started = time.perf_counter()
+    tmp_path = output + ".building"
+    for path in (tmp_path, tmp_path + "-journal"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    # The ORM models own the places / city_types / place_types schema
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    PlaceBase.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    out = sqlite3.connect(tmp_path, isolation_level=None)
+    # A failed build is simply discarded, so durability is not needed here
+    out.execute("PRAGMA journal_mode = OFF")
+    out.execute("PRAGMA synchronous = OFF")
+    out.execute("PRAGMA cache_size = -65536")
+    total_read = 0
+    try:
+        out.execute("BEGIN")
+        for path in shards:
+            shard_started = time.perf_counter()
+            read, inserted = _load_shard(out, path, batch_size)
+            elapsed = time.perf_counter() - shard_started
+            total_read += read
+            print(
+                f"  {os.path.basename(path):<20} {read:>7} rows  {inserted:>7} new"
+                f"  {read / max(elapsed, 1e-9):>10,.0f} rows/s"
+            )
+        out.execute("COMMIT")
+    finally:
+        out.close()
+
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    with engine.begin() as conn:
+        ensure_place_indexes(conn)
+        ensure_search_index(conn)
+        ensure_place_hours(conn)
+    engine.dispose()
+
+    out = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        _build_derived_tables(out)
+        out.execute("ANALYZE")
+        out.execute("VACUUM")
+        places = out.execute("SELECT count(*) FROM places").fetchone()[0]
+        types = out.execute("SELECT count(*) FROM types_search").fetchone()[0]
+    finally:
+        out.close()
+
+    os.replace(tmp_path, output)
+    elapsed = time.perf_counter() - started
+    stats = {
+        "shards": len(shards),
+        "rows_read": total_read,
+        "places": places,
+        "types": types,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(total_read / max(elapsed, 1e-9)),
+    }
+    print(
+        f"Built {output}: {places} places ({total_read - places} duplicates dropped),"
+        f" {types} types from {len(shards)} shards in {elapsed:.2f}s"
+        f" ({stats['rows_per_second']:,} rows/s)"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the place catalog from shard DBs")
+    parser.add_argument("shards", nargs="*", help="Shard DBs in priority order")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    shards = args.shards or default_shards()
+    output = os.path.abspath(args.output)
+    shards = [p for p in shards if os.path.abspath(p) != output]
+    if not shards:
+        parser.error("no shard databases found")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    build_catalog(shards, output, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # main.py
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -21,8 +22,32 @@ from .routers import gtranslate_router
 from .routers import places
 from .routers import categories
 from .routers import groq_router
+from .services import (
+    catalog_snapshot,
+    exchangerate_service,
+    gazetteer_service,
+    http_client,
+    place_autocomplete_service,
+    spatial_index_service,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the in-memory place catalog once at startup when it is enabled
+    if catalog_snapshot.enabled():
+        catalog_snapshot.get_snapshot()
+    place_autocomplete_service.get_index()
+    gazetteer_service.get_gazetteer()
+    spatial_index_service.get_locator()
+    # Exchange rates are downloaded in the background, not on conversions
+    exchangerate_service.rate_table.start()
+    yield
+    await exchangerate_service.rate_table.stop()
+    await http_client.aclose()
+
 
-app = FastAPI(debug=True)
+app = FastAPI(debug=True, lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
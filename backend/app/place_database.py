@@ -1,11 +1,78 @@
+import os
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from .place_models import PlaceBase
+from .sqlite_config import STATEMENT_CACHE_SIZE, apply_pragmas
+from .services.place_index_service import ensure_place_indexes
+from .services.opening_hours_service import ensure_place_hours
+from .services.place_search_service import ensure_search_index
+from .services.price_service import ensure_price_columns
 
-DATABASE_URL = "sqlite:///app/merged.db"
+DATABASE_PATH = "app/merged.db"
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(DATABASE_URL)
+# Set PLACES_DB_IMMUTABLE=1 when the catalog is a shipped artifact that is never
+# written while the API runs: SQLite then skips file locking and change
+# detection entirely. /api/places/save is refused in that mode.
+IMMUTABLE = os.getenv("PLACES_DB_IMMUTABLE", "0").strip().lower() in ("1", "true", "yes")
+
+# Per-connection pragmas for catalog readers
+READ_PRAGMAS = {
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # KiB, i.e. 64 MiB of page cache
+    "temp_store": "MEMORY",
+    "query_only": 1,
+}
+WRITE_PRAGMAS = {
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Writer: schema/index maintenance at startup and /api/places/save
+write_engine = apply_pragmas(
+    create_engine(
+        DATABASE_URL,
+        connect_args={"cached_statements": STATEMENT_CACHE_SIZE},
+    ),
+    WRITE_PRAGMAS,
+)
+
+PlaceBase.metadata.create_all(bind=write_engine)
+
+with write_engine.begin() as conn:
+    ensure_price_columns(conn)
+    ensure_place_indexes(conn)
+    ensure_search_index(conn)
+    ensure_place_hours(conn)
+
+# Readers: every other catalog query opens the file read-only
+_read_flags = "mode=ro&immutable=1" if IMMUTABLE else "mode=ro"
+engine = apply_pragmas(
+    create_engine(
+        f"sqlite:///file:{DATABASE_PATH}?{_read_flags}&uri=true",
+        connect_args={
+            "cached_statements": STATEMENT_CACHE_SIZE,
+            "check_same_thread": False,
+        },
+        pool_size=10,
+        max_overflow=20,
+    ),
+    READ_PRAGMAS,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+
+# asyncio (aiosqlite) reader for async def endpoints, with the same pragmas
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///file:{DATABASE_PATH}?{_read_flags}&uri=true",
+    connect_args={"cached_statements": STATEMENT_CACHE_SIZE},
+    pool_size=10,
+    max_overflow=20,
+)
+apply_pragmas(async_engine.sync_engine, READ_PRAGMAS)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
 metadata = MetaData()
 
 
@@ -17,4 +84,14 @@ def get_db():
         db.close()
 
 
-PlaceBase.metadata.create_all(bind=engine)
+def get_write_db():
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -6,12 +6,17 @@ from sqlalchemy import (
     Float,
     JSON,
     UniqueConstraint,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
 PlaceBase = declarative_base()
 
+# Python None is stored as SQL NULL rather than the JSON text 'null', so
+# absent values can be told apart (and kept by upsert_places' COALESCE)
+NullableJSON = JSON(none_as_null=True)
+
 
 class Place(PlaceBase):
     __tablename__ = "places"
@@ -23,41 +28,47 @@ class Place(PlaceBase):
     data_cid = Column(String)
     reviews_link = Column(String)
     photos_link = Column(String)
-    gps_coordinates = Column(JSON)
+    gps_coordinates = Column(NullableJSON)
     place_id_search = Column(String)
     provider_id = Column(String)
     rating = Column(Float)
     reviews = Column(Integer)
     price = Column(String)
     type = Column(String)
-    types = Column(JSON)
+    types = Column(NullableJSON)
     type_id = Column(String)
-    type_ids = Column(JSON)
+    type_ids = Column(NullableJSON)
     address = Column(String)
     open_state = Column(String)
     hours = Column(String)
-    operating_hours = Column(JSON)
+    operating_hours = Column(NullableJSON)
     phone = Column(String)
     website = Column(String)
-    amenities = Column(JSON)
+    amenities = Column(NullableJSON)
     description = Column(String)
-    service_options = Column(JSON)
+    service_options = Column(NullableJSON)
     thumbnail = Column(String)
-    extensions = Column(JSON)
-    unsupported_extensions = Column(JSON)
+    extensions = Column(NullableJSON)
+    unsupported_extensions = Column(NullableJSON)
     serpapi_thumbnail = Column(String)
     user_review = Column(String)
-    place_detail = Column(JSON)
+    place_detail = Column(NullableJSON)
     city_name = Column(String)
     POI_score = Column(Float)
-    en_names = Column(JSON)
-    vi_names = Column(JSON)
+    en_names = Column(NullableJSON)
+    vi_names = Column(NullableJSON)
     local_path = Column(String)
-    place_detail_vi = Column(JSON)
-    place_detail_en = Column(JSON)
+    place_detail_vi = Column(NullableJSON)
+    place_detail_en = Column(NullableJSON)
     best_type_id = Column(String)
     best_type_id_en = Column(String)
     best_type_id_vi = Column(String)
+    # Parsed from price (services/price_service.py): VND bounds, NULL
+    # price_max for open-ended prices, and a 1-4 price level
+    price_min = Column(Integer)
+    price_max = Column(Integer)
+    price_level = Column(Integer)
+    __table_args__ = (Index("ix_places_price", "price_min", "price_max"),)
 
 
 class CityType(PlaceBase):
@@ -66,3 +77,33 @@ class CityType(PlaceBase):
     city_name = Column(String, index=True)
     type_name = Column(String, index=True)
     __table_args__ = (UniqueConstraint("city_name", "type_name", name="_city_type_uc"),)
+
+
+class PlaceTypeIndex(PlaceBase):
+    # One row per (place, type) pair, denormalized from places.type_ids so that
+    # type-filtered queries are index range scans instead of json_each scans.
+    __tablename__ = "place_types"
+    place_id = Column(Integer, primary_key=True)  # places.id
+    type_id = Column(String, primary_key=True)
+    city_name = Column(String)
+    POI_score = Column(Float)  # NULL scores are stored as 0
+    __table_args__ = (
+        Index("ix_place_types_type_score", "type_id", "POI_score", "place_id"),
+        Index(
+            "ix_place_types_type_city_score",
+            "type_id",
+            "city_name",
+            "POI_score",
+            "place_id",
+        ),
+    )
+
+
+class PlaceHours(PlaceBase):
+    # Weekly opening intervals parsed from places.operating_hours, in minutes
+    # from Monday 00:00 ([start_min, end_min)); places without parseable
+    # hours have no rows.
+    __tablename__ = "place_hours"
+    place_id = Column(Integer, primary_key=True)  # places.id
+    start_min = Column(Integer, primary_key=True)
+    end_min = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Any, Dict
 
 
@@ -57,3 +57,22 @@ class PlaceIn(BaseModel):
 
 class PlacesPayload(BaseModel):
     places: List[PlaceIn]
+
+
+class PlaceBatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=1000)  # place_id values
+    fields: Optional[str] = None
+    view: Optional[str] = None
+
+
+class LatLon(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class NearestPlacesRequest(BaseModel):
+    points: List[LatLon] = Field(..., max_length=1000)
+    k: int = Field(5, ge=1, le=50)
+    max_distance_m: Optional[float] = Field(None, gt=0)
+    fields: Optional[str] = None
+    view: Optional[str] = None
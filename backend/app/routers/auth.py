@@ -2,19 +2,20 @@ from datetime import timedelta
 
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi import Depends, HTTPException, status, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Body
 from ..user_schemas import UserUpdate
 from ..auth.auth_handler import get_current_user
 
 from ..auth.auth_handler import (
-    authenticate_user,
+    authenticate_user_async,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
     get_user,
     get_password_hash,
 )
-from ..user_database import get_db
+from ..user_database import get_async_db, get_db
 from ..user_schemas import Token, UserCreate, UserResponse
 from ..user_models import User
 
@@ -42,9 +43,10 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/token")
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Token:
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
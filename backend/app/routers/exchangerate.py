@@ -1,22 +1,73 @@
+from typing import List
 from fastapi import APIRouter, Query
 from decimal import Decimal
-from ..services.exchangerate_service import convertVNDtoUSD, convertUSDtoVND
+from pydantic import BaseModel, Field
+from ..services.exchangerate_service import convert, rate_table
 
 router = APIRouter(prefix="/api/exchangerate", tags=["exchangerate"])
 
+MAX_BATCH_AMOUNTS = 10_000
+
+
+class BatchAmount(BaseModel):
+    amount: float
+    source: str
+
+
+class BatchConvertRequest(BaseModel):
+    target: str
+    items: List[BatchAmount] = Field(..., max_length=MAX_BATCH_AMOUNTS)
+
 
 @router.get("/")
-def convert_currency(
+async def convert_currency(
     amount: float = Query(...), source: str = Query(...), target: str = Query(...)
 ):
     try:
         decimal_amount = Decimal(str(amount))
-        if source == "vnd" and target == "usd":
-            result = convertVNDtoUSD(decimal_amount)
-        elif source == "usd" and target == "vnd":
-            result = convertUSDtoVND(decimal_amount)
-        else:
-            return {"error": "Unsupported currency pair"}
-        return {"amount": float(result), "source": source, "target": target}
+        source, target = source.lower(), target.lower()
+        result = await convert(decimal_amount, source, target)
+        return {
+            "amount": float(result),
+            "source": source,
+            "target": target,
+            "date": rate_table.date,
+        }
+    except ValueError:
+        return {"error": "Unsupported currency pair"}
     except Exception as e:
         return {"error": str(e)}
+
+
+@router.post("/batch")
+async def convert_currency_batch(request: BatchConvertRequest):
+    """
+    Convert many amounts to one target currency in a single call. amounts[i]
+    is items[i] converted, or null when its source currency is unknown.
+    """
+    try:
+        await rate_table.ready()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    target = request.target.lower()
+    if rate_table.rate(target, target) is None:
+        return {"error": "Unsupported currency pair"}
+    rates, amounts = {}, []
+    for item in request.items:
+        source = item.source.lower()
+        if source not in rates:
+            rates[source] = rate_table.rate(source, target)
+        rate = rates[source]
+        amounts.append(float(Decimal(str(item.amount)) * rate) if rate is not None else None)
+    return {
+        "target": target,
+        "date": rate_table.date,
+        "amounts": amounts,
+        "unsupported": sorted(source for source, rate in rates.items() if rate is None),
+    }
+
+
+@router.get("/stats")
+async def exchangerate_stats():
+    """Date, age and source of the cached rate table, and refresh failures."""
+    return rate_table.stats()
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import json
@@ -95,8 +96,22 @@ def save_place_to_db(place_data: dict, place_type: str, db: Session) -> Foursqua
         return new_place
 
 
+def save_places_to_db(results: list, place_type: str, db: Session) -> list:
+    """Save Foursquare search results, typed from their categories"""
+    saved_places = []
+    for place_data in results:
+        # Determine actual type from categories
+        actual_type = determine_place_type(place_data.get("categories", []))
+
+        # Use the requested type if categories don't match
+        final_type = actual_type if actual_type else place_type
+
+        saved_places.append(save_place_to_db(place_data, final_type, db))
+    return saved_places
+
+
 @router.post("/search", response_model=List[FoursquarePlaceResponse])
-def search_and_save_places(
+async def search_and_save_places(
     place_type: str = Query(..., description="Place type: stay, eat, or travel"),
     ll: Optional[str] = Query(
         None, description="Latitude,Longitude (e.g., '10.7769,106.7009')"
@@ -126,7 +141,7 @@ def search_and_save_places(
         )
 
     # Search Foursquare
-    search_result = search_places(ll=ll, near=near, query=query, limit=limit)
+    search_result = await search_places(ll=ll, near=near, query=query, limit=limit)
 
     if not search_result.get("success"):
         raise HTTPException(
@@ -135,20 +150,9 @@ def search_and_save_places(
         )
 
     results = search_result["data"].get("results", [])
-    saved_places = []
-
-    # Save each place to database
-    for place_data in results:
-        # Determine actual type from categories
-        actual_type = determine_place_type(place_data.get("categories", []))
 
-        # Use the requested type if categories don't match
-        final_type = actual_type if actual_type else place_type
-
-        saved_place = save_place_to_db(place_data, final_type, db)
-        saved_places.append(saved_place)
-
-    return saved_places
+    # Save each place to database (blocking session, so off the event loop)
+    return await run_in_threadpool(save_places_to_db, results, place_type, db)
 
 
 @router.get("/places", response_model=List[FoursquarePlaceResponse])
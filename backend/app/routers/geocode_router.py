@@ -1,16 +1,60 @@
 # router/geocode_router.py
-from fastapi import APIRouter, Query, HTTPException
+from typing import List
+from fastapi import APIRouter, Body, Query, HTTPException
+from ..place_schemas import LatLon
+from ..services import http_client
+from ..services.geocode_cache_service import geocode_cache
 from ..services.geocode_service import geocode_location
+from ..services.spatial_index_service import get_locator
 
 router = APIRouter(prefix="/api/geocode", tags=["Geocode"])
 
 
 @router.get("/")
-def get_geocode(q: str = Query(..., description="Search location")):
+async def get_geocode(
+    q: str = Query(..., description="Search location"),
+    source: str = Query(
+        "auto",
+        pattern="^(auto|local|nominatim)$",
+        description="auto: place catalog first, Nominatim for misses and weak matches; "
+        "local: catalog only (offline); nominatim: Nominatim only",
+    ),
+):
     try:
-        result = geocode_location(q)
+        result = await geocode_location(q, source)
         if not result:
             raise HTTPException(status_code=404, detail="Location not found")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/reverse")
+def reverse_geocode(
+    lat: float = Query(..., ge=-90, le=90), lon: float = Query(..., ge=-180, le=180)
+):
+    """City (from the place catalog) and nearest catalog place of a point, offline"""
+    try:
+        return get_locator().reverse([(lat, lon)])[0]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reverse")
+def reverse_geocode_batch(points: List[LatLon] = Body(..., max_length=1000)):
+    """GET /reverse for many points ([{"lat", "lon"}, ...]) in one call"""
+    try:
+        return get_locator().reverse([(p.lat, p.lon) for p in points])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stats")
+def get_geocode_stats():
+    # Cache hit rate and Nominatim rate-limit queue depth (since startup)
+    return {
+        "cache": geocode_cache.stats(),
+        "rate_limits": http_client.rate_limit_stats(),
+    }
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Request
+from ..services.spatial_index_service import get_locator
 
 router = APIRouter(prefix="/api/location", tags=["Location"])
 
@@ -12,10 +13,13 @@ async def receive_location(request: Request):
         if latitude is None or longitude is None:
             return {"error": "Latitude and Longitude are required."}
         # Here you can process/store the location data as needed
+        where = get_locator().reverse([(float(latitude), float(longitude))])[0]
         return {
             "message": "Location received",
             "latitude": latitude,
             "longitude": longitude,
+            "city_name": where["city_name"],
+            "display_name": where["display_name"],
         }
     except Exception as e:
         return {"error": str(e)}
@@ -1,11 +1,28 @@
-from fastapi import APIRouter, Body
-from ..services.geocode_service import route_osrm
+from typing import Optional
+from fastapi import APIRouter, Body, Query
+from ..services.geocode_service import route_local, route_osrm
+from ..services.itinerary_planner_service import plan_days
+from ..services.route_cache_service import route_cache
 
 router = APIRouter(prefix="/api/route", tags=["Route"])
 
 
 @router.post("/optimize")
-def get_route(destinations: list = Body(...)):
+async def get_route(
+    destinations: list = Body(...),
+    optimizer: str = Query(
+        "osrm",
+        pattern="^(osrm|local)$",
+        description="osrm: OSRM /trip orders the stops; local: ordered in-process",
+    ),
+    instructions: bool = Query(False, description="Include per-step turn instructions"),
+    tolerance_m: Optional[float] = Query(
+        None, gt=0, description="Simplify geometries to within this many metres"
+    ),
+    zoom: Optional[float] = Query(
+        None, ge=0, le=22, description="Simplify geometries for this map zoom level"
+    ),
+):
     # destinations: [{"lat": ..., "lon": ...}, ...]
     try:
         points = [
@@ -16,10 +33,36 @@ def get_route(destinations: list = Body(...)):
             }
             for d in destinations
         ]
-        result = route_osrm(points)
+        route = route_local if optimizer == "local" else route_osrm
+        result = await route(points, instructions=instructions, tolerance_m=tolerance_m, zoom=zoom)
         return result
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
         }
+
+
+@router.post("/days")
+def plan_route_days(
+    destinations: list = Body(...),
+    days: int = Body(..., ge=1, le=30),
+    start: Optional[dict] = Body(None),
+):
+    """
+    Split destinations ([{"lat", "lon", ...}]) into `days` balanced geographic
+    clusters, each ordered for travel (from the stop nearest `start`, if given).
+    """
+    try:
+        return {"success": True, "days": plan_days(destinations, days, start)}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+@router.get("/cache")
+def get_route_cache_stats():
+    # Size and hit/miss counters (since startup) of the OSRM route cache
+    return route_cache.stats()
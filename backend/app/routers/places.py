@@ -1,80 +1,175 @@
-import json
+from typing import Optional
 from fastapi import APIRouter, Depends, Query
-from ..place_models import Place, CityType, PlaceBase
-from ..place_schemas import PlaceIn, PlacesPayload, GPSCoordinates
-from ..place_database import get_db
+from ..place_models import CityType, PlaceBase
+from ..place_schemas import (
+    PlaceIn,
+    PlacesPayload,
+    GPSCoordinates,
+    PlaceBatchRequest,
+    NearestPlacesRequest,
+)
+from ..place_database import IMMUTABLE, get_async_db, get_db, get_write_db
 from ..services.gtranslate_service import translateEnToVi, translateViToEn
+from ..services.place_index_service import (
+    bounding_box,
+    decode_cursor,
+    encode_cursor,
+    haversine_m,
+    parse_bbox,
+)
+from ..services.place_projection_service import (
+    PlaceJSONResponse,
+    place_decoder,
+    project,
+    resolve_place_fields,
+    select_columns,
+)
+from ..services.opening_hours_service import open_at_condition, parse_open_at
+from ..services.place_search_service import search_places_text
+from ..services.place_service import get_places_by_ids, upsert_places
+from ..services.price_service import price_condition
+from ..services.spatial_index_service import MAX_K, nearest_places
+from ..services import catalog_snapshot, place_autocomplete_service
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import Integer, desc, func, text, JSON, Float
+from sqlalchemy import desc, func, text
 import asyncio
 
 router = APIRouter()
 
 
 @router.post("/api/places/save")
-async def save_places(payload: PlacesPayload, db: Session = Depends(get_db)):
+def save_places(
+    payload: PlacesPayload,
+    on_conflict: str = Query("skip", pattern="^(skip|update)$"),
+    db: Session = Depends(get_write_db),
+):
+    # Plain def: FastAPI runs the blocking bulk insert in its threadpool. Going
+    # through the async session instead (run_sync) would keep statement
+    # compilation and row handling on the event loop
+    if IMMUTABLE:
+        return {"status": "error", "message": "Place catalog is read-only"}
     try:
-        columns = {c.name for c in Place.__table__.columns}
-        for place in payload.places:
-            exists = db.query(Place).filter_by(place_id=place.place_id).first()
-            if exists:
-                continue  # Skip if already exists
-            place_data = {k: v for k, v in place.dict().items() if k in columns}
-            db.add(Place(**place_data))
+        counts = upsert_places(
+            db, [place.dict() for place in payload.places], on_conflict
+        )
         db.commit()
-        return {"status": "success", "count": len(payload.places)}
+        return {"status": "success", "count": len(payload.places), **counts}
     except Exception as e:
         db.rollback()
         return {"status": "error", "message": str(e)}
 
 
+DEFAULT_SEARCH_RADIUS_M = 50000
+OPEN_AT_DESCRIPTION = (
+    "Only places open at this time: ISO datetime or weekday and time, e.g. 'sat 18:30'"
+)
+MIN_PRICE_DESCRIPTION = "Only places whose price range reaches at least this (VND)"
+MAX_PRICE_DESCRIPTION = "Only places whose price range starts at or below this (VND)"
+
+
 @router.get("/api/places/search")
 async def search_places(
     type: str = Query(...),
-    latitude: float = Query(...),
-    longitude: float = Query(...),
-    db: Session = Depends(get_db),
+    latitude: Optional[float] = Query(None),
+    longitude: Optional[float] = Query(None),
+    radius_m: Optional[float] = Query(None, gt=0),
+    bbox: Optional[str] = Query(None, description="min_lat,min_lon,max_lat,max_lon"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated place columns"),
+    view: Optional[str] = Query(None, description="summary, card or full"),
+    open_at: Optional[str] = Query(None, description=OPEN_AT_DESCRIPTION),
+    min_price: Optional[int] = Query(None, ge=0, description=MIN_PRICE_DESCRIPTION),
+    max_price: Optional[int] = Query(None, ge=0, description=MAX_PRICE_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        lat_int = int(latitude)
-        sql = text(
-            """
-            SELECT * FROM places
-            WHERE EXISTS (
-                SELECT 1 FROM json_each(places.type_ids)
-                WHERE json_each.value = :type
+        columns = resolve_place_fields(fields, view)
+        minute = parse_open_at(open_at) if open_at else None
+        # Either an explicit bbox, or a radius (default 50 km) around latitude/longitude
+        if bbox:
+            box = parse_bbox(bbox)
+            center = None
+        elif latitude is not None and longitude is not None:
+            radius_m = radius_m or DEFAULT_SEARCH_RADIUS_M
+            box = bounding_box(latitude, longitude, radius_m)
+            center = (latitude, longitude)
+        else:
+            return {
+                "status": "error",
+                "message": "Either bbox or latitude and longitude are required",
+            }
+        after = decode_cursor(cursor) if cursor else None
+        priced = min_price is not None or max_price is not None
+
+        # (POI_score, id) of each returned place, kept aside for the cursor
+        keys = []
+        if catalog_snapshot.enabled():
+            rows = catalog_snapshot.get_snapshot().search(
+                type,
+                box,
+                center,
+                radius_m,
+                limit + 1,
+                after,
+                minute,
+                min_price,
+                max_price,
+            )
+            keys = [(row["POI_score"] or 0, row["id"]) for row in rows]
+            places_json = [project(row, columns) for row in rows]
+        else:
+            sql = text(
+                f"""
+                SELECT {select_columns(columns)},
+                    place_types.POI_score AS _score, place_types.place_id AS _pid,
+                    json_extract(places.gps_coordinates, '$.latitude') AS lat,
+                    json_extract(places.gps_coordinates, '$.longitude') AS lng
+                FROM place_types
+                JOIN places_rtree ON places_rtree.id = place_types.place_id
+                JOIN places ON places.id = place_types.place_id
+                WHERE place_types.type_id = :type
+                AND places_rtree.min_lat <= :max_lat AND places_rtree.max_lat >= :min_lat
+                AND places_rtree.min_lon <= :max_lon AND places_rtree.max_lon >= :min_lon
+                {"AND (place_types.POI_score, place_types.place_id) < (:after_score, :after_id)" if after else ""}
+                {"AND " + open_at_condition("place_types.place_id") if minute is not None else ""}
+                {"AND " + price_condition(min_price, max_price) if priced else ""}
+                ORDER BY place_types.POI_score DESC, place_types.place_id DESC
+                """
             )
-            AND CAST(json_extract(gps_coordinates, '$.latitude') AS INTEGER) = :lat_int
-            ORDER BY POI_score DESC
-            """
+            params = {**box, "type": type, "min_price": min_price, "max_price": max_price}
+            if after:
+                params["after_score"], params["after_id"] = after
+            if minute is not None:
+                params["open_at"] = minute
+            decode = place_decoder(columns)
+
+            places_json = []
+            # Rows arrive in keyset order; stop as soon as one extra match is found
+            result = await db.stream(sql, params)
+            async for row in result:
+                if center and haversine_m(*center, row.lat, row.lng) >= radius_m:
+                    continue
+                places_json.append(decode(row))
+                keys.append((row._score, row._pid))
+                if len(places_json) > limit:
+                    break
+            await result.close()
+
+        next_cursor = None
+        if len(places_json) > limit:
+            places_json = places_json[:limit]
+            next_cursor = encode_cursor(*keys[limit - 1])
+
+        return PlaceJSONResponse(
+            {
+                "status": "success",
+                "count": len(places_json),
+                "places": places_json,
+                "next_cursor": next_cursor,
+            }
         )
-        results = db.execute(sql, {"type": type, "lat_int": lat_int}).fetchall()
-        columns = [col.name for col in Place.__table__.columns]
-        types = {col.name: col.type for col in Place.__table__.columns}
-
-        places_json = []
-        for row in results:
-            place = {}
-            for idx, col in enumerate(columns):
-                value = row[idx]
-                col_type = types[col]
-                # Handle JSON columns
-                if isinstance(col_type, JSON):
-                    try:
-                        value = json.loads(value) if value is not None else None
-                    except Exception:
-                        pass
-                # Handle Float
-                elif isinstance(col_type, Float):
-                    value = float(value) if value is not None else None
-                # Handle Integer
-                elif isinstance(col_type, Integer):
-                    value = int(value) if value is not None else None
-                # Otherwise, leave as is (String, etc.)
-                place[col] = value
-            places_json.append(place)
-
-        return {"status": "success", "count": len(places_json), "places": places_json}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -103,44 +198,72 @@ def get_types_dict_from_stats(city_name: str, db: Session):
 
 
 @router.get("/api/places/manualsearch")
-def search_places(query: str, db=Depends(get_db)):
+def search_places(
+    query: str,
+    city: Optional[str] = Query(None, description="city_name, e.g. HCMC, Vietnam"),
+    bbox: Optional[str] = Query(None, description="min_lat,min_lon,max_lat,max_lon"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    db=Depends(get_db),
+):
+    try:
+        # Without a projection, results keep the legacy {title, place_id} shape
+        columns = resolve_place_fields(fields, view) if fields or view else None
+        box = parse_bbox(bbox) if bbox else None
+        results = search_places_text(db, query, columns, city, box, limit)
+        return PlaceJSONResponse(results)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@router.get("/api/places/autocomplete")
+def autocomplete_places(
+    q: str,
+    limit: int = Query(10, ge=1, le=place_autocomplete_service.MAX_LIMIT),
+    city: Optional[str] = Query(None, description="city_name, e.g. HCMC, Vietnam"),
+):
     try:
-        sql = text("SELECT * FROM places_search WHERE title MATCH :q LIMIT 20")
-        results = db.execute(sql, {"q": query}).mappings().all()
-        return list(results)
+        completions = place_autocomplete_service.get_index().complete(q, limit, city)
+        return PlaceJSONResponse(completions)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @router.get("/api/places/byid")
-def get_place_by_id(id: str, db=Depends(get_db)):
+def get_place_by_id(
+    id: str,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    db=Depends(get_db),
+):
     try:
-        sql = text("SELECT * FROM places WHERE place_id = :id")
+        columns = resolve_place_fields(fields, view)
+        if catalog_snapshot.enabled():
+            place = catalog_snapshot.get_snapshot().get(id)
+            return PlaceJSONResponse(project(place, columns) if place else None)
+
+        sql = text(f"SELECT {select_columns(columns)} FROM places WHERE place_id = :id")
         row = db.execute(sql, {"id": id}).fetchone()
         if not row:
             return None
+        return PlaceJSONResponse(place_decoder(columns)(row))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-        columns = [col.name for col in Place.__table__.columns]
-        types = {col.name: col.type for col in Place.__table__.columns}
-        place = {}
-        for idx, col in enumerate(columns):
-            value = row[idx]
-            col_type = types[col]
-            # Handle JSON columns
-            if isinstance(col_type, JSON):
-                try:
-                    value = json.loads(value) if value is not None else None
-                except Exception:
-                    pass
-            # Handle Float
-            elif isinstance(col_type, Float):
-                value = float(value) if value is not None else None
-            # Handle Integer
-            elif isinstance(col_type, Integer):
-                value = int(value) if value is not None else None
-            # Otherwise, leave as is (String, etc.)
-            place[col] = value
-        return place
+
+@router.post("/api/places/batch")
+def get_places_batch(payload: PlaceBatchRequest, db=Depends(get_db)):
+    """
+    Fetch many places by place_id in one call, e.g. every destination of a trip.
+    Places are returned in the order of `ids`; unknown ids are skipped.
+    """
+    try:
+        columns = resolve_place_fields(payload.fields, payload.view)
+        places_json = get_places_by_ids(db, payload.ids, columns)
+        return PlaceJSONResponse(
+            {"status": "success", "count": len(places_json), "places": places_json}
+        )
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -227,59 +350,108 @@ def get_unique_top_types_per_city_json(db=Depends(get_db)):
 
 
 @router.get("/api/places/nearby")
-def find_places_nearby(latitude, longitude, type, radius_m=1000, db=Depends(get_db)):
-    sql = text(
-        """
-    SELECT *,
-        (
-            6371000 * acos(
-                cos(radians(:lat)) * cos(radians(json_extract(gps_coordinates, '$.latitude')))
-                * cos(radians(json_extract(gps_coordinates, '$.longitude')) - radians(:lng))
-                + sin(radians(:lat)) * sin(radians(json_extract(gps_coordinates, '$.latitude')))
-            )
-        ) AS distance
-    FROM places
-    WHERE EXISTS (
-        SELECT 1 FROM json_each(places.type_ids)
-        WHERE json_each.value = :type
-    )
-    AND (
-        6371000 * acos(
-            cos(radians(:lat)) * cos(radians(json_extract(gps_coordinates, '$.latitude')))
-            * cos(radians(json_extract(gps_coordinates, '$.longitude')) - radians(:lng))
-            + sin(radians(:lat)) * sin(radians(json_extract(gps_coordinates, '$.latitude')))
+def find_places_nearby(
+    latitude: float,
+    longitude: float,
+    type: str,
+    radius_m: float = 1000,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    open_at: Optional[str] = Query(None, description=OPEN_AT_DESCRIPTION),
+    min_price: Optional[int] = Query(None, ge=0, description=MIN_PRICE_DESCRIPTION),
+    max_price: Optional[int] = Query(None, ge=0, description=MAX_PRICE_DESCRIPTION),
+    db=Depends(get_db),
+):
+    try:
+        columns = resolve_place_fields(fields, view)
+        minute = parse_open_at(open_at) if open_at else None
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    priced = min_price is not None or max_price is not None
+    if catalog_snapshot.enabled():
+        rows = catalog_snapshot.get_snapshot().nearby(
+            latitude,
+            longitude,
+            type,
+            radius_m,
+            open_at=minute,
+            min_price=min_price,
+            max_price=max_price,
+        )
+        places_json = [project(row, columns) for row in rows]
+        return PlaceJSONResponse(
+            {"status": "success", "count": len(places_json), "places": places_json}
         )
-    ) < :radius
-    ORDER BY distance ASC, POI_score DESC
-    LIMIT 20
+
+    # Prune candidates with the R*Tree bounding box, then compute exact distances
+    sql = text(
+        f"""
+    SELECT {select_columns(columns)},
+        places.POI_score AS _score,
+        json_extract(places.gps_coordinates, '$.latitude') AS lat,
+        json_extract(places.gps_coordinates, '$.longitude') AS lng
+    FROM places_rtree
+    JOIN place_types ON place_types.place_id = places_rtree.id
+    JOIN places ON places.id = places_rtree.id
+    WHERE places_rtree.min_lat <= :max_lat AND places_rtree.max_lat >= :min_lat
+    AND places_rtree.min_lon <= :max_lon AND places_rtree.max_lon >= :min_lon
+    AND place_types.type_id = :type
+    {"AND " + open_at_condition("places_rtree.id") if minute is not None else ""}
+    {"AND " + price_condition(min_price, max_price) if priced else ""}
     """
     )
-    results = db.execute(
-        sql, {"lat": latitude, "lng": longitude, "type": type, "radius": radius_m}
-    ).fetchall()
-    columns = [col.name for col in Place.__table__.columns]
-    types = {col.name: col.type for col in Place.__table__.columns}
+    box = bounding_box(latitude, longitude, radius_m)
+    params = {**box, "type": type, "min_price": min_price, "max_price": max_price}
+    if minute is not None:
+        params["open_at"] = minute
+    results = db.execute(sql, params).fetchall()
 
-    places_json = []
+    candidates = []
     for row in results:
-        place = {}
-        for idx, col in enumerate(columns):
-            value = row[idx]
-            col_type = types[col]
-            # Handle JSON columns
-            if isinstance(col_type, JSON):
-                try:
-                    value = json.loads(value) if value is not None else None
-                except Exception:
-                    pass
-            # Handle Float
-            elif isinstance(col_type, Float):
-                value = float(value) if value is not None else None
-            # Handle Integer
-            elif isinstance(col_type, Integer):
-                value = int(value) if value is not None else None
-            # Otherwise, leave as is (String, etc.)
-            place[col] = value
-        places_json.append(place)
-
-    return {"status": "success", "count": len(places_json), "places": places_json}
+        distance = haversine_m(latitude, longitude, row.lat, row.lng)
+        if distance < radius_m:
+            candidates.append((distance, -(row._score or 0), row))
+    candidates.sort(key=lambda c: (c[0], c[1]))
+
+    decode = place_decoder(columns)
+    places_json = [decode(row) for _, _, row in candidates[:20]]
+    return PlaceJSONResponse(
+        {"status": "success", "count": len(places_json), "places": places_json}
+    )
+
+
+@router.get("/api/places/nearest")
+def find_nearest_places(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=MAX_K),
+    max_distance_m: Optional[float] = Query(None, gt=0),
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """
+    The k places nearest a point, of any type, nearest first with their
+    distance_m, and the city the point is in (from an in-memory k-d tree).
+    """
+    try:
+        columns = resolve_place_fields(fields, view)
+        result = nearest_places(db, [(latitude, longitude)], k, max_distance_m, columns)[0]
+        return PlaceJSONResponse({"status": "success", **result})
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@router.post("/api/places/nearest")
+def find_nearest_places_batch(payload: NearestPlacesRequest, db=Depends(get_db)):
+    """/api/places/nearest for up to 1000 points ({"lat", "lon"}) in one call."""
+    try:
+        columns = resolve_place_fields(payload.fields, payload.view)
+        points = [(p.lat, p.lon) for p in payload.points]
+        results = nearest_places(db, points, payload.k, payload.max_distance_m, columns)
+        return PlaceJSONResponse(
+            {"status": "success", "count": len(results), "results": results}
+        )
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
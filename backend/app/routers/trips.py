@@ -1,9 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..auth.auth_handler import get_current_active_user
-from ..user_database import get_db
+from ..services.cost_service import cost_columns, trip_cost_summary
+from ..services.exchangerate_service import rate_table
+from ..user_database import get_async_db, get_db
 from ..user_schemas import TripCreate, TripUpdate, TripResponse
 from ..user_models import User, Trip, Day, Destination, Cost
 
@@ -57,6 +61,7 @@ def create_trip(
                     detail=cost_data.detail,
                     originalAmount=cost_data.originalAmount,
                     originalCurrency=cost_data.originalCurrency,
+                    **cost_columns(cost_data.originalAmount),
                 )
                 db.add(db_cost)
 
@@ -93,6 +98,33 @@ def get_trip(
     return trip
 
 
+@router.get("/{trip_id}/costs/summary")
+async def get_trip_cost_summary(
+    trip_id: int,
+    currency: Optional[str] = Query(None, description="Defaults to the trip's currency"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Trip costs totalled per day, per destination and per currency, in one currency"""
+    trip_currency = (
+        await db.execute(
+            select(Trip.currency).where(Trip.id == trip_id, Trip.user_id == current_user.id)
+        )
+    ).first()
+    if trip_currency is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    trip_currency = trip_currency[0] or "USD"
+    currency = currency or trip_currency
+
+    try:
+        await rate_table.ready()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if rate_table.rate(currency, currency) is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported currency: {currency}")
+    return await trip_cost_summary(db, trip_id, trip_currency, currency)
+
+
 @router.put("/{trip_id}", response_model=TripResponse)
 def update_trip(
     trip_id: int,
@@ -162,6 +194,7 @@ def update_trip(
                         detail=cost_data.detail,
                         originalAmount=cost_data.originalAmount,
                         originalCurrency=cost_data.originalCurrency,
+                        **cost_columns(cost_data.originalAmount),
                     )
                     db.add(db_cost)
 
@@ -0,0 +1,116 @@
+import os
+import threading
+from typing import Callable, Generic, List, Optional, TypeVar
+from sqlalchemy import text
+from ..place_database import DATABASE_PATH, engine
+
+T = TypeVar("T")
+
+_source_lock = threading.Lock()
+_source = None
+
+
+class CatalogVersion:
+    """
+    One version of the catalog DB file, identified by its path and mtime.
+    place_rows() is shared by every index built from this version, so the
+    name/coordinate indexes scan places once between them.
+    """
+
+    def __init__(self, db_path: str, mtime: float):
+        self.db_path = db_path
+        self.mtime = mtime
+        self._rows = None
+        self._lock = threading.Lock()
+
+    def place_rows(self) -> list:
+        """Names, city, score and coordinates of every place, in id order."""
+        with self._lock:
+            if self._rows is None:
+                with engine.connect() as conn:
+                    self._rows = conn.execute(
+                        text(
+                            """
+                            SELECT place_id, title, en_names, vi_names, address,
+                                city_name, POI_score,
+                                json_extract(gps_coordinates, '$.latitude') AS lat,
+                                json_extract(gps_coordinates, '$.longitude') AS lon
+                            FROM places ORDER BY id
+                            """
+                        )
+                    ).fetchall()
+            return self._rows
+
+
+def current_version() -> CatalogVersion:
+    """The catalog file's current version (an os.stat, no DB access)."""
+    global _source
+    path = os.path.abspath(DATABASE_PATH)
+    mtime = os.stat(path).st_mtime
+    with _source_lock:
+        if _source is None or _source.db_path != path or _source.mtime != mtime:
+            _source = CatalogVersion(path, mtime)
+        return _source
+
+
+class CatalogLoader(Generic[T]):
+    """
+    An in-memory structure built from the catalog, kept in step with the DB
+    file. The first get() builds it. After that, when the file has changed
+    (e.g. after /api/places/save), get() starts a rebuild in a background
+    thread and keeps returning the previous build until the new one is
+    ready, so requests never wait for a rebuild.
+    """
+
+    def __init__(self, name: str, build: Callable[[CatalogVersion], T]):
+        self.name = name
+        self._build = build
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._version: Optional[CatalogVersion] = None
+        self._rebuilding = False
+        self.rebuilds = 0
+
+    def get(self) -> T:
+        version = current_version()
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value, self._version = self._build(version), version
+                return self._value
+        if self._version is not version:
+            self._rebuild_in_background(version)
+        return value
+
+    def _rebuild_in_background(self, version: CatalogVersion):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild, args=(version,), name=f"rebuild-{self.name}", daemon=True
+        ).start()
+
+    def _rebuild(self, version: CatalogVersion):
+        try:
+            value = self._build(version)
+            with self._lock:
+                self._value, self._version = value, version
+                self.rebuilds += 1
+        except Exception as e:
+            # Keep serving the previous build; the next get() tries again
+            print(f"Rebuilding {self.name} failed: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+
+def usable_rows(rows: List, coordinates: bool = False, title: bool = False) -> List:
+    """place_rows() filtered to places with coordinates and/or a title."""
+    return [
+        row
+        for row in rows
+        if (not coordinates or (row.lat is not None and row.lon is not None))
+        and (not title or row.title is not None)
+    ]
@@ -0,0 +1,209 @@
+import os
+import numpy as np
+from sqlalchemy import text
+from ..place_database import engine
+from .catalog_loader import CatalogLoader, CatalogVersion
+from .opening_hours_service import BITMAP_BYTES, intervals_to_bitmap, parse_operating_hours
+from .place_projection_service import PLACE_COLUMNS, place_decoder, select_columns
+
+# "sql" answers place queries from SQLite, "snapshot" from the in-memory arrays below
+PLACES_ENGINE = os.getenv("PLACES_ENGINE", "sql").strip().lower()
+
+EARTH_RADIUS_M = 6371000
+
+
+def enabled() -> bool:
+    return PLACES_ENGINE == "snapshot"
+
+
+class CatalogSnapshot:
+    """
+    Read-only, columnar copy of the places table.
+
+    Row i of every array describes the same place. Types are stored both as a
+    CSR list per place (type_offsets/type_codes) and as an inverted list per
+    type (type_rows) so a type filter is a single fancy-index into a mask.
+    """
+
+    def __init__(self, version: CatalogVersion):
+        self.db_path = version.db_path
+        self.mtime = version.mtime
+        decode = place_decoder()
+        with engine.connect() as conn:
+            rows = [
+                decode(row)
+                for row in conn.execute(
+                    text(f"SELECT {select_columns(PLACE_COLUMNS)} FROM places ORDER BY id")
+                )
+            ]
+
+        n = len(rows)
+        self.rows = rows
+        self.ids = np.fromiter((p["id"] for p in rows), dtype=np.int64, count=n)
+        self.lat = np.full(n, np.nan, dtype=np.float32)
+        self.lon = np.full(n, np.nan, dtype=np.float32)
+        self.poi = np.zeros(n, dtype=np.float32)
+        self.rating = np.full(n, np.nan, dtype=np.float32)
+        # Parsed VND price range; NaN when unknown, +inf for an open upper bound
+        self.price_min = np.full(n, np.nan, dtype=np.float64)
+        self.price_max = np.full(n, np.nan, dtype=np.float64)
+        # Packed minute-of-week opening bitmaps; all-zero rows for unknown hours
+        self.open_bits = np.zeros((n, BITMAP_BYTES), dtype=np.uint8)
+        self.by_place_id = {}
+
+        self.type_vocab = {}
+        type_offsets = [0]
+        type_codes = []
+        for i, place in enumerate(rows):
+            gps = place.get("gps_coordinates")
+            if isinstance(gps, dict):
+                if gps.get("latitude") is not None and gps.get("longitude") is not None:
+                    self.lat[i] = gps["latitude"]
+                    self.lon[i] = gps["longitude"]
+            if place.get("POI_score") is not None:
+                self.poi[i] = place["POI_score"]
+            if place.get("rating") is not None:
+                self.rating[i] = place["rating"]
+            if place.get("price_min") is not None:
+                self.price_min[i] = place["price_min"]
+                self.price_max[i] = (
+                    place["price_max"] if place.get("price_max") is not None else np.inf
+                )
+            if place.get("place_id") is not None:
+                self.by_place_id[place["place_id"]] = i
+            intervals = parse_operating_hours(place.get("operating_hours"))
+            if intervals:
+                self.open_bits[i] = intervals_to_bitmap(intervals)
+
+            type_ids = place.get("type_ids")
+            if isinstance(type_ids, list):
+                for type_id in dict.fromkeys(type_ids):
+                    if type_id is None:
+                        continue
+                    code = self.type_vocab.setdefault(type_id, len(self.type_vocab))
+                    type_codes.append(code)
+            type_offsets.append(len(type_codes))
+
+        self.type_offsets = np.asarray(type_offsets, dtype=np.int32)
+        self.type_codes = np.asarray(type_codes, dtype=np.int32)
+
+        # Invert the CSR lists: for every type code, the sorted row indices
+        owner = np.repeat(np.arange(n, dtype=np.int32), np.diff(self.type_offsets))
+        order = np.argsort(self.type_codes, kind="stable")
+        bounds = np.searchsorted(
+            self.type_codes[order], np.arange(len(self.type_vocab) + 1)
+        )
+        self.type_rows = [
+            owner[order[bounds[c] : bounds[c + 1]]] for c in range(len(self.type_vocab))
+        ]
+        print(f"Loaded catalog snapshot: {n} places, {len(self.type_vocab)} types")
+
+    def type_mask(self, type_id: str):
+        mask = np.zeros(len(self.rows), dtype=bool)
+        code = self.type_vocab.get(type_id)
+        if code is not None:
+            mask[self.type_rows[code]] = True
+        return mask
+
+    def open_mask(self, minute: int):
+        """Places open at `minute` of the week (Monday 00:00 = 0)."""
+        return (self.open_bits[:, minute >> 3] >> (7 - (minute & 7))) & 1 == 1
+
+    def price_mask(self, min_price: int = None, max_price: int = None):
+        """Places whose price range overlaps [min_price, max_price]."""
+        mask = ~np.isnan(self.price_min)
+        with np.errstate(invalid="ignore"):
+            if max_price is not None:
+                mask &= self.price_min <= max_price
+            if min_price is not None:
+                mask &= self.price_max >= min_price
+        return mask
+
+    def distances_m(self, idx, latitude: float, longitude: float):
+        lat = np.radians(self.lat[idx].astype(np.float64))
+        lon = np.radians(self.lon[idx].astype(np.float64))
+        lat0, lon0 = np.radians(latitude), np.radians(longitude)
+        a = (
+            np.sin((lat - lat0) / 2) ** 2
+            + np.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def search(
+        self,
+        type_id: str,
+        box: dict,
+        center=None,
+        radius_m: float = None,
+        limit: int = 50,
+        after=None,
+        open_at: int = None,
+        min_price: int = None,
+        max_price: int = None,
+    ) -> list:
+        """
+        Places of a type inside box (and within radius_m of center, if given,
+        open at minute-of-week open_at, if given, and priced within
+        [min_price, max_price], if given), ordered by
+        (POI_score DESC, id DESC) and starting after the keyset position
+        `after` = (POI_score, id).
+        """
+        with np.errstate(invalid="ignore"):
+            mask = (
+                self.type_mask(type_id)
+                & (self.lat >= box["min_lat"])
+                & (self.lat <= box["max_lat"])
+                & (self.lon >= box["min_lon"])
+                & (self.lon <= box["max_lon"])
+            )
+        if open_at is not None:
+            mask &= self.open_mask(open_at)
+        if min_price is not None or max_price is not None:
+            mask &= self.price_mask(min_price, max_price)
+        if after is not None:
+            score, last_id = np.float32(after[0]), after[1]
+            mask &= (self.poi < score) | ((self.poi == score) & (self.ids < last_id))
+        idx = np.flatnonzero(mask)
+        if center is not None:
+            idx = idx[self.distances_m(idx, *center) < radius_m]
+        order = np.lexsort((-self.ids[idx], -self.poi[idx]))[:limit]
+        return [self.rows[i] for i in idx[order]]
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        type_id: str,
+        radius_m: float,
+        limit: int = 20,
+        open_at: int = None,
+        min_price: int = None,
+        max_price: int = None,
+    ) -> list:
+        """
+        Places of a type within radius_m (open at open_at and priced within
+        [min_price, max_price], if given), nearest first.
+        """
+        mask = self.type_mask(type_id) & ~np.isnan(self.lat)
+        if open_at is not None:
+            mask &= self.open_mask(open_at)
+        if min_price is not None or max_price is not None:
+            mask &= self.price_mask(min_price, max_price)
+        idx = np.flatnonzero(mask)
+        distances = self.distances_m(idx, latitude, longitude)
+        within = distances < radius_m
+        idx, distances = idx[within], distances[within]
+        order = np.lexsort((-self.poi[idx], distances))[:limit]
+        return [self.rows[i] for i in idx[order]]
+
+    def get(self, place_id: str):
+        i = self.by_place_id.get(place_id)
+        return self.rows[i] if i is not None else None
+
+
+_loader = CatalogLoader("catalog snapshot", CatalogSnapshot)
+
+
+def get_snapshot() -> CatalogSnapshot:
+    """Return the current snapshot; a changed catalog DB file is reloaded in the background."""
+    return _loader.get()
@@ -0,0 +1,158 @@
+import re
+from typing import Optional, Tuple
+from sqlalchemy import text
+from .exchangerate_service import rate_table
+
+# Numeric columns derived from costs.originalAmount, in costs.originalCurrency
+COST_COLUMNS = {"amount_min": "REAL", "amount_max": "REAL"}
+
+BACKFILL_CHUNK_SIZE = 500
+
+_STRIP_RE = re.compile(r"[^\d\-–—.]")
+_DASH_RE = re.compile(r"[-–—]")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+
+
+def _number(value: str) -> Optional[float]:
+    match = _NUMBER_RE.match(value)
+    return float(match.group()) if match else None
+
+
+def parse_cost_amount(value) -> Tuple[float, float]:
+    """
+    Parse a cost amount string into (min, max), the way the trip editor's
+    parseAmount() reads it: "100,000" -> (100000, 100000),
+    "1—100,000" -> (1, 100000); anything unreadable is (0, 0).
+    """
+    if isinstance(value, (int, float)):
+        return float(value), float(value)
+    cleaned = _STRIP_RE.sub("", value or "")
+    if _DASH_RE.search(cleaned):
+        low, high = (_DASH_RE.split(cleaned) + [""])[:2]
+        low, high = _number(low), _number(high)
+        if low is None:
+            low = high
+        if high is None:
+            high = low
+        return (low, high) if low is not None else (0.0, 0.0)
+    number = _number(cleaned)
+    return (number, number) if number is not None else (0.0, 0.0)
+
+
+def cost_columns(value) -> dict:
+    """parse_cost_amount() as a dict of the costs columns it fills."""
+    return dict(zip(COST_COLUMNS, parse_cost_amount(value)))
+
+
+def ensure_cost_columns(conn):
+    """
+    Add the numeric amount columns to a user DB created before they
+    existed, filling them from costs.originalAmount.
+    """
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_info(costs)"))}
+    missing = [c for c in COST_COLUMNS if c not in existing]
+    for column in missing:
+        conn.execute(text(f"ALTER TABLE costs ADD COLUMN {column} {COST_COLUMNS[column]}"))
+    if missing:
+        backfill_costs(conn)
+
+
+def backfill_costs(conn):
+    """Recompute the numeric amount columns of every cost."""
+    rows = conn.execute(text('SELECT id, "originalAmount" FROM costs')).fetchall()
+    update = text(
+        "UPDATE costs SET amount_min = :amount_min, amount_max = :amount_max WHERE id = :id"
+    )
+    for start in range(0, len(rows), BACKFILL_CHUNK_SIZE):
+        chunk = rows[start : start + BACKFILL_CHUNK_SIZE]
+        conn.execute(update, [{"id": row.id, **cost_columns(row[1])} for row in chunk])
+
+
+def _add(total: dict, low: float, high: float):
+    total["min"] += low
+    total["max"] += high
+
+
+async def trip_cost_summary(db, trip_id: int, default_currency: str, currency: str) -> dict:
+    """
+    Costs of a trip summed per day, per destination and per original
+    currency, converted to `currency`. The amounts are summed by one
+    GROUP BY over the numeric columns; each (day, destination, currency)
+    group is then converted once with the cached rate table.
+    """
+    await rate_table.ready()
+    currency = currency.lower()
+    rows = (
+        await db.execute(
+            text(
+                """
+                SELECT days.day_number, destinations.id AS destination_id,
+                    destinations.name,
+                    lower(coalesce(nullif(costs."originalCurrency", ''), :default_currency)) AS currency,
+                    count(*) AS count,
+                    total(costs.amount_min) AS amount_min,
+                    total(costs.amount_max) AS amount_max
+                FROM costs
+                JOIN destinations ON destinations.id = costs.destination_id
+                JOIN days ON days.id = destinations.day_id
+                WHERE days.trip_id = :trip_id
+                GROUP BY days.id, destinations.id, currency
+                ORDER BY days.day_number, destinations."order", destinations.id
+                """
+            ),
+            {"trip_id": trip_id, "default_currency": default_currency},
+        )
+    ).fetchall()
+
+    total = {"min": 0.0, "max": 0.0}
+    days, destinations, currencies, unsupported = {}, {}, {}, set()
+    for row in rows:
+        rate = rate_table.rate(row.currency, currency)
+        if rate is None:
+            unsupported.add(row.currency)
+            continue
+        rate = float(rate)
+        low, high = row.amount_min * rate, row.amount_max * rate
+
+        day = days.setdefault(
+            row.day_number,
+            {"day_number": row.day_number, "min": 0.0, "max": 0.0, "destinations": []},
+        )
+        destination = destinations.get(row.destination_id)
+        if destination is None:
+            destination = destinations[row.destination_id] = {
+                "destination_id": row.destination_id,
+                "name": row.name,
+                "count": 0,
+                "min": 0.0,
+                "max": 0.0,
+            }
+            day["destinations"].append(destination)
+        by_currency = currencies.setdefault(
+            row.currency,
+            {
+                "currency": row.currency.upper(),
+                "count": 0,
+                "original_min": 0.0,
+                "original_max": 0.0,
+                "min": 0.0,
+                "max": 0.0,
+            },
+        )
+        destination["count"] += row.count
+        by_currency["count"] += row.count
+        by_currency["original_min"] += row.amount_min
+        by_currency["original_max"] += row.amount_max
+        for bucket in (total, day, destination, by_currency):
+            _add(bucket, low, high)
+
+    return {
+        "status": "success",
+        "trip_id": trip_id,
+        "currency": currency.upper(),
+        "rates_date": rate_table.date,
+        "total": total,
+        "days": list(days.values()),
+        "by_currency": list(currencies.values()),
+        "unsupported_currencies": sorted(code.upper() for code in unsupported),
+    }
@@ -1,26 +1,141 @@
-import requests, json
+import asyncio
+import json
+import time
 from decimal import Decimal
+from typing import Optional
+from . import http_client
 
 _EXCHANGE_API_URLS = [
-    "https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies", 
+    "https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies",
     "https://latest.currency-api.pages.dev/v1/currencies"
 ]
 
+# Every pair is converted through this base's table: its rates are units
+# of each currency per one unit of the base, so a -> b is rate[b] / rate[a]
+BASE_CURRENCY = "usd"
+# The API publishes new rates once a day
+TTL_SECONDS = 6 * 3600
+# Wait before trying again after both mirrors failed
+RETRY_SECONDS = 5 * 60
+
+
+class RateTable:
+    """
+    The last good rate table of BASE_CURRENCY. A background task refreshes
+    it every TTL_SECONDS, trying each mirror in turn; when all of them fail
+    the previous table keeps being served. Conversions only read it.
+    """
+
+    def __init__(self, base: str = BASE_CURRENCY):
+        self.base = base
+        self.rates = None
+        self.date = None
+        self.fetched_at = None
+        self.source = None
+        self.last_error = None
+        self.refreshes = 0
+        self.failures = 0
+        self._inflight = None
+        self._task = None
+
+    async def _fetch(self) -> bool:
+        for url in _EXCHANGE_API_URLS:
+            try:
+                r = await http_client.get("exchangerate", url + f"/{self.base}.min.json")
+                if r.status_code != 200:
+                    self.last_error = f"{url}: HTTP {r.status_code}"
+                    continue
+                data = json.loads(r.text, parse_float=Decimal, parse_int=Decimal)
+                rates = {
+                    code: rate
+                    for code, rate in data[self.base].items()
+                    if isinstance(rate, Decimal) and rate > 0
+                }
+            except Exception as e:
+                self.last_error = f"{url}: {e}"
+                continue
+            rates[self.base] = Decimal(1)
+            self.rates = rates
+            self.date = data.get("date")
+            self.fetched_at = time.time()
+            self.source = url
+            self.last_error = None
+            self.refreshes += 1
+            return True
+        self.failures += 1
+        print(f"Exchange rate refresh failed, keeping the table of {self.date}: {self.last_error}")
+        return False
+
+    async def refresh(self) -> bool:
+        """Download the table now; concurrent callers share one download."""
+        task = self._inflight
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight = asyncio.ensure_future(self._fetch())
+        return await asyncio.shield(task)
+
+    async def _refresh_loop(self):
+        while True:
+            ok = await self.refresh()
+            await asyncio.sleep(TTL_SECONDS if ok else RETRY_SECONDS)
+
+    def start(self):
+        """Start refreshing in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def ready(self):
+        """
+        Make sure there is a table to convert with. Only waits for the
+        network before the first table has been loaded.
+        """
+        if self.rates is None and not await self.refresh():
+            raise RuntimeError("Unable to connect to the exchange rate API.")
+
+    def rate(self, source_currency: str, to_currency: str) -> Optional[Decimal]:
+        """Units of to_currency per unit of source_currency, or None for an unknown code."""
+        source = self.rates.get(source_currency.lower())
+        to = self.rates.get(to_currency.lower())
+        if source is None or to is None:
+            return None
+        return to / source
+
+    def stats(self) -> dict:
+        return {
+            "base": self.base,
+            "date": self.date,
+            "currencies": len(self.rates) if self.rates else 0,
+            "age_s": time.time() - self.fetched_at if self.fetched_at else None,
+            "source": self.source,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+rate_table = RateTable()
+
+
 # Source currency and to currency are currency code strings: e.g. "usd", "gbp", ...
 # Read here: https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies.json
 # WARNING! Pass a decimal.Decimal in, not a float!
-def _convert(amount: Decimal, source_currency, to_currency):
-    for url in _EXCHANGE_API_URLS:
-        r = requests.get(url + f"/{source_currency}.min.json")
-        if r.status_code != 200: continue
-        
-        return amount * json.loads(r.text, parse_float=Decimal)[source_currency][to_currency]
-
-    raise RuntimeError("Unable to connect to the exchange rate API.")
-
-def convertVNDtoUSD(amount):
-    return _convert(amount, "vnd", "usd")
+async def convert(amount: Decimal, source_currency, to_currency):
+    await rate_table.ready()
+    rate = rate_table.rate(source_currency, to_currency)
+    if rate is None:
+        raise ValueError(f"Unsupported currency pair: {source_currency} -> {to_currency}")
+    return amount * rate
 
-def convertUSDtoVND(amount):
-    return _convert(amount, "usd", "vnd")
+async def convertVNDtoUSD(amount):
+    return await convert(amount, "vnd", "usd")
 
+async def convertUSDtoVND(amount):
+    return await convert(amount, "usd", "vnd")
@@ -1,6 +1,7 @@
 import os
-import requests
+import httpx
 from typing import Optional, List, Dict, Any
+from . import http_client
 
 # Foursquare Places API Configuration
 FOURSQUARE_BASE_URL = "https://places-api.foursquare.com/places"
@@ -20,7 +21,33 @@ def _get_headers() -> Dict[str, str]:
     }
 
 
-def search_places(
+async def _get(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """GET a Foursquare endpoint; {"success", "data"} or {"success": False, "error"}"""
+    try:
+        response = await http_client.get(
+            "foursquare", url, params=params, headers=_get_headers()
+        )
+        response.raise_for_status()
+
+        return {
+            "success": True,
+            "data": response.json()
+        }
+
+    except httpx.HTTPStatusError as e:
+        return {
+            "success": False,
+            "error": f"HTTP error: {e}",
+            "status_code": e.response.status_code
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+async def search_places(
     ll: Optional[str] = None,
     near: Optional[str] = None,
     query: Optional[str] = None,
@@ -46,52 +73,31 @@ def search_places(
     Returns:
         Dictionary containing search results
     """
-    try:
-        url = f"{FOURSQUARE_BASE_URL}/search"
-        headers = _get_headers()
-
-        params = {"limit": limit}
-
-        # Add location parameters
-        if ll:
-            params["ll"] = ll
-        if near:
-            params["near"] = near
-        if ne:
-            params["ne"] = ne
-        if sw:
-            params["sw"] = sw
-        if radius:
-            params["radius"] = radius
-
-        # Add search filters
-        if query:
-            params["query"] = query
-        if categories:
-            params["categories"] = categories
-
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-
-        return {
-            "success": True,
-            "data": response.json()
-        }
-
-    except requests.exceptions.HTTPError as e:
-        return {
-            "success": False,
-            "error": f"HTTP error: {e}",
-            "status_code": e.response.status_code if e.response else None
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
-
-def get_place_details(
+    url = f"{FOURSQUARE_BASE_URL}/search"
+    params = {"limit": limit}
+
+    # Add location parameters
+    if ll:
+        params["ll"] = ll
+    if near:
+        params["near"] = near
+    if ne:
+        params["ne"] = ne
+    if sw:
+        params["sw"] = sw
+    if radius:
+        params["radius"] = radius
+
+    # Add search filters
+    if query:
+        params["query"] = query
+    if categories:
+        params["categories"] = categories
+
+    return await _get(url, params)
+
+
+async def get_place_details(
     fsq_place_id: str,
     fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
@@ -105,36 +111,14 @@ def get_place_details(
     Returns:
         Dictionary containing place details
     """
-    try:
-        url = f"{FOURSQUARE_BASE_URL}/{fsq_place_id}"
-        headers = _get_headers()
-
-        params = {}
-        if fields:
-            params["fields"] = ",".join(fields)
-
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-
-        return {
-            "success": True,
-            "data": response.json()
-        }
+    params = {}
+    if fields:
+        params["fields"] = ",".join(fields)
 
-    except requests.exceptions.HTTPError as e:
-        return {
-            "success": False,
-            "error": f"HTTP error: {e}",
-            "status_code": e.response.status_code if e.response else None
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await _get(f"{FOURSQUARE_BASE_URL}/{fsq_place_id}", params)
 
 
-def get_place_tips(fsq_place_id: str) -> Dict[str, Any]:
+async def get_place_tips(fsq_place_id: str) -> Dict[str, Any]:
     """
     Get user-generated tips/reviews for a specific place
 
@@ -144,32 +128,10 @@ def get_place_tips(fsq_place_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing tips data
     """
-    try:
-        url = f"{FOURSQUARE_BASE_URL}/{fsq_place_id}/tips"
-        headers = _get_headers()
-
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        return {
-            "success": True,
-            "data": response.json()
-        }
-
-    except requests.exceptions.HTTPError as e:
-        return {
-            "success": False,
-            "error": f"HTTP error: {e}",
-            "status_code": e.response.status_code if e.response else None
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await _get(f"{FOURSQUARE_BASE_URL}/{fsq_place_id}/tips")
 
 
-def get_place_photos(fsq_place_id: str) -> Dict[str, Any]:
+async def get_place_photos(fsq_place_id: str) -> Dict[str, Any]:
     """
     Get photos for a specific place
 
@@ -179,26 +141,4 @@ def get_place_photos(fsq_place_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing photos data
     """
-    try:
-        url = f"{FOURSQUARE_BASE_URL}/{fsq_place_id}/photos"
-        headers = _get_headers()
-
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        return {
-            "success": True,
-            "data": response.json()
-        }
-
-    except requests.exceptions.HTTPError as e:
-        return {
-            "success": False,
-            "error": f"HTTP error: {e}",
-            "status_code": e.response.status_code if e.response else None
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await _get(f"{FOURSQUARE_BASE_URL}/{fsq_place_id}/photos")
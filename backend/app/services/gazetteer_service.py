@@ -0,0 +1,160 @@
+import json
+from typing import Optional
+import numpy as np
+from .catalog_loader import CatalogLoader, CatalogVersion, usable_rows
+from .place_search_service import normalized_words
+
+# A local match is used without asking Nominatim from this coverage up: the
+# share of the matched name's words that the query contains (every query
+# word must be in the name), so 1.0 is the whole name.
+MIN_COVERAGE = 0.75
+# Trailing ", <city>" parts of a query restrict the match to that city; a
+# query that is only a city resolves to the centre of its places. Each
+# city_name's first part ("HCMC" for "HCMC, Vietnam") is an alias as well.
+CITY_ALIASES = {
+    "ho chi minh city": "HCMC, Vietnam",
+    "ho chi minh": "HCMC, Vietnam",
+    "thanh pho ho chi minh": "HCMC, Vietnam",
+    "tp ho chi minh": "HCMC, Vietnam",
+    "tp hcm": "HCMC, Vietnam",
+    "saigon": "HCMC, Vietnam",
+    "sai gon": "HCMC, Vietnam",
+    "da lat": "Dalat, Vietnam",
+    "thanh pho da lat": "Dalat, Vietnam",
+    "thanh pho hue": "Hue, Vietnam",
+}
+COUNTRY_ALIASES = {"vietnam", "viet nam"}
+
+
+class Gazetteer:
+    """
+    Word index over every name of the catalog's places (title, en_names,
+    vi_names), ignoring diacritics and word order. A lookup intersects the
+    postings of the query words and scores each name containing all of them
+    by how much of the name the query covers.
+    """
+
+    def __init__(self, version: CatalogVersion):
+        self.db_path = version.db_path
+        self.mtime = version.mtime
+        rows = usable_rows(version.place_rows(), coordinates=True, title=True)
+
+        self.places = [
+            {
+                "place_id": row.place_id,
+                "title": row.title,
+                "address": row.address,
+                "city_name": row.city_name,
+            }
+            for row in rows
+        ]
+        self.lat = np.array([float(row.lat) for row in rows])
+        self.lon = np.array([float(row.lon) for row in rows])
+        self.score = np.array([row.POI_score or 0.0 for row in rows], dtype=np.float64)
+        self.city_codes = {}
+        self.city_code = np.array(
+            [self.city_codes.setdefault(row.city_name, len(self.city_codes)) for row in rows],
+            dtype=np.int32,
+        )
+
+        # One entry per distinct word set of a place's names
+        self.postings = {}
+        name_row, name_size = [], []
+        for i, row in enumerate(rows):
+            names = [row.title]
+            for column in (row.en_names, row.vi_names):
+                try:
+                    values = json.loads(column) if column else None
+                except ValueError:
+                    values = None
+                if isinstance(values, list):
+                    names.extend(v for v in values if isinstance(v, str))
+            for words in dict.fromkeys(frozenset(normalized_words(name)) for name in names):
+                if not words:
+                    continue
+                for word in words:
+                    self.postings.setdefault(word, []).append(len(name_row))
+                name_row.append(i)
+                name_size.append(len(words))
+        self.postings = {
+            word: np.array(ids, dtype=np.int32) for word, ids in self.postings.items()
+        }
+        self.name_row = np.array(name_row, dtype=np.int32)
+        self.name_size = np.array(name_size, dtype=np.int32)
+
+        self.city_alias = dict(CITY_ALIASES)
+        for city in self.city_codes:
+            if city:
+                self.city_alias[" ".join(normalized_words(city.split(",")[0]))] = city
+        print(f"Loaded gazetteer: {len(rows)} places, {len(self.postings)} words")
+
+    def _city_center(self, city: str) -> Optional[dict]:
+        code = self.city_codes.get(city)
+        if code is None:
+            return None
+        members = self.city_code == code
+        return {
+            "lat": float(self.lat[members].mean()),
+            "lon": float(self.lon[members].mean()),
+            "display_name": city,
+            "source": "local",
+            "coverage": 1.0,
+            "place_id": None,
+            "city_name": city,
+        }
+
+    def lookup(self, query: str) -> Optional[dict]:
+        """
+        Best catalog match for a free-text query, with its coverage, or None
+        when no place name contains every query word.
+        """
+        parts = [" ".join(normalized_words(part)) for part in query.split(",")]
+        parts = [part for part in parts if part]
+        city = None
+        # Peel trailing city/country qualifiers: "Nha hat Ben Thanh, Saigon, Vietnam"
+        while parts and (parts[-1] in COUNTRY_ALIASES or parts[-1] in self.city_alias):
+            last = parts.pop()
+            if last in self.city_alias and city is None:
+                city = self.city_alias[last]
+        if not parts:
+            return self._city_center(city) if city else None
+
+        words = set(" ".join(parts).split())
+        if any(word not in self.postings for word in words):
+            return None
+        ids = None
+        for word in sorted(words, key=lambda w: len(self.postings[w])):
+            ids = self.postings[word] if ids is None else np.intersect1d(
+                ids, self.postings[word], assume_unique=True
+            )
+            if not len(ids):
+                return None
+        rows = self.name_row[ids]
+        if city is not None:
+            keep = self.city_code[rows] == self.city_codes.get(city, -1)
+            ids, rows = ids[keep], rows[keep]
+            if not len(ids):
+                return None
+        coverage = len(words) / self.name_size[ids]
+        # Highest coverage, then most popular
+        best = int(rows[np.lexsort((-self.score[rows], -coverage))[0]])
+        place = self.places[best]
+        return {
+            "lat": float(self.lat[best]),
+            "lon": float(self.lon[best]),
+            "display_name": ", ".join(
+                v for v in (place["title"], place["address"] or place["city_name"]) if v
+            ),
+            "source": "local",
+            "coverage": float(coverage.max()),
+            "place_id": place["place_id"],
+            "city_name": place["city_name"],
+        }
+
+
+_loader = CatalogLoader("gazetteer", Gazetteer)
+
+
+def get_gazetteer() -> Gazetteer:
+    """Return the current gazetteer; a changed catalog DB file is reloaded in the background."""
+    return _loader.get()
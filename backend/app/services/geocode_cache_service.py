@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Awaitable, Callable, Optional, Tuple
+
+# Persistent cache of forward geocoding results by normalized query
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "app/geocode_cache.db")
+TTL_SECONDS = 90 * 24 * 3600
+# Queries Nominatim found nothing for are retried sooner
+NOT_FOUND_TTL_SECONDS = 24 * 3600
+MAX_ENTRIES = 50_000
+# Least recently used rows are evicted in batches once the table is this much over its cap
+EVICT_SLACK = 0.05
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: NFC, case-folded, whitespace collapsed, outer punctuation trimmed."""
+    query = unicodedata.normalize("NFC", query).casefold()
+    return _SPACES.sub(" ", query).strip(" ,.;")
+
+
+class GeocodeCache:
+    """
+    SQLite-backed geocode cache with TTL expiry and LRU eviction. A row's
+    result is the geocode_location() body, or NULL when nothing was found.
+    Concurrent misses for the same query share one upstream call (coalesce()).
+    get() and put() block on SQLite: async callers run them with
+    asyncio.to_thread().
+    """
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        # Row count, kept up to date by put/get/evict instead of a count(*) per insert
+        self._count = 0
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS geocodes (
+                    key TEXT PRIMARY KEY,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_geocodes_accessed ON geocodes (accessed_at);
+                """
+            )
+            self._count = conn.execute("SELECT count(*) FROM geocodes").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Tuple[bool, Optional[dict]]:
+        """(True, result) for a cached, unexpired key (result None = not found), else (False, None)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT result, created_at FROM geocodes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                ttl = TTL_SECONDS if row[0] is not None else NOT_FOUND_TTL_SECONDS
+                if now - row[1] > ttl:
+                    conn.execute("DELETE FROM geocodes WHERE key = ?", (key,))
+                    self._count -= 1
+                    self.expired += 1
+                    row = None
+                else:
+                    conn.execute(
+                        "UPDATE geocodes SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                conn.commit()
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    def put(self, key: str, result: Optional[dict]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            exists = conn.execute("SELECT 1 FROM geocodes WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO geocodes (key, result, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(result) if result is not None else None, now, now),
+            )
+            if exists is None:
+                self._count += 1
+            if self._count > MAX_ENTRIES * (1 + EVICT_SLACK):
+                evicted = conn.execute(
+                    "DELETE FROM geocodes WHERE key IN "
+                    "(SELECT key FROM geocodes ORDER BY accessed_at LIMIT ?)",
+                    (self._count - MAX_ENTRIES,),
+                ).rowcount
+                self._count -= evicted
+                self.evictions += evicted
+            conn.commit()
+
+    async def coalesce(self, key: str, fetch: Callable[[], Awaitable]):
+        """
+        Await fetch() for `key`, or join the call already in flight for it.
+        The shared call is shielded, so one caller going away does not cancel
+        it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(
+                lambda done: self._inflight.pop(key)
+                if self._inflight.get(key) is done
+                else None
+            )
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._connect()
+            entries = self._count
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+geocode_cache = GeocodeCache()
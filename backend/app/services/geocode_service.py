@@ -1,5 +1,11 @@
-import requests
-import polyline
+import asyncio
+import httpx
+import numpy as np
+from . import gazetteer_service, http_client, polyline_service
+from .gazetteer_service import get_gazetteer
+from .geocode_cache_service import geocode_cache, normalize_query
+from .route_cache_service import leg_key, order_key, point_key, route_cache
+from .tour_optimizer_service import distance_matrix, duration_matrix, optimize_order
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org"
 OSRM_URL = "https://router.project-osrm.org"
@@ -7,40 +13,239 @@ OSRM_URL = "https://router.project-osrm.org"
 HEADERS = {"User-Agent": "SmartTravel/1.0 (contact: a@gmail.com)"}
 
 
-def geocode_location(query: str):
-    try:
-        response = requests.get(
-            f"{NOMINATIM_URL}/search",
-            params={"q": query, "format": "jsonv2", "limit": 1},
-            headers=HEADERS,
-            timeout=10,
-        )
-        response.raise_for_status()
-        data = response.json()
-        if not data:
-            return None
+async def _nominatim_search(query: str, key: str):
+    """One Nominatim /search call (rate limited by http_client), cached under `key`."""
+    response = await http_client.get(
+        "nominatim",
+        f"{NOMINATIM_URL}/search",
+        params={"q": query, "format": "jsonv2", "limit": 1},
+        headers=HEADERS,
+    )
+    response.raise_for_status()
+    data = response.json()
+    result = None
+    if data:
         item = data[0]
-        return {
+        result = {
             "lat": float(item["lat"]),
             "lon": float(item["lon"]),
             "display_name": item["display_name"],
+            "score": item.get("importance"),
         }
+    await asyncio.to_thread(geocode_cache.put, key, result)
+    return result
+
+
+async def _nominatim_lookup(query: str):
+    """
+    Nominatim's first match for `query`. Answers are cached by normalized
+    query, and concurrent lookups of the same query share one call.
+    """
+    key = normalize_query(query)
+    found, result = await asyncio.to_thread(geocode_cache.get, key)
+    if not found:
+        result = await geocode_cache.coalesce(key, lambda: _nominatim_search(query, key))
+    return {**result, "source": "nominatim"} if result else None
+
+
+async def geocode_location(query: str, source: str = "auto"):
+    """
+    {"lat", "lon", "display_name", "source", ...} for `query`, None when
+    nothing matches. Local (catalog gazetteer) answers carry the "coverage"
+    of the matched name, Nominatim answers its "score" (importance).
+    source="auto" answers locally when the coverage is at least
+    gazetteer_service.MIN_COVERAGE and asks Nominatim otherwise, keeping a
+    weaker local match if Nominatim has nothing or cannot be reached;
+    "local" and "nominatim" use only that source.
+    """
+    local = None
+    try:
+        if source != "nominatim":
+            local = get_gazetteer().lookup(query)
+            if source == "local" or (local and local["coverage"] >= gazetteer_service.MIN_COVERAGE):
+                return local
+        try:
+            return await _nominatim_lookup(query) or local
+        except Exception:
+            if local is None:
+                raise
+            return local
     except Exception as e:
         return {"error": str(e)}
 
 
-def route_osrm(points):
+def _leg_geometry(steps) -> str:
+    """
+    One polyline for a leg from its step polylines. Each OSRM step starts at
+    its maneuver location, where the previous step ends, so the encoded steps
+    are spliced without decoding; steps that do not line up are decoded.
+    """
+    steps = [step for step in steps if step.get("geometry")]
+    contiguous = all(
+        polyline_service.first_point(step["geometry"])
+        == tuple(
+            round(c * polyline_service.PRECISION)
+            for c in reversed(step.get("maneuver", {}).get("location", ()))
+        )
+        for step in steps
+    )
+    if contiguous:
+        return polyline_service.join(step["geometry"] for step in steps)
+    points = [polyline_service.decode(step["geometry"]) for step in steps]
+    return polyline_service.encode(np.concatenate(points)) if points else None
+
+
+def _parse_leg(leg: dict) -> dict:
+    """Distance, duration, encoded geometry and turn instructions of an OSRM leg."""
+    steps = leg.get("steps", [])
+    instructions = []
+    for step in steps:
+        maneuver = step.get("maneuver", {})
+        instructions.append(
+            {
+                "type": maneuver.get("type", ""),
+                "modifier": maneuver.get("modifier", ""),
+                "name": step.get("name", ""),
+            }
+        )
+    return {
+        "distance": leg.get("distance", 0),
+        "duration": leg.get("duration", 0),
+        "geometry": _leg_geometry(steps),
+        "instructions": instructions,
+    }
+
+
+def _order_points(points, stops):
+    """Reorder points to follow the cached stop keys; None if they do not match."""
+    by_key = {}
+    for point in points:
+        by_key.setdefault(point_key(point), []).append(point)
+    ordered = []
+    for stop in stops:
+        candidates = by_key.get(stop)
+        if not candidates:
+            return None
+        ordered.append(candidates.pop(0))
+    return ordered if len(ordered) == len(points) else None
+
+
+async def _osrm_legs(ordered_points, profile):
+    """Legs between consecutive points, from the cache or one OSRM /route call."""
+    keys = [
+        leg_key(profile, a, b) for a, b in zip(ordered_points, ordered_points[1:])
+    ]
+    legs = await asyncio.to_thread(route_cache.get_legs, keys)
+    if len(legs) < len(set(keys)):
+        coords = ";".join(f"{point['lon']},{point['lat']}" for point in ordered_points)
+        r = await http_client.get(
+            "osrm",
+            f"{OSRM_URL}/route/v1/{profile}/{coords}",
+            params={"overview": "false", "steps": "true"},
+        )
+        r.raise_for_status()
+        data = r.json()
+        if not data.get("routes"):
+            raise ValueError("No routes found")
+        fetched = dict(zip(keys, (_parse_leg(leg) for leg in data["routes"][0]["legs"])))
+        await asyncio.to_thread(route_cache.put_legs, fetched)
+        legs.update(fetched)
+    return [legs[key] for key in keys]
+
+
+def _route_result(ordered_points, legs, options, **extra):
+    """
+    Response body for an ordered route. The overview geometry is the legs
+    joined end to end; with a tolerance every polyline is simplified.
+    """
+    instructions, tolerance_m, zoom = options
+    if zoom is not None and tolerance_m is None and ordered_points:
+        latitude = sum(float(p["lat"]) for p in ordered_points) / len(ordered_points)
+        tolerance_m = polyline_service.tolerance_for_zoom(zoom, latitude)
+    segments = [leg["geometry"] for leg in legs]
+    if tolerance_m:
+        # Simplified legs keep their end points, so they still join up
+        segments = polyline_service.simplify_joined(segments, tolerance_m)
+    geometry = polyline_service.join(segments)
+    result = {
+        "success": True,
+        "optimized_route": ordered_points,
+        "distance_km": sum(leg["distance"] for leg in legs) / 1000,
+        "duration_min": sum(leg["duration"] for leg in legs) / 60,
+        "geometry": geometry,
+        "segment_geometries": segments,
+        **extra,
+    }
+    if instructions:
+        result["instructions"] = [leg["instructions"] for leg in legs]
+    return result
+
+
+async def route_local(
+    points, profile="driving", instructions=False, tolerance_m=None, zoom=None
+):
+    """
+    Order the stops in-process (tour_optimizer_service) and take leg geometry
+    from the route cache or one OSRM /route call. When OSRM cannot be reached
+    the order is still returned, with straight-line legs and "approximate": True.
+    """
+    options = (instructions, tolerance_m, zoom)
+    try:
+        # The solver is CPU-bound; keep it off the event loop
+        cost = await asyncio.to_thread(duration_matrix, points, profile)
+        order = await asyncio.to_thread(optimize_order, points, profile, cost=cost)
+        ordered = [points[i] for i in order]
+        try:
+            legs = await _osrm_legs(ordered, profile)
+        except httpx.HTTPError:
+            distances = distance_matrix(ordered)
+            legs = [
+                {
+                    "distance": float(distances[i, i + 1]),
+                    "duration": float(cost[a, b]),
+                    "geometry": None,
+                    "instructions": [],
+                }
+                for i, (a, b) in enumerate(zip(order, order[1:]))
+            ]
+            return _route_result(ordered, legs, options, approximate=True)
+        return _route_result(ordered, legs, options)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+async def route_osrm(
+    points, profile="driving", instructions=False, tolerance_m=None, zoom=None
+):
+    """
+    Order the stops with OSRM /trip (first stop fixed, open-ended). Per-step
+    instructions are included only when asked for; tolerance_m (metres) or
+    zoom (map zoom level) simplify the returned polylines.
+    """
+    options = (instructions, tolerance_m, zoom)
     try:
+        # A plan whose stop set was already optimized (in any order, with the
+        # same first stop) is rebuilt from cached legs without calling /trip
+        cache_key = order_key(profile, points)
+        stops = await asyncio.to_thread(route_cache.get_order, cache_key)
+        ordered = _order_points(points, stops) if stops else None
+        if ordered is not None:
+            return _route_result(ordered, await _osrm_legs(ordered, profile), options)
+
         coords = ";".join([f"{point['lon']},{point['lat']}" for point in points])
-        r = requests.get(
-            f"{OSRM_URL}/trip/v1/driving/{coords}",
+        r = await http_client.get(
+            "osrm",
+            f"{OSRM_URL}/trip/v1/{profile}/{coords}",
+            # Leg polylines are built from the steps, and the overview from the legs
             params={
-                "overview": "full",
+                "overview": "false",
                 "steps": "true",
                 "source": "first",
                 "roundtrip": "false",
             },
-            timeout=120,
         )
         r.raise_for_status()
         data = r.json()
@@ -62,47 +267,19 @@ def route_osrm(points):
             ordered_indices = waypoint_order
 
         optimized_points = [points[i] for i in ordered_indices]
+        legs = [_parse_leg(leg) for leg in data["trips"][0]["legs"]]
 
-        segment_geometries = []
-        for leg in data["trips"][0]["legs"]:
-            all_coords = []
-            for step in leg.get("steps", []):
-                geom = step.get("geometry")
-                if geom:
-                    coords = polyline.decode(geom)
-                    all_coords.extend(coords)
-            if all_coords:
-                # Encode the full list of coordinates as a polyline string
-                segment_geometries.append(polyline.encode(all_coords))
-            else:
-                segment_geometries.append(None)
-
-        instructions = []
-        for leg in data["trips"][0]["legs"]:
-            leg_instructions = []
-            for step in leg.get("steps", []):
-                maneuver = step.get("maneuver", {})
-                road_name = step.get("name", "")
-                # Separate direction and name
-                direction = f"{maneuver.get('type', '').capitalize()} {maneuver.get('modifier', '')}".strip()
-                leg_instructions.append(
-                    {
-                        "type": maneuver.get("type", ""),
-                        "modifier": maneuver.get("modifier", ""),
-                        "name": road_name,
-                    }
-                )
-            instructions.append(leg_instructions)
-
-        return {
-            "success": True,
-            "optimized_route": optimized_points,
-            "distance_km": data["trips"][0]["distance"] / 1000,
-            "duration_min": data["trips"][0]["duration"] / 60,
-            "geometry": data["trips"][0].get("geometry"),
-            "segment_geometries": segment_geometries,
-            "instructions": instructions,
-        }
+        await asyncio.to_thread(
+            route_cache.put_legs,
+            {
+                leg_key(profile, a, b): leg
+                for a, b, leg in zip(optimized_points, optimized_points[1:], legs)
+            },
+        )
+        await asyncio.to_thread(
+            route_cache.put_order, cache_key, [point_key(p) for p in optimized_points]
+        )
+        return _route_result(optimized_points, legs, options)
 
     except Exception as e:
         return {
@@ -7,8 +7,9 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from groq import Groq
-from ..place_models import Place
-from sqlalchemy.types import JSON, Float, Integer
+from ..services.itinerary_planner_service import plan_city_days
+from ..services.place_search_service import search_places_text
+from ..services.place_service import get_places_by_ids
 
 # categories_path = os.path.join(os.path.dirname(__file__), "..", "categories.json")
 # with open(categories_path, "r", encoding="utf-8") as f:
@@ -176,6 +177,31 @@ Paragraph:
 #         return {"error": str(e)}
 
 
+def trip_day_count(trip_info: TripInfo) -> int:
+    """Days between start_day and end_day (inclusive), 1 when unknown."""
+    try:
+        start = datetime.date.fromisoformat(trip_info.start_day)
+        end = datetime.date.fromisoformat(trip_info.end_day)
+    except ValueError:
+        return 1
+    return max(1, (end - start).days + 1)
+
+
+def plan_itinerary_days(itinerary: GeminiResult, db: Session):
+    """Catalog places for the itinerary's categories, clustered into its days."""
+    try:
+        return plan_city_days(
+            db,
+            itinerary.starting_point,
+            [c.name for c in itinerary.categories if not c.additional],
+            [c.name for c in itinerary.categories if c.additional],
+            trip_day_count(itinerary.trip_info),
+        )
+    except Exception as e:
+        print("Day planning failed:", e)
+        return None
+
+
 def load_commands():
     command_path = os.path.join(os.path.dirname(__file__), "..", "commands.json")
     with open(command_path, "r", encoding="utf-8") as f:
@@ -254,6 +280,7 @@ Return your answer as a JSON object: {{"natural_expression": "<expression>"}}
         return {
             "command": "create_itinerary",
             "itinerary": categories,
+            "days": plan_itinerary_days(categories, db),
             "response_en": response_en,
             "response_vi": response_vi,
         }
@@ -613,20 +640,16 @@ Instruction: {user_prompt}
             return {"error": "No destination found in prompt."}
 
         matches = manual_search_places(destination, db, limit=10)
-        # Optionally, fetch full records from places table as you do now
+        # Fetch the full records of all matches in one query
+        places = get_places_by_ids(db, [match.get("place_id") for match in matches])
+        places_by_id = {place["place_id"]: place for place in places}
         full_matches = []
         for match in matches:
             place_id = match.get("place_id")
-            if place_id:
-                place_sql = text("SELECT * FROM places WHERE place_id = :id")
-                place_row = db.execute(place_sql, {"id": place_id}).fetchone()
-                if place_row:
-                    full_matches.append(dict(place_row._mapping))
-                else:
-                    print("No full place record found for match:", match)
-                    full_matches.append(dict(match))
+            if place_id in places_by_id:
+                full_matches.append(places_by_id[place_id])
             else:
-                print("No place_id in match:", match)
+                print("No full place record found for match:", match)
                 full_matches.append(dict(match))
         return {"destination": destination, "matches": full_matches}
     except Exception as e:
@@ -634,9 +657,8 @@ Instruction: {user_prompt}
 
 
 def manual_search_places(query: str, db: Session, limit: int = 20):
-    sql = text("SELECT * FROM places_search WHERE title MATCH :q LIMIT :limit")
-    results = db.execute(sql, {"q": query, "limit": limit}).mappings().all()
-    return list(results)
+    # Ranked, diacritic-insensitive; each match is {"title", "place_id"}
+    return search_places_text(db, query, limit=limit)
 
 
 def delete_saved_plan_ith(client: Groq, user_prompt: str) -> dict:
@@ -824,23 +846,17 @@ Instruction: {user_prompt}
             return {"error": "No place_id in matched place."}
 
         # Fetch full record from places table
-        place_sql = text("SELECT * FROM places WHERE place_id = :id")
-        place_row = db.execute(place_sql, {"id": place_id}).fetchone()
-        if not place_row:
+        places = get_places_by_ids(db, [place_id])
+        if not places:
             print("No full place record found for place_id:", place_id)
             return {"error": "No full place record found for matched place."}
+        place_info = places[0]
 
-        # Extract latitude and longitude from gps_coordinates JSON field
-        gps_coordinates = place_row._mapping.get("gps_coordinates")
-        if gps_coordinates:
-            try:
-                gps_data = json.loads(gps_coordinates)
-                latitude = gps_data.get("latitude", 0)
-                longitude = gps_data.get("longitude", 0)
-            except Exception as json_exc:
-                print("Error parsing gps_coordinates JSON:", json_exc)
-                latitude = 0
-                longitude = 0
+        # Extract latitude and longitude from gps_coordinates
+        gps_data = place_info.get("gps_coordinates")
+        if isinstance(gps_data, dict):
+            latitude = gps_data.get("latitude", 0)
+            longitude = gps_data.get("longitude", 0)
         else:
             latitude = 0
             longitude = 0
@@ -874,8 +890,6 @@ Instruction: {user_prompt}
         print("All same latitude check:", all_same_latitude)
         if not all_same_latitude:
             return {"error": 201}
-        # Add latitude and longitude to the returned destination info
-        place_info = row_to_dict(place_row, Place)
         return {
             "destination": place_info,
             "day": day,
@@ -924,21 +938,16 @@ Instruction: {user_prompt}
             return {"error": "No place_id in matched place."}
 
         # Fetch full record from places table
-        place_sql = text("SELECT * FROM places WHERE place_id = :id")
-        place_row = db.execute(place_sql, {"id": place_id}).fetchone()
-        if not place_row:
+        places = get_places_by_ids(db, [place_id])
+        if not places:
             return {"error": "No full place record found for matched place."}
+        place_info = places[0]
 
-        # Extract latitude and longitude from gps_coordinates JSON field
-        gps_coordinates = place_row._mapping.get("gps_coordinates")
-        if gps_coordinates:
-            try:
-                gps_data = json.loads(gps_coordinates)
-                latitude = gps_data.get("latitude", 0)
-                longitude = gps_data.get("longitude", 0)
-            except Exception as json_exc:
-                latitude = 0
-                longitude = 0
+        # Extract latitude and longitude from gps_coordinates
+        gps_data = place_info.get("gps_coordinates")
+        if isinstance(gps_data, dict):
+            latitude = gps_data.get("latitude", 0)
+            longitude = gps_data.get("longitude", 0)
         else:
             latitude = 0
             longitude = 0
@@ -960,7 +969,6 @@ Instruction: {user_prompt}
         if already_exists:
             return {"error": "Destination already exists in the specified day."}
 
-        place_info = row_to_dict(place_row, Place)
         return {
             "destination": place_info,
             "day": day,
@@ -970,26 +978,6 @@ Instruction: {user_prompt}
         return {"error": str(e)}
 
 
-def row_to_dict(row, model):
-    columns = [col.name for col in model.__table__.columns]
-    types = {col.name: col.type for col in model.__table__.columns}
-    place = {}
-    for idx, col in enumerate(columns):
-        value = row[idx]
-        col_type = types[col]
-        if isinstance(col_type, JSON):
-            try:
-                value = json.loads(value) if value is not None else None
-            except Exception:
-                pass
-        elif isinstance(col_type, Float):
-            value = float(value) if value is not None else None
-        elif isinstance(col_type, Integer):
-            value = int(value) if value is not None else None
-        place[col] = value
-    return place
-
-
 def replace_destination_in_plan(
     client: Groq, prompt: str, plan: dict, db: Session
 ) -> dict:
@@ -1057,11 +1045,10 @@ Instruction: {prompt}
         new_place_id = new_matches[0].get("place_id")
         if not new_place_id:
             return {"error": "No place_id for new destination."}
-        place_sql = text("SELECT * FROM places WHERE place_id = :id")
-        place_row = db.execute(place_sql, {"id": new_place_id}).fetchone()
-        if not place_row:
+        places = get_places_by_ids(db, [new_place_id])
+        if not places:
             return {"error": "No full record for new destination."}
-        add_place = row_to_dict(place_row, Place)
+        add_place = places[0]
     except Exception as e:
         return {"error": f"DB search failed for new destination: {e}"}
 
@@ -1143,16 +1130,9 @@ Instruction: {user_prompt}
 
     # 3. Find that place in the places table
     try:
-        place_sql = text("SELECT * FROM places WHERE place_id = :id")
-        place_row = db.execute(place_sql, {"id": place_id}).fetchone()
-        if not place_row:
+        places = get_places_by_ids(db, [place_id])
+        if not places:
             return {"error": "No full place record found for matched place."}
+        return places[0]
     except Exception as e:
         return {"error": f"DB fetch failed: {e}"}
-
-    # 4. Use row_to_dict to return the whole record
-    try:
-        place_info = row_to_dict(place_row, Place)
-        return place_info
-    except Exception as e:
-        return {"error": f"Failed to convert row to dict: {e}"}
@@ -0,0 +1,183 @@
+import asyncio
+import random
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+
+# One keep-alive connection pool shared by every outbound API call
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 40
+KEEPALIVE_EXPIRY_S = 30
+CONNECT_TIMEOUT_S = 5
+# Retries back off exponentially with full jitter: a random delay up to
+# BACKOFF_BASE_S * 2 ** attempt, capped at BACKOFF_MAX_S
+BACKOFF_BASE_S = 0.2
+BACKOFF_MAX_S = 5.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# timeout: seconds per attempt; retries: attempts after the first one;
+# host_limit: concurrent requests, and so connections, to the service's host;
+# rate (requests/s) and burst: optional token bucket every attempt waits on.
+# Buckets are per process, so run one worker against rate-limited hosts.
+SERVICES = {
+    # Nominatim usage policy: at most 1 request per second
+    "nominatim": {"timeout": 10, "retries": 2, "host_limit": 1, "rate": 1.0, "burst": 1},
+    "osrm": {"timeout": 120, "retries": 1, "host_limit": 8},
+    "foursquare": {"timeout": 10, "retries": 2, "host_limit": 10},
+    "serpapi": {"timeout": 30, "retries": 1, "host_limit": 5},
+    "exchangerate": {"timeout": 10, "retries": 1, "host_limit": 4},
+}
+
+_client = None
+_client_loop = None
+_host_limits = {}
+_rate_limits = {}
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second with bursts of up to `burst`.
+    acquire() queues callers in arrival order until a token is available
+    instead of failing.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.queued = 0
+        self.peak_queued = 0
+        self.acquired = 0
+        self.waited_s = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        start = time.monotonic()
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self.tokens = min(
+                        self.burst, self.tokens + (now - self.updated) * self.rate
+                    )
+                    self.updated = now
+                    if self.tokens >= 1:
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens -= 1
+        finally:
+            self.queued -= 1
+        self.acquired += 1
+        self.waited_s += time.monotonic() - start
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "queue_depth": self.queued,
+            "peak_queue_depth": self.peak_queued,
+            "acquired": self.acquired,
+            "mean_wait_s": self.waited_s / self.acquired if self.acquired else None,
+        }
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    The shared client of the running event loop. A client (and its
+    connections) belongs to the loop it was created on, so a new one is made
+    when called from another loop, e.g. a script using asyncio.run() twice.
+    """
+    global _client, _client_loop, _host_limits, _rate_limits
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_S,
+            ),
+            follow_redirects=True,
+        )
+        _client_loop = loop
+        _host_limits = {}
+        _rate_limits = {}
+    return _client
+
+
+async def aclose():
+    """Close the shared client's connections (application shutdown)."""
+    global _client
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+
+
+def _host_limit(url: str, limit: int) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(limit)
+    return _host_limits[host]
+
+
+def _rate_limit(url: str, config: dict) -> Optional[TokenBucket]:
+    if not config.get("rate"):
+        return None
+    host = urlsplit(url).netloc
+    if host not in _rate_limits:
+        _rate_limits[host] = TokenBucket(config["rate"], config.get("burst", 1))
+    return _rate_limits[host]
+
+
+def rate_limit_stats() -> dict:
+    """Queue depth and waits of every rate-limited host, by host."""
+    return {host: bucket.stats() for host, bucket in _rate_limits.items()}
+
+
+def _backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before retry `attempt` + 1; honours a Retry-After in seconds."""
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_MAX_S)
+    return random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2**attempt))
+
+
+async def get(
+    service: str,
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> httpx.Response:
+    """
+    GET through the shared pool with the service's timeout, host limit and
+    rate limit.
+    Connection errors, timeouts and RETRY_STATUSES responses are retried;
+    the last response is returned whatever its status (callers use
+    raise_for_status()), and the last connection error is raised.
+    """
+    config = SERVICES[service]
+    client = get_client()
+    limit = _host_limit(url, config["host_limit"])
+    bucket = _rate_limit(url, config)
+    timeout = httpx.Timeout(
+        config["timeout"], connect=min(config["timeout"], CONNECT_TIMEOUT_S)
+    )
+    for attempt in range(config["retries"] + 1):
+        last = attempt == config["retries"]
+        response = None
+        try:
+            if bucket is not None:
+                await bucket.acquire()
+            async with limit:
+                response = await client.get(
+                    url, params=params, headers=headers, timeout=timeout
+                )
+        except httpx.TransportError:
+            if last:
+                raise
+        else:
+            if last or response.status_code not in RETRY_STATUSES:
+                return response
+        await asyncio.sleep(_backoff(attempt, response))
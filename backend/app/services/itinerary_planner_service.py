@@ -0,0 +1,193 @@
+import math
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import text
+from .place_projection_service import PLACE_VIEWS, place_decoder, select_columns
+from .tour_optimizer_service import distance_matrix, duration_matrix, solve_tour
+
+# Balanced k-means stops after this many reassignments without convergence
+MAX_ITERATIONS = 25
+# Stops per day when the planner picks candidates itself (create_itinerary)
+PLACES_PER_DAY = 4
+MAX_PLACES = 40
+METERS_PER_DEGREE = 111320.0
+
+
+def _project(points: List[dict]) -> np.ndarray:
+    """Equirectangular (x, y) in metres, accurate enough within a city."""
+    lat = np.array([float(p["lat"]) for p in points])
+    lon = np.array([float(p["lon"]) for p in points])
+    scale = math.cos(math.radians(float(lat.mean())))
+    return np.column_stack([lon * METERS_PER_DEGREE * scale, lat * METERS_PER_DEGREE])
+
+
+def _assign(dist: np.ndarray) -> np.ndarray:
+    """
+    Balanced assignment of points (rows) to clusters (columns): every cluster
+    gets n // k points and n % k of them one more. Points with the most to
+    lose from not getting their nearest cluster choose first, each taking its
+    nearest cluster that still has room.
+    """
+    n, k = dist.shape
+    spare = n % k
+    by_distance = np.argsort(dist, axis=1)
+    if k > 1:
+        ranked = np.take_along_axis(dist, by_distance[:, :2], axis=1)
+        regret = ranked[:, 1] - ranked[:, 0]
+    else:
+        regret = np.zeros(n)
+    labels = np.empty(n, dtype=np.int64)
+    room = np.full(k, n // k)
+    extended = np.zeros(k, dtype=bool)
+    for i in np.argsort(-regret, kind="stable"):
+        for c in by_distance[i]:
+            if room[c] == 0 and spare and not extended[c]:
+                # The first clusters to fill up take the n % k extra points
+                room[c] = 1
+                extended[c] = True
+                spare -= 1
+            if room[c]:
+                labels[i] = c
+                room[c] -= 1
+                break
+    return labels
+
+
+def cluster_days(points: List[dict], num_days: int, seed: int = 0) -> List[List[int]]:
+    """
+    Split points ({"lat", "lon"}) into num_days geographic clusters whose
+    sizes differ by at most one (balanced k-means, k-means++ seeding).
+    Returns the point indices of each cluster; clusters may be empty only
+    when there are fewer points than days.
+    """
+    n = len(points)
+    k = max(1, num_days)
+    if n == 0:
+        return [[] for _ in range(k)]
+    if n <= k:
+        return [[i] for i in range(n)] + [[] for _ in range(k - n)]
+
+    xy = _project(points)
+    rng = np.random.default_rng(seed)
+    centers = [xy[rng.integers(n)]]
+    for _ in range(1, k):
+        d2 = np.min(((xy[:, None, :] - np.asarray(centers)[None]) ** 2).sum(-1), axis=1)
+        total = d2.sum()
+        pick = rng.choice(n, p=d2 / total) if total > 0 else rng.integers(n)
+        centers.append(xy[pick])
+    centers = np.asarray(centers)
+
+    labels = None
+    for _ in range(MAX_ITERATIONS):
+        dist = np.sqrt(((xy[:, None, :] - centers[None]) ** 2).sum(-1))
+        new_labels = _assign(dist)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(k):
+            members = xy[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return [np.flatnonzero(labels == c).tolist() for c in range(k)]
+
+
+def plan_days(
+    points: List[dict],
+    num_days: int,
+    start: Optional[dict] = None,
+    profile: str = "driving",
+) -> List[dict]:
+    """
+    Balanced day clusters of `points`, each ordered for travel with the tour
+    optimizer (beginning at the stop nearest `start` when given). Days are
+    numbered from the cluster nearest `start`, or west to east without one.
+    Returns [{"day": 1, "places": [...], "distance_km": float}, ...] where
+    distance_km is the straight-line length of the ordered day.
+    """
+    clusters = [c for c in cluster_days(points, num_days) if c]
+
+    days = []
+    for members in clusters:
+        stops = [points[i] for i in members]
+        cost = duration_matrix(stops, profile)
+        first = 0
+        if start is not None:
+            first = int(np.argmin(distance_matrix([start] + stops)[0, 1:]))
+        order = solve_tour(cost, first)
+        ordered = [stops[i] for i in order]
+        distances = distance_matrix(ordered)
+        days.append(
+            {
+                "places": ordered,
+                "distance_km": float(np.trace(distances, offset=1)) / 1000,
+            }
+        )
+
+    if start is not None:
+        anchor = distance_matrix([start] + [d["places"][0] for d in days])[0, 1:]
+        days = [days[i] for i in np.argsort(anchor, kind="stable")]
+    else:
+        days.sort(key=lambda d: np.mean([float(p["lon"]) for p in d["places"]]))
+    for number, day in enumerate(days, start=1):
+        day["day"] = number
+    while len(days) < num_days:
+        days.append({"day": len(days) + 1, "places": [], "distance_km": 0.0})
+    return days
+
+
+def candidate_places(db, city: str, types: List[str], count: int) -> List[dict]:
+    """
+    Up to `count` distinct places of `city` for the given type ids, taking
+    the best-scored remaining place of each type in turn ("card" view plus
+    lat/lon).
+    """
+    columns = PLACE_VIEWS["card"]
+    sql = text(
+        f"""
+        SELECT {select_columns(columns)},
+            json_extract(places.gps_coordinates, '$.latitude') AS lat,
+            json_extract(places.gps_coordinates, '$.longitude') AS lon
+        FROM place_types JOIN places ON places.id = place_types.place_id
+        WHERE place_types.type_id = :type AND place_types.city_name = :city
+        AND places.gps_coordinates IS NOT NULL
+        ORDER BY place_types.POI_score DESC, place_types.place_id DESC
+        LIMIT :limit
+        """
+    )
+    decode = place_decoder(columns)
+    per_type = []
+    for type_id in dict.fromkeys(types):
+        rows = db.execute(sql, {"type": type_id, "city": city, "limit": count}).fetchall()
+        per_type.append(
+            [
+                {**decode(row), "lat": row.lat, "lon": row.lon}
+                for row in rows
+                if row.lat is not None and row.lon is not None
+            ]
+        )
+
+    places, seen = [], set()
+    for rank in range(count):
+        for rows in per_type:
+            if rank < len(rows) and rows[rank]["place_id"] not in seen:
+                seen.add(rows[rank]["place_id"])
+                places.append(rows[rank])
+                if len(places) == count:
+                    return places
+    return places
+
+
+def plan_city_days(
+    db, city: str, types: List[str], extra_types: List[str], num_days: int
+) -> List[dict]:
+    """
+    Day-partitioned plan for a city: PLACES_PER_DAY places per day (at most
+    MAX_PLACES) of `types`, topped up from `extra_types`, passed to plan_days().
+    """
+    count = min(MAX_PLACES, PLACES_PER_DAY * max(1, num_days))
+    places = candidate_places(db, city, types, count)
+    if len(places) < count and extra_types:
+        seen = {p["place_id"] for p in places}
+        extra = candidate_places(db, city, extra_types, count)
+        places += [p for p in extra if p["place_id"] not in seen][: count - len(places)]
+    return plan_days(places, num_days)
@@ -0,0 +1,216 @@
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import numpy as np
+from sqlalchemy import bindparam, text
+
+# Minute-of-week: Monday 00:00 is 0, Sunday 23:59 is MINUTES_PER_WEEK - 1
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+BITMAP_BYTES = MINUTES_PER_WEEK // 8
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Catalog hours are local to Vietnam (UTC+7, no daylight saving)
+CATALOG_TZ = timezone(timedelta(hours=7))
+
+REINDEX_CHUNK_SIZE = 500
+
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?"
+_RANGE_RE = re.compile(_TIME + r"\s*[–—-]\s*" + _TIME, re.IGNORECASE)
+
+
+def _minutes(hour: str, minute: Optional[str], meridiem: Optional[str]) -> int:
+    h, m = int(hour), int(minute or 0)
+    if meridiem:
+        h = h % 12 + (12 if meridiem[0].lower() == "p" else 0)
+    return h * 60 + m
+
+
+def parse_day_hours(value: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse one day's hours ("9 AM–2:30 PM, 5–10:30 PM", "Open 24 hours",
+    "Closed") into (start, end) minutes from that day's midnight. end may
+    exceed 1440 for ranges past midnight. Returns None when not understood.
+    """
+    value = (value or "").replace("\u202f", " ").replace("\xa0", " ").strip()
+    lowered = value.lower()
+    if not lowered:
+        return None
+    if "24 hours" in lowered:
+        return [(0, MINUTES_PER_DAY)]
+    if lowered == "closed":
+        return []
+
+    ranges = []
+    for part in value.split(","):
+        match = _RANGE_RE.fullmatch(part.strip())
+        if not match:
+            return None
+        h1, m1, ap1, h2, m2, ap2 = match.groups()
+        end = _minutes(h2, m2, ap2)
+        if ap1 or not ap2:
+            start = _minutes(h1, m1, ap1)
+        else:
+            # "2–10 PM": the start shares the end's AM/PM unless that would
+            # put it after the end ("11–2 PM" is 11 AM–2 PM)
+            start = _minutes(h1, m1, ap2)
+            if start > end:
+                start = _minutes(h1, m1, "am" if ap2[0].lower() == "p" else "pm")
+        if end <= start:
+            end += MINUTES_PER_DAY  # e.g. 6 PM–2 AM, or 12 AM as the end
+        ranges.append((start, end))
+    return ranges
+
+
+def parse_operating_hours(operating_hours) -> Optional[List[Tuple[int, int]]]:
+    """
+    Turn an operating_hours dict (day name -> hours string, as stored in the
+    catalog) into sorted, merged minute-of-week intervals [start, end).
+    Returns None when there are no hours or no day could be parsed.
+    """
+    if isinstance(operating_hours, str):
+        try:
+            operating_hours = json.loads(operating_hours)
+        except ValueError:
+            return None
+    if not isinstance(operating_hours, dict):
+        return None
+
+    intervals = []
+    parsed_any = False
+    for day, value in operating_hours.items():
+        day = str(day).strip().lower()
+        if day not in DAYS or not isinstance(value, str):
+            continue
+        ranges = parse_day_hours(value)
+        if ranges is None:
+            continue
+        parsed_any = True
+        offset = DAYS.index(day) * MINUTES_PER_DAY
+        for start, end in ranges:
+            start, end = start + offset, end + offset
+            if end > MINUTES_PER_WEEK:
+                # Sunday night into Monday morning wraps to the start of the week
+                intervals.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            intervals.append((start, end))
+    if not parsed_any:
+        return None
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intervals_to_bitmap(intervals: List[Tuple[int, int]]) -> np.ndarray:
+    """Packed minute-of-week bitmap (BITMAP_BYTES uint8, big-endian bit order)."""
+    bits = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+    for start, end in intervals:
+        bits[start:end] = True
+    return np.packbits(bits)
+
+
+def parse_open_at(value: str) -> int:
+    """
+    Parse the open_at= query parameter into a minute of the week. Accepts an
+    ISO datetime ("2025-06-02T18:30", converted to Vietnam time if it has an
+    offset) or a weekday and time ("sat 18:30", "saturday 6:30 pm").
+    """
+    value = value.strip()
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        match = re.fullmatch(r"([a-z]{3,})\s+" + _TIME, value, re.IGNORECASE)
+        day = match and next(
+            (d for d in DAYS if d.startswith(match.group(1).lower())), None
+        )
+        if not day:
+            raise ValueError(
+                "open_at must be an ISO datetime or a weekday and time, e.g. 'sat 18:30'"
+            )
+        minute = _minutes(*match.group(2, 3, 4))
+        if minute >= MINUTES_PER_DAY:
+            raise ValueError("open_at time must be before 24:00")
+        return DAYS.index(day) * MINUTES_PER_DAY + minute
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(CATALOG_TZ)
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def open_at_condition(place_id_column: str) -> str:
+    """SQL condition keeping places (by places.id column) open at :open_at."""
+    return f"""
+        EXISTS (
+            SELECT 1 FROM place_hours
+            WHERE place_hours.place_id = {place_id_column}
+            AND place_hours.start_min <= :open_at AND place_hours.end_min > :open_at
+        )
+    """
+
+
+def _insert_hours(conn, rows):
+    values = []
+    for row in rows:
+        for start, end in parse_operating_hours(row.operating_hours) or []:
+            values.append({"place_id": row.id, "start_min": start, "end_min": end})
+    if values:
+        conn.execute(
+            text(
+                """
+                INSERT INTO place_hours (place_id, start_min, end_min)
+                VALUES (:place_id, :start_min, :end_min)
+                """
+            ),
+            values,
+        )
+
+
+def rebuild_place_hours(conn):
+    """Repopulate place_hours by parsing operating_hours of every place."""
+    conn.execute(text("DELETE FROM place_hours"))
+    result = conn.execute(
+        text("SELECT id, operating_hours FROM places WHERE operating_hours IS NOT NULL")
+    )
+    while True:
+        rows = result.fetchmany(REINDEX_CHUNK_SIZE)
+        if not rows:
+            break
+        _insert_hours(conn, rows)
+
+
+def ensure_place_hours(conn):
+    """Build place_hours if it is empty while the catalog has opening hours."""
+    missing = conn.execute(
+        text(
+            """
+            SELECT NOT EXISTS (SELECT 1 FROM place_hours)
+                AND EXISTS (
+                    SELECT 1 FROM places
+                    WHERE CASE WHEN json_valid(operating_hours)
+                        THEN json_type(operating_hours) END = 'object'
+                )
+            """
+        )
+    ).scalar()
+    if missing:
+        rebuild_place_hours(conn)
+
+
+def reindex_place_hours(conn, ids):
+    """Refresh the place_hours rows of the given places.id values."""
+    ids = list(ids)
+    delete = text("DELETE FROM place_hours WHERE place_id IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    select = text(
+        "SELECT id, operating_hours FROM places WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    for start in range(0, len(ids), REINDEX_CHUNK_SIZE):
+        chunk = ids[start : start + REINDEX_CHUNK_SIZE]
+        conn.execute(delete, {"ids": chunk})
+        _insert_hours(conn, conn.execute(select, {"ids": chunk}).fetchall())
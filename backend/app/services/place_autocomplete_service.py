@@ -0,0 +1,119 @@
+import bisect
+import json
+import numpy as np
+from .catalog_loader import CatalogLoader, CatalogVersion, usable_rows
+from .place_search_service import normalized_words
+
+# Completions also start at each of the first few words of a name, so
+# "thanh" completes "Chợ Bến Thành"
+MAX_WORD_STARTS = 6
+# Short prefixes match thousands of keys; their top MAX_LIMIT completions are
+# memoized per (prefix, city) so repeated keystrokes stay in microseconds
+SHORT_PREFIX = 3
+MAX_LIMIT = 50
+SHORT_CACHE_SIZE = 4096
+
+
+class AutocompleteIndex:
+    """
+    Sorted array of normalized name keys with, for every key, the row of the
+    place it belongs to. A prefix query is two bisects into `keys` followed by
+    a top-k by POI_score over the matching rows.
+    """
+
+    def __init__(self, version: CatalogVersion):
+        self.db_path = version.db_path
+        self.mtime = version.mtime
+        rows = usable_rows(version.place_rows(), title=True)
+
+        self.place_ids = [row.place_id for row in rows]
+        self.titles = [row.title for row in rows]
+        self.cities = [row.city_name for row in rows]
+        self.city_codes = {}
+        city_code = np.empty(len(rows), dtype=np.int32)
+        self.score = np.zeros(len(rows), dtype=np.float64)
+        # The display name each key came from, stored once per distinct name
+        self.names = []
+
+        entries = []
+        for i, row in enumerate(rows):
+            city_code[i] = self.city_codes.setdefault(row.city_name, len(self.city_codes))
+            if row.POI_score is not None:
+                self.score[i] = row.POI_score
+            names = [row.title]
+            for column in (row.en_names, row.vi_names):
+                try:
+                    values = json.loads(column) if column else None
+                except ValueError:
+                    values = None
+                if isinstance(values, list):
+                    names.extend(v for v in values if isinstance(v, str))
+            for name in dict.fromkeys(names):
+                words = normalized_words(name)
+                if not words:
+                    continue
+                name_idx = len(self.names)
+                self.names.append(name)
+                for start in range(min(len(words), MAX_WORD_STARTS)):
+                    entries.append((" ".join(words[start:]), i, name_idx))
+
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.rows = np.fromiter((r for _, r, _ in entries), dtype=np.int32, count=len(entries))
+        self.name_of = np.fromiter((n for _, _, n in entries), dtype=np.int32, count=len(entries))
+        self.city_code = city_code
+        self._short_cache = {}
+        print(f"Loaded autocomplete index: {len(rows)} places, {len(self.keys)} keys")
+
+    def complete(self, query: str, limit: int = 10, city: str = None) -> list:
+        """Top `limit` (at most MAX_LIMIT) places whose names start with `query`."""
+        prefix = " ".join(normalized_words(query))
+        if not prefix:
+            return []
+        if len(prefix) > SHORT_PREFIX:
+            return self._complete(prefix, limit, city)
+        key = (prefix, city)
+        cached = self._short_cache.get(key)
+        if cached is None:
+            if len(self._short_cache) >= SHORT_CACHE_SIZE:
+                self._short_cache.clear()
+            cached = self._short_cache[key] = self._complete(prefix, MAX_LIMIT, city)
+        return cached[:limit]
+
+    def _complete(self, prefix: str, limit: int, city: str) -> list:
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        if lo == hi:
+            return []
+
+        rows, first = np.unique(self.rows[lo:hi], return_index=True)
+        name_of = self.name_of[lo:hi][first]
+        if city is not None:
+            code = self.city_codes.get(city)
+            if code is None:
+                return []
+            keep = self.city_code[rows] == code
+            rows, name_of = rows[keep], name_of[keep]
+        if len(rows) > limit:
+            top = np.argpartition(-self.score[rows], limit - 1)[:limit]
+            rows, name_of = rows[top], name_of[top]
+        order = np.argsort(-self.score[rows], kind="stable")
+
+        return [
+            {
+                "place_id": self.place_ids[r],
+                "title": self.titles[r],
+                "matched": self.names[n],
+                "city_name": self.cities[r],
+                "POI_score": float(self.score[r]),
+            }
+            for r, n in zip(rows[order].tolist(), name_of[order].tolist())
+        ]
+
+
+_loader = CatalogLoader("autocomplete index", AutocompleteIndex)
+
+
+def get_index() -> AutocompleteIndex:
+    """Return the current index; a changed catalog DB file is reloaded in the background."""
+    return _loader.get()
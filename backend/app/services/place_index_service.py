@@ -0,0 +1,159 @@
+import base64
+import json
+import math
+from sqlalchemy import bindparam, text
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE_LAT = 111320
+
+
+def ensure_place_indexes(conn):
+    """
+    Create the secondary index tables for the place catalog and rebuild them
+    when they are out of sync with the places table (e.g. after the catalog
+    DB file has been replaced).
+    """
+    conn.execute(
+        text(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree(
+                id, min_lat, max_lat, min_lon, max_lon
+            )
+            """
+        )
+    )
+    indexed = conn.execute(
+        text(
+            """
+            SELECT (SELECT count(*) FROM places_rtree),
+                (SELECT count(*) FROM place_types)
+            """
+        )
+    ).fetchone()
+    expected = conn.execute(
+        text(
+            """
+            SELECT
+                (SELECT count(*) FROM places
+                WHERE json_extract(gps_coordinates, '$.latitude') IS NOT NULL
+                AND json_extract(gps_coordinates, '$.longitude') IS NOT NULL),
+                (SELECT count(DISTINCT places.id || ':' || json_each.value)
+                FROM places, json_each(places.type_ids)
+                WHERE json_type(places.type_ids) = 'array'
+                AND json_each.value IS NOT NULL)
+            """
+        )
+    ).fetchone()
+    if tuple(indexed) != tuple(expected):
+        rebuild_place_indexes(conn)
+
+
+_PLACE_TYPES_INSERT = """
+    INSERT OR IGNORE INTO place_types (place_id, type_id, city_name, POI_score)
+    SELECT places.id, json_each.value, places.city_name,
+        COALESCE(places.POI_score, 0)
+    FROM places, json_each(places.type_ids)
+    WHERE json_type(places.type_ids) = 'array'
+    AND json_each.value IS NOT NULL
+    {filter}
+"""
+
+_PLACES_RTREE_INSERT = """
+    INSERT OR REPLACE INTO places_rtree (id, min_lat, max_lat, min_lon, max_lon)
+    SELECT places.id,
+        json_extract(places.gps_coordinates, '$.latitude'),
+        json_extract(places.gps_coordinates, '$.latitude'),
+        json_extract(places.gps_coordinates, '$.longitude'),
+        json_extract(places.gps_coordinates, '$.longitude')
+    FROM places
+    WHERE json_extract(places.gps_coordinates, '$.latitude') IS NOT NULL
+    AND json_extract(places.gps_coordinates, '$.longitude') IS NOT NULL
+    {filter}
+"""
+
+# Keep each IN (...) list well below SQLite's bound-parameter limit
+REINDEX_CHUNK_SIZE = 500
+
+
+def rebuild_place_indexes(conn):
+    """Repopulate the R*Tree and place_types from every row of the places table."""
+    conn.execute(text("DELETE FROM place_types"))
+    conn.execute(text(_PLACE_TYPES_INSERT.format(filter="")))
+    conn.execute(text("DELETE FROM places_rtree"))
+    conn.execute(text(_PLACES_RTREE_INSERT.format(filter="")))
+
+
+def reindex_places(conn, ids):
+    """
+    Refresh the R*Tree and place_types entries of the given places.id values
+    from their current rows. Call inside the transaction that wrote them.
+    """
+    ids = list(ids)
+    statements = [
+        text("DELETE FROM place_types WHERE place_id IN :ids"),
+        text("DELETE FROM places_rtree WHERE id IN :ids"),
+        text(_PLACE_TYPES_INSERT.format(filter="AND places.id IN :ids")),
+        text(_PLACES_RTREE_INSERT.format(filter="AND places.id IN :ids")),
+    ]
+    statements = [
+        stmt.bindparams(bindparam("ids", expanding=True)) for stmt in statements
+    ]
+    for start in range(0, len(ids), REINDEX_CHUNK_SIZE):
+        chunk = ids[start : start + REINDEX_CHUNK_SIZE]
+        for stmt in statements:
+            conn.execute(stmt, {"ids": chunk})
+
+
+def bounding_box(latitude: float, longitude: float, radius_m: float) -> dict:
+    """Return the lat/lon box that contains every point within radius_m."""
+    dlat = radius_m / METERS_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(radius_m / (METERS_PER_DEGREE_LAT * cos_lat), 180.0)
+    return {
+        "min_lat": latitude - dlat,
+        "max_lat": latitude + dlat,
+        "min_lon": longitude - dlon,
+        "max_lon": longitude + dlon,
+    }
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_bbox(bbox: str) -> dict:
+    """Parse a "min_lat,min_lon,max_lat,max_lon" query string."""
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lat,min_lon,max_lat,max_lon")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return {
+        "min_lat": min_lat,
+        "max_lat": max_lat,
+        "min_lon": min_lon,
+        "max_lon": max_lon,
+    }
+
+
+def encode_cursor(poi_score: float, place_id: int) -> str:
+    """Opaque keyset cursor for results ordered by (POI_score DESC, id DESC)."""
+    raw = json.dumps([poi_score, place_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        poi_score, place_id = json.loads(raw)
+        return float(poi_score), int(place_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
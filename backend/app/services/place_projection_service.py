@@ -0,0 +1,126 @@
+from functools import lru_cache
+from typing import Callable, List, Optional
+import orjson
+from fastapi.responses import Response
+from sqlalchemy.types import JSON, Float, Integer
+from ..place_models import Place
+
+PLACE_COLUMNS = [col.name for col in Place.__table__.columns]
+_COLUMN_TYPES = {col.name: col.type for col in Place.__table__.columns}
+
+# Named column sets for place endpoints; "full" is every column of the places table
+PLACE_VIEWS = {
+    "summary": [
+        "id",
+        "place_id",
+        "title",
+        "gps_coordinates",
+        "POI_score",
+        "thumbnail",
+        "type",
+        "type_id",
+    ],
+    "card": [
+        "id",
+        "place_id",
+        "title",
+        "gps_coordinates",
+        "POI_score",
+        "thumbnail",
+        "type",
+        "type_id",
+        "type_ids",
+        "rating",
+        "reviews",
+        "price",
+        "address",
+        "open_state",
+        "city_name",
+        "en_names",
+        "vi_names",
+        "best_type_id",
+        "best_type_id_en",
+        "best_type_id_vi",
+    ],
+    "full": PLACE_COLUMNS,
+}
+
+
+def resolve_place_fields(fields: Optional[str], view: Optional[str]) -> List[str]:
+    """
+    Turn the `fields=` / `view=` query parameters into an ordered list of
+    places columns. An explicit field list wins over a named view; with
+    neither, every column is returned.
+    """
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in PLACE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown place fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(requested))
+    if view:
+        if view not in PLACE_VIEWS:
+            raise ValueError(
+                f"Unknown view '{view}', expected one of: {', '.join(PLACE_VIEWS)}"
+            )
+        return PLACE_VIEWS[view]
+    return PLACE_COLUMNS
+
+
+def select_columns(fields: List[str], table: str = "places") -> str:
+    """SQL select list for already-validated place columns."""
+    return ", ".join(f"{table}.{f}" for f in fields)
+
+
+def project(place: dict, fields: List[str]) -> dict:
+    if fields is PLACE_COLUMNS:
+        return place
+    return {f: place.get(f) for f in fields}
+
+
+@lru_cache(maxsize=64)
+def _compile_decoder(fields: tuple) -> Callable:
+    json_cols = [f for f in fields if isinstance(_COLUMN_TYPES[f], JSON)]
+    float_cols = [f for f in fields if isinstance(_COLUMN_TYPES[f], Float)]
+    int_cols = [f for f in fields if isinstance(_COLUMN_TYPES[f], Integer)]
+    loads = orjson.loads
+
+    def decode(row) -> dict:
+        # Extra trailing columns in the row (distances, sort keys) are ignored
+        place = dict(zip(fields, row))
+        for col in json_cols:
+            value = place[col]
+            if value is not None:
+                try:
+                    place[col] = loads(value)
+                except (orjson.JSONDecodeError, TypeError):
+                    pass
+        for col in float_cols:
+            value = place[col]
+            if value is not None:
+                place[col] = float(value)
+        for col in int_cols:
+            value = place[col]
+            if value is not None:
+                place[col] = int(value)
+        return place
+
+    return decode
+
+
+def place_decoder(fields: List[str] = PLACE_COLUMNS) -> Callable:
+    """
+    Return a function turning a places row (columns in `fields` order, as
+    selected by select_columns) into a dict with JSON, Float and Integer
+    columns converted. Decoders are compiled once per column set.
+    """
+    return _compile_decoder(tuple(fields))
+
+
+class PlaceJSONResponse(Response):
+    """JSON response rendered with orjson, bypassing FastAPI's jsonable_encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,213 @@
+import json
+import re
+import unicodedata
+from typing import List, Optional
+from sqlalchemy import bindparam, text
+from .place_projection_service import place_decoder, select_columns
+
+# Columns of the places_search FTS5 index, all stored as normalize_text() output.
+# The FTS rowid is places.id.
+SEARCH_COLUMNS = ["title", "en_names", "vi_names", "address"]
+# bm25() weight of each column above
+SEARCH_WEIGHTS = [10.0, 4.0, 4.0, 1.0]
+# Ranking puts places whose title or names match ahead of address-only
+# matches. Within each group bm25 (negative, lower is better) becomes a
+# relevance relative to the group's best hit; hits with at least
+# RELEVANCE_TIE of it count as equally relevant, as bm25 differences that
+# small mostly reflect field lengths. Relevance is then scaled by up to
+# 1 + POI_WEIGHT for popular places; a place with POI_score == POI_HALF gets
+# half of the boost.
+RELEVANCE_TIE = 0.6
+POI_WEIGHT = 1.0
+POI_HALF = 20.0
+
+REINDEX_CHUNK_SIZE = 500
+
+
+def normalize_text(value) -> str:
+    """
+    Lowercase text with Vietnamese tone marks and other diacritics removed
+    ("Đà Lạt" -> "da lat"), so queries typed without accents still match.
+    JSON arrays of names are flattened into one space-separated string.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str) and value[:1] == "[":
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+    if isinstance(value, list):
+        value = " ".join(str(v) for v in value if v)
+    decomposed = unicodedata.normalize("NFD", str(value))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.replace("đ", "d").replace("Đ", "D").lower()
+
+
+def normalized_words(value) -> List[str]:
+    """The words of normalize_text(value): "Chợ Đà Lạt" -> ["cho", "da", "lat"]."""
+    return re.findall(r"\w+", normalize_text(value))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression: every word of the query must match, as a prefix
+    when it has at least two characters (single letters/digits match exactly,
+    as a one-character prefix would match most of the catalog).
+    """
+    tokens = re.findall(r"\w+", normalize_text(query))
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' if len(t) > 1 else f'"{t}"' for t in tokens)
+
+
+_CREATE_PLACES_SEARCH = f"""
+    CREATE VIRTUAL TABLE places_search USING fts5(
+        {", ".join(SEARCH_COLUMNS)}, place_id UNINDEXED, prefix='2 3'
+    )
+"""
+
+
+def ensure_search_index(conn):
+    """
+    Create places_search, replacing an older layout (title-only, or text
+    stored with diacritics), and rebuild it when it is out of sync with places.
+    """
+    row = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE name = 'places_search'")
+    ).fetchone()
+    if row is None or "vi_names" not in row[0]:
+        conn.execute(text("DROP TABLE IF EXISTS places_search"))
+        conn.execute(text(_CREATE_PLACES_SEARCH))
+        rebuild_search_index(conn)
+        return
+    indexed, expected = conn.execute(
+        text("SELECT (SELECT count(*) FROM places_search), (SELECT count(*) FROM places)")
+    ).fetchone()
+    if indexed != expected:
+        rebuild_search_index(conn)
+
+
+def _insert_rows(conn, rows):
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO places_search (rowid, {", ".join(SEARCH_COLUMNS)}, place_id)
+            VALUES (:id, {", ".join(f":{c}" for c in SEARCH_COLUMNS)}, :place_id)
+            """
+        ),
+        [
+            {
+                "id": row.id,
+                "place_id": row.place_id,
+                **{c: normalize_text(getattr(row, c)) for c in SEARCH_COLUMNS},
+            }
+            for row in rows
+        ],
+    )
+
+
+def rebuild_search_index(conn):
+    """Repopulate places_search from every row of the places table."""
+    conn.execute(text("DELETE FROM places_search"))
+    result = conn.execute(
+        text(f"SELECT id, place_id, {', '.join(SEARCH_COLUMNS)} FROM places ORDER BY id")
+    )
+    while True:
+        rows = result.fetchmany(REINDEX_CHUNK_SIZE)
+        if not rows:
+            break
+        _insert_rows(conn, rows)
+    conn.execute(text("INSERT INTO places_search (places_search) VALUES ('optimize')"))
+
+
+def reindex_search(conn, ids):
+    """Refresh the places_search rows of the given places.id values."""
+    ids = list(ids)
+    delete = text("DELETE FROM places_search WHERE rowid IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    select = text(
+        f"SELECT id, place_id, {', '.join(SEARCH_COLUMNS)} FROM places WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    for start in range(0, len(ids), REINDEX_CHUNK_SIZE):
+        chunk = ids[start : start + REINDEX_CHUNK_SIZE]
+        conn.execute(delete, {"ids": chunk})
+        rows = conn.execute(select, {"ids": chunk}).fetchall()
+        if rows:
+            _insert_rows(conn, rows)
+
+
+def search_places_text(
+    db,
+    query: str,
+    fields: Optional[List[str]] = None,
+    city: Optional[str] = None,
+    box: Optional[dict] = None,
+    limit: int = 20,
+) -> List[dict]:
+    """
+    Ranked full-text place search over title, English/Vietnamese names and
+    address, ignoring diacritics. Title/name matches come before address
+    matches; within those, bm25 is blended with POI_score, which decides
+    among near-equal matches. Without `fields`, each result is
+    {"title", "place_id"} (the legacy places_search row shape); otherwise the
+    projected place.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    columns = fields or ["title", "place_id"]
+    filters = []
+    params = {
+        "q": match,
+        "limit": limit,
+        "tie": RELEVANCE_TIE,
+        "poi_weight": POI_WEIGHT,
+        "poi_half": POI_HALF,
+    }
+    if city:
+        filters.append("AND places.city_name = :city")
+        params["city"] = city
+    if box:
+        filters.append(
+            """
+            AND places.id IN (
+                SELECT id FROM places_rtree
+                WHERE min_lat <= :max_lat AND max_lat >= :min_lat
+                AND min_lon <= :max_lon AND max_lon >= :min_lon
+            )
+            """
+        )
+        params.update(box)
+
+    # bm25() only works in the query that owns the MATCH, hence the CTE; with
+    # a zero address weight it is 0 for address-only matches. Relevance is
+    # relative to the best hit left after the filters.
+    sql = text(
+        f"""
+        WITH hits AS MATERIALIZED (
+            SELECT rowid AS id,
+                bm25(places_search, {", ".join(str(w) for w in SEARCH_WEIGHTS)}) AS rank,
+                bm25(places_search, 1.0, 1.0, 1.0, 0.0) < 0 AS named
+            FROM places_search WHERE places_search MATCH :q
+        ),
+        matches AS (
+            SELECT hits.id, hits.rank, hits.named,
+                min(1.0, hits.rank / (min(hits.rank) OVER (PARTITION BY hits.named) * :tie))
+                    AS relevance
+            FROM hits JOIN places ON places.id = hits.id
+            WHERE 1 = 1 {" ".join(filters)}
+        )
+        SELECT {select_columns(columns)}
+        FROM matches JOIN places ON places.id = matches.id
+        ORDER BY matches.named DESC, matches.relevance * (
+            1 + :poi_weight * max(COALESCE(places.POI_score, 0), 0)
+            / (max(COALESCE(places.POI_score, 0), 0) + :poi_half)
+        ) DESC, matches.rank
+        LIMIT :limit
+        """
+    )
+    decode = place_decoder(columns)
+    return [decode(row) for row in db.execute(sql, params)]
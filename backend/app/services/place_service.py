@@ -0,0 +1,123 @@
+from typing import List
+from sqlalchemy import bindparam, case, func, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from ..place_models import Place
+from . import catalog_snapshot
+from .opening_hours_service import reindex_place_hours
+from .place_index_service import reindex_places
+from .place_search_service import reindex_search
+from .place_projection_service import PLACE_COLUMNS, place_decoder, project, select_columns
+from .price_service import PRICE_COLUMNS, price_columns
+
+# Keep each IN (...) list well below SQLite's bound-parameter limit
+BATCH_CHUNK_SIZE = 500
+
+
+def get_places_by_ids(
+    db: Session, place_ids: List[str], fields: List[str] = PLACE_COLUMNS
+) -> List[dict]:
+    """
+    Fetch many places by their place_id in one IN (...) query per chunk.
+    Returns decoded places in the order of `place_ids`; unknown ids are skipped
+    and repeated ids are returned once per occurrence.
+    """
+    unique_ids = list(dict.fromkeys(pid for pid in place_ids if pid))
+    if not unique_ids:
+        return []
+
+    found = {}
+    if catalog_snapshot.enabled():
+        snapshot = catalog_snapshot.get_snapshot()
+        for pid in unique_ids:
+            place = snapshot.get(pid)
+            if place is not None:
+                found[pid] = project(place, fields)
+    else:
+        # place_id is always selected last so rows can be matched back to the input
+        decode = place_decoder(fields)
+        sql = text(
+            f"""
+            SELECT {select_columns(fields)}, places.place_id AS _pid
+            FROM places WHERE places.place_id IN :ids
+            """
+        ).bindparams(bindparam("ids", expanding=True))
+        for start in range(0, len(unique_ids), BATCH_CHUNK_SIZE):
+            chunk = unique_ids[start : start + BATCH_CHUNK_SIZE]
+            for row in db.execute(sql, {"ids": chunk}):
+                found[row._pid] = decode(row)
+
+    return [found[pid] for pid in place_ids if pid in found]
+
+
+def upsert_places(db: Session, places: List[dict], on_conflict: str = "skip") -> dict:
+    """
+    Bulk-insert places with INSERT ... ON CONFLICT(place_id), in chunks, and
+    refresh their spatial/type, full-text and opening-hours indexes. The
+    caller commits.
+    Args:
+        places: Dicts keyed by places column names; other keys are ignored.
+            price_min/price_max/price_level are always derived from price.
+        on_conflict: "skip" keeps existing rows (DO NOTHING); "update"
+            overwrites existing rows with the non-null incoming values.
+    Returns:
+        {"inserted": int, "updated": int, "skipped": int}
+    """
+    if on_conflict not in ("skip", "update"):
+        raise ValueError("on_conflict must be 'skip' or 'update'")
+
+    # One row per place_id: the first occurrence wins for skip, the last for update
+    columns = [c for c in PLACE_COLUMNS if c != "id"]
+    rows = {}
+    for place in places:
+        place_id = place.get("place_id")
+        if not place_id or (on_conflict == "skip" and place_id in rows):
+            continue
+        rows[place_id] = {c: place.get(c) for c in columns}
+        rows[place_id].update(price_columns(place.get("price")))
+    rows = list(rows.values())
+    skipped = len(places) - len(rows)
+
+    table = Place.__table__
+    exists_sql = text(
+        "SELECT place_id FROM places WHERE place_id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    inserted = updated = 0
+    touched_ids = []
+    for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+        chunk = rows[start : start + BATCH_CHUNK_SIZE]
+        stmt = sqlite_insert(table).values(chunk)
+        if on_conflict == "update":
+            existing = {
+                row[0]
+                for row in db.execute(exists_sql, {"ids": [r["place_id"] for r in chunk]})
+            }
+            # Absent and None values bind as SQL NULL (JSON columns too, see
+            # NullableJSON), so COALESCE keeps the stored value for them
+            set_ = {
+                c: func.coalesce(stmt.excluded[c], table.c[c])
+                for c in columns
+                if c != "place_id"
+            }
+            # The parsed price columns follow price, even when it no longer parses
+            for c in PRICE_COLUMNS:
+                set_[c] = case(
+                    (stmt.excluded.price.is_not(None), stmt.excluded[c]),
+                    else_=table.c[c],
+                )
+            stmt = stmt.on_conflict_do_update(index_elements=["place_id"], set_=set_)
+            updated += len(existing)
+            inserted += len(chunk) - len(existing)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["place_id"])
+        result = db.execute(stmt.returning(table.c.id))
+        ids = [row[0] for row in result]
+        if on_conflict == "skip":
+            inserted += len(ids)
+            skipped += len(chunk) - len(ids)
+        touched_ids.extend(ids)
+
+    reindex_places(db, touched_ids)
+    reindex_search(db, touched_ids)
+    reindex_place_hours(db, touched_ids)
+    return {"inserted": inserted, "updated": updated, "skipped": skipped}
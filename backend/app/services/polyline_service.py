@@ -0,0 +1,168 @@
+import math
+from typing import Iterable, List, Optional
+import numpy as np
+
+# Encoded polylines (Google format, precision 5) as used by OSRM and the
+# frontend's @mapbox/polyline. Coordinates are (lat, lon) in 1e-5 degrees.
+PRECISION = 1e5
+METERS_PER_DEGREE = 111320.0
+# Web Mercator metres per pixel at zoom 0 on the equator (256 px tiles)
+METERS_PER_PIXEL_Z0 = 156543.03392
+# Simplifying for a zoom level keeps deviations under this many pixels
+ZOOM_TOLERANCE_PX = 0.5
+
+
+def _first_point_end(encoded: str) -> int:
+    """Index just past the first (lat, lon) pair of an encoded polyline."""
+    values = 0
+    for i, char in enumerate(encoded):
+        if ord(char) - 63 < 0x20:
+            values += 1
+            if values == 2:
+                return i + 1
+    raise ValueError("Truncated polyline")
+
+
+def first_point(encoded: str) -> tuple:
+    """First (lat, lon) of an encoded polyline in 1e-5 degrees."""
+    values, value, shift = [], 0, 0
+    for char in encoded[: _first_point_end(encoded)]:
+        b = ord(char) - 63
+        value |= (b & 0x1F) << shift
+        shift += 5
+        if b < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value, shift = 0, 0
+    return tuple(values)
+
+
+def join(pieces: Iterable[Optional[str]]) -> Optional[str]:
+    """
+    Concatenate encoded polylines that are contiguous (each starts where the
+    previous one ends, as OSRM steps and legs do) without decoding them: the
+    first point of every later piece is dropped, and its remaining deltas
+    then continue from the previous piece's last point.
+    """
+    joined = []
+    for piece in pieces:
+        if not piece:
+            continue
+        joined.append(piece[_first_point_end(piece) :] if joined else piece)
+    return "".join(joined) if joined else None
+
+
+def decode(encoded: str) -> np.ndarray:
+    """(n, 2) int64 array of (lat, lon) in 1e-5 degrees."""
+    if not encoded:
+        return np.zeros((0, 2), dtype=np.int64)
+    chunks = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    ends = chunks < 0x20
+    # Position of every chunk within its varint, 5 bits each
+    value_id = np.concatenate([[0], np.cumsum(ends)[:-1]])
+    starts = np.flatnonzero(np.concatenate([[True], ends[:-1]]))
+    position = np.arange(len(chunks)) - starts[value_id]
+    values = np.add.reduceat((chunks & 0x1F) << (5 * position), starts)
+    values = np.where(values & 1, ~(values >> 1), values >> 1)
+    return np.cumsum(values.reshape(-1, 2), axis=0)
+
+
+def encode(points: np.ndarray) -> Optional[str]:
+    """Encode an (n, 2) array of (lat, lon) in 1e-5 degrees."""
+    points = np.asarray(points, dtype=np.int64)
+    if not len(points):
+        return None
+    deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    # Up to 7 chunks of 5 bits per value covers every valid coordinate delta
+    shifted = values[:, None] >> (5 * np.arange(8))
+    present = shifted[:, :7] > 0
+    present[:, 0] = True
+    more = shifted[:, 1:] > 0
+    chars = (shifted[:, :7] & 0x1F) | np.where(more, 0x20, 0)
+    return (chars[present] + 63).astype(np.uint8).tobytes().decode("ascii")
+
+
+def tolerance_for_zoom(zoom: float, latitude: float) -> float:
+    """Metres covered by ZOOM_TOLERANCE_PX map pixels at a Web Mercator zoom."""
+    meters_per_pixel = METERS_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / 2**zoom
+    return meters_per_pixel * ZOOM_TOLERANCE_PX
+
+
+def simplify_mask(points: np.ndarray, tolerance_m: float, fixed=None) -> np.ndarray:
+    """
+    Douglas-Peucker on (lat, lon) 1e-5 degree points, tolerance in metres;
+    returns which points to keep. Indices in `fixed` are always kept, which
+    simplifies the pieces between them independently.
+    All open ranges are split in the same pass: every point is measured
+    against the chord of the range it lies in, and each range whose farthest
+    point exceeds the tolerance keeps that point.
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n < 3:
+        keep[:] = True
+        return keep
+    lat = points[:, 0] / PRECISION
+    x = points[:, 1] / PRECISION * METERS_PER_DEGREE * math.cos(math.radians(lat.mean()))
+    y = lat * METERS_PER_DEGREE
+    keep[0] = keep[-1] = True
+    if fixed is not None:
+        keep[fixed] = True
+    # Points of ranges that still need splitting
+    active = ~keep
+    while True:
+        kept = np.flatnonzero(keep)
+        idx = np.flatnonzero(active)
+        if not len(idx):
+            return keep
+        # Chord endpoints of the range each active point lies in
+        slot = np.searchsorted(kept, idx)
+        left, right = kept[slot - 1], kept[slot]
+        dx, dy = x[right] - x[left], y[right] - y[left]
+        rx, ry = x[idx] - x[left], y[idx] - y[left]
+        length = np.hypot(dx, dy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.where(length > 0, np.abs(dx * ry - dy * rx) / length, np.hypot(rx, ry))
+        # Farthest point of each range (the first one on ties)
+        starts = np.flatnonzero(np.diff(slot, prepend=-1))
+        sizes = np.diff(starts, append=len(idx))
+        farthest = np.maximum.reduceat(dist, starts)
+        split = np.repeat(farthest > tolerance_m, sizes)
+        candidates = np.flatnonzero(split & (dist == np.repeat(farthest, sizes)))
+        first = candidates[np.flatnonzero(np.diff(slot[candidates], prepend=-1))]
+        # Ranges within tolerance are final; the others are split at their farthest point
+        active[idx[~split]] = False
+        keep[idx[first]] = True
+        active[idx[first]] = False
+
+
+def simplify(encoded: Optional[str], tolerance_m: float) -> Optional[str]:
+    """Douglas-Peucker simplification of an encoded polyline."""
+    if not encoded:
+        return encoded
+    points = decode(encoded)
+    return encode(points[simplify_mask(points, tolerance_m)])
+
+
+def simplify_joined(pieces: List[Optional[str]], tolerance_m: float) -> List[Optional[str]]:
+    """
+    simplify() every piece of a contiguous chain (such as the legs of a
+    route) in one pass over all of their points. The simplified pieces keep
+    their end points, so join() still chains them.
+    """
+    decoded = [decode(piece) if piece else None for piece in pieces]
+    parts = [d for d in decoded if d is not None and len(d)]
+    if not parts:
+        return list(pieces)
+    points = np.concatenate(parts)
+    ends = np.cumsum([len(d) for d in parts])
+    # Each piece's first and last point are fixed
+    fixed = np.concatenate([ends - 1, np.concatenate([[0], ends[:-1]])])
+    keep = simplify_mask(points, tolerance_m, fixed)
+    simplified = iter(
+        encode(part[mask]) for part, mask in zip(parts, np.split(keep, ends[:-1]))
+    )
+    return [
+        next(simplified) if d is not None and len(d) else piece
+        for d, piece in zip(decoded, pieces)
+    ]
@@ -0,0 +1,112 @@
+import re
+from typing import Optional, Tuple
+from sqlalchemy import text
+
+# Upper bounds (VND) of price levels 1-3; anything above is level 4. A range
+# is levelled by its upper bound, an open-ended one ("₫1,000,000+") by its lower.
+LEVEL_BOUNDS_VND = [100_000, 300_000, 1_000_000]
+
+# Numeric columns derived from places.price
+PRICE_COLUMNS = {"price_min": "INTEGER", "price_max": "INTEGER", "price_level": "INTEGER"}
+
+BACKFILL_CHUNK_SIZE = 500
+
+_AMOUNT = r"(\d[\d,.]*)"
+_VND_RE = re.compile(
+    r"[₫đ]\s*" + _AMOUNT + r"(?:\s*[–—-]\s*[₫đ]?\s*" + _AMOUNT + r")?\s*(\+)?",
+    re.IGNORECASE,
+)
+_SYMBOLS_RE = re.compile(r"([$₫])\1{0,3}")
+
+
+def _amount(value: str) -> int:
+    return int(value.replace(",", "").replace(".", ""))
+
+
+def _level(amount: int) -> int:
+    for level, bound in enumerate(LEVEL_BOUNDS_VND, start=1):
+        if amount <= bound:
+            return level
+    return len(LEVEL_BOUNDS_VND) + 1
+
+
+def parse_price(value) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """
+    Parse a catalog price string into (min VND, max VND, level 1-4).
+    "₫20,000–200,000" -> (20000, 200000, 2), "₫1,000,000+" -> (1000000, None, 3)
+    (no upper bound), "₫0" -> (0, 0, 1), "$$" -> (None, None, 2).
+    Anything else (including amounts in other currencies) is (None, None, None).
+    """
+    value = (value or "").strip()
+    if not value:
+        return None, None, None
+    if _SYMBOLS_RE.fullmatch(value):
+        return None, None, len(value)
+
+    match = _VND_RE.fullmatch(value)
+    if not match:
+        return None, None, None
+    low, high, open_ended = match.groups()
+    low = _amount(low)
+    high = _amount(high) if high else low
+    if high < low:
+        # Malformed ranges such as "₫100,000–500,00": keep the lower bound only
+        high = None
+        open_ended = True
+    if open_ended:
+        return low, None, _level(low)
+    return low, high, _level(high)
+
+
+def price_columns(value) -> dict:
+    """parse_price() as a dict of the places columns it fills."""
+    return dict(zip(PRICE_COLUMNS, parse_price(value)))
+
+
+def price_condition(min_price: Optional[int], max_price: Optional[int]) -> str:
+    """
+    SQL condition keeping places whose price range overlaps
+    [:min_price, :max_price] (either bound may be omitted). Places without a
+    parsed VND price never match.
+    """
+    conditions = ["places.price_min IS NOT NULL"]
+    if max_price is not None:
+        conditions.append("places.price_min <= :max_price")
+    if min_price is not None:
+        # A NULL price_max is an open upper bound ("₫1,000,000+")
+        conditions.append("(places.price_max IS NULL OR places.price_max >= :min_price)")
+    return " AND ".join(conditions)
+
+
+def ensure_price_columns(conn):
+    """
+    Add the numeric price columns and their index to a catalog built before
+    they existed, filling them from places.price.
+    """
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_info(places)"))}
+    missing = [c for c in PRICE_COLUMNS if c not in existing]
+    for column in missing:
+        conn.execute(text(f"ALTER TABLE places ADD COLUMN {column} {PRICE_COLUMNS[column]}"))
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_places_price "
+            "ON places (price_min, price_max)"
+        )
+    )
+    if missing:
+        backfill_prices(conn)
+
+
+def backfill_prices(conn):
+    """Recompute the numeric price columns of every place."""
+    rows = conn.execute(text("SELECT id, price FROM places WHERE price IS NOT NULL")).fetchall()
+    update = text(
+        """
+        UPDATE places SET price_min = :price_min, price_max = :price_max,
+            price_level = :price_level
+        WHERE id = :id
+        """
+    )
+    for start in range(0, len(rows), BACKFILL_CHUNK_SIZE):
+        chunk = rows[start : start + BACKFILL_CHUNK_SIZE]
+        conn.execute(update, [{"id": row.id, **price_columns(row.price)} for row in chunk])
@@ -0,0 +1,228 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Persistent cache of OSRM results: one row per route leg (from, to, profile)
+# plus the visiting order OSRM /trip chose for a set of stops
+ROUTE_CACHE_PATH = os.getenv("ROUTE_CACHE_PATH", "app/route_cache.db")
+# Coordinates are rounded to 5 decimals (about 1 m) to build cache keys
+KEY_DECIMALS = 5
+TTL_SECONDS = 30 * 24 * 3600
+MAX_LEGS = 200_000
+MAX_ORDERS = 20_000
+# Least recently used rows are evicted in batches once a table is this much over its cap
+EVICT_SLACK = 0.05
+
+
+def point_key(point: dict) -> str:
+    return f"{float(point['lat']):.{KEY_DECIMALS}f},{float(point['lon']):.{KEY_DECIMALS}f}"
+
+
+def leg_key(profile: str, start: dict, end: dict) -> str:
+    return f"{profile}:{point_key(start)};{point_key(end)}"
+
+
+def order_key(profile: str, points: List[dict]) -> str:
+    # The first stop is fixed (source=first); the rest are a set
+    keys = [point_key(p) for p in points]
+    return f"{profile}:{keys[0]}|{';'.join(sorted(keys[1:]))}"
+
+
+class RouteCache:
+    """
+    SQLite-backed route cache with TTL expiry and LRU eviction.
+    Legs store distance (m), duration (s), the encoded leg polyline and the
+    leg's turn instructions. Orders store the quantized stop keys in the order
+    OSRM /trip visits them. Every method blocks on SQLite: async callers run
+    them with asyncio.to_thread().
+    """
+
+    def __init__(self, path: str = ROUTE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        # Rows per table, kept up to date on insert, expiry and eviction
+        # instead of a count(*) per insert
+        self._counts = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS route_legs (
+                    key TEXT PRIMARY KEY,
+                    distance REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    geometry TEXT,
+                    instructions TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_route_legs_accessed ON route_legs (accessed_at);
+                CREATE TABLE IF NOT EXISTS route_orders (
+                    key TEXT PRIMARY KEY,
+                    stops TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_route_orders_accessed ON route_orders (accessed_at);
+                """
+            )
+            for table in ("route_legs", "route_orders"):
+                self._counts[table] = conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _get(
+        self, table: str, columns: str, keys: List[str], track: bool = True
+    ) -> Dict[str, tuple]:
+        now = time.time()
+        found, stale = {}, []
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = conn.execute(
+                    f"SELECT key, created_at, {columns} FROM {table} "
+                    f"WHERE key IN ({', '.join('?' for _ in chunk)})",
+                    chunk,
+                )
+                for key, created_at, *values in rows:
+                    if now - created_at > TTL_SECONDS:
+                        stale.append(key)
+                    else:
+                        found[key] = values
+            if stale:
+                self._counts[table] -= conn.executemany(
+                    f"DELETE FROM {table} WHERE key = ?", [(k,) for k in stale]
+                ).rowcount
+            if found and track:
+                conn.executemany(
+                    f"UPDATE {table} SET accessed_at = ? WHERE key = ?",
+                    [(now, k) for k in found],
+                )
+            conn.commit()
+            self.expired += len(stale)
+            if track:
+                self.hits += len(found)
+                self.misses += len(set(keys)) - len(found)
+        return found
+
+    def _count_new(self, conn: sqlite3.Connection, table: str, keys: List[str]):
+        """Add the keys not stored yet to the row count, before they are inserted."""
+        keys = list(set(keys))
+        existing = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            existing += conn.execute(
+                f"SELECT count(*) FROM {table} "
+                f"WHERE key IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            ).fetchone()[0]
+        self._counts[table] += len(keys) - existing
+
+    def _evict(self, conn: sqlite3.Connection, table: str, cap: int):
+        count = self._counts[table]
+        if count <= cap * (1 + EVICT_SLACK):
+            return
+        evicted = conn.execute(
+            f"DELETE FROM {table} WHERE key IN "
+            f"(SELECT key FROM {table} ORDER BY accessed_at LIMIT ?)",
+            (count - cap,),
+        ).rowcount
+        self._counts[table] -= evicted
+        self.evictions += evicted
+
+    def get_legs(self, keys: List[str], track: bool = True) -> Dict[str, dict]:
+        """
+        Cached, unexpired legs by leg_key(); missing keys are absent. With
+        track=False (bulk probes) hit/miss counters and LRU order are untouched.
+        """
+        rows = self._get(
+            "route_legs", "distance, duration, geometry, instructions", keys, track
+        )
+        return {
+            key: {
+                "distance": distance,
+                "duration": duration,
+                "geometry": geometry,
+                "instructions": json.loads(instructions) if instructions else [],
+            }
+            for key, (distance, duration, geometry, instructions) in rows.items()
+        }
+
+    def put_legs(self, legs: Dict[str, dict]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._count_new(conn, "route_legs", list(legs))
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO route_legs
+                    (key, distance, duration, geometry, instructions, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        key,
+                        leg["distance"],
+                        leg["duration"],
+                        leg.get("geometry"),
+                        json.dumps(leg.get("instructions") or []),
+                        now,
+                        now,
+                    )
+                    for key, leg in legs.items()
+                ],
+            )
+            self._evict(conn, "route_legs", MAX_LEGS)
+            conn.commit()
+
+    def get_order(self, key: str) -> Optional[List[str]]:
+        """Cached stop order (point_key() values) for order_key(), if any."""
+        row = self._get("route_orders", "stops", [key]).get(key)
+        return json.loads(row[0]) if row else None
+
+    def put_order(self, key: str, stops: List[str]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._count_new(conn, "route_orders", [key])
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO route_orders (key, stops, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(stops), now, now),
+            )
+            self._evict(conn, "route_orders", MAX_ORDERS)
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._connect()
+            legs = self._counts["route_legs"]
+            orders = self._counts["route_orders"]
+        lookups = self.hits + self.misses
+        return {
+            "legs": legs,
+            "orders": orders,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+route_cache = RouteCache()
@@ -0,0 +1,298 @@
+import math
+from typing import List, Optional, Tuple
+import numpy as np
+from .catalog_loader import CatalogLoader, CatalogVersion, usable_rows
+from .place_projection_service import project
+from .place_service import get_places_by_ids
+
+EARTH_RADIUS_M = 6371000
+# Points per k-d tree leaf; leaves are scanned with numpy
+LEAF_SIZE = 32
+MAX_K = 50
+# Reverse geocoding: the city is the one most of the CITY_VOTERS nearest
+# places belong to, and none when the nearest place is farther than
+# CITY_MAX_DISTANCE_M. The nearest place's address is used as the display
+# name within ADDRESS_MAX_DISTANCE_M.
+CITY_VOTERS = 7
+CITY_MAX_DISTANCE_M = 15000
+ADDRESS_MAX_DISTANCE_M = 200
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    """(n, 3) points on the unit sphere; chord length grows with great-circle distance."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_m(chord2: np.ndarray) -> np.ndarray:
+    """Great-circle metres from squared chord lengths on the unit sphere."""
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(chord2) / 2))
+
+
+def m_to_chord2(meters: float) -> float:
+    return (2 * math.sin(min(math.pi / 2, meters / (2 * EARTH_RADIUS_M)))) ** 2
+
+
+class KDTree:
+    """
+    Static k-d tree in flat arrays: each node splits its points at the
+    median of their widest dimension. A query descends to the leaf holding
+    the query point, then backtracks into the far side of a split only when
+    the splitting plane is closer than the k-th best point found so far.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.order = np.arange(len(points))
+        start, end, left, right, split = [], [], [], [], []
+        stack = [(0, len(points), -1, False)]
+        while stack:
+            s, e, parent, is_right = stack.pop()
+            node = len(start)
+            if parent >= 0:
+                (right if is_right else left)[parent] = node
+            start.append(s)
+            end.append(e)
+            left.append(-1)
+            right.append(-1)
+            split.append((0, 0.0))
+            if e - s > leaf_size:
+                chunk = points[self.order[s:e]]
+                dim = int(np.argmax(chunk.max(axis=0) - chunk.min(axis=0)))
+                mid = (e - s) // 2
+                part = np.argpartition(chunk[:, dim], mid)
+                self.order[s:e] = self.order[s:e][part]
+                # Points left of the split are <= its value, points right of it >=
+                split[node] = (dim, float(chunk[part[mid], dim]))
+                stack.append((s + mid, e, node, True))
+                stack.append((s, s + mid, node, False))
+        self.points = points[self.order]
+        self.start, self.end = start, end
+        self.left, self.right, self.split = left, right, split
+
+        # Leaves as padded blocks with bounding boxes for query_many()
+        leaves = [n for n in range(len(start)) if left[n] < 0 and end[n] > start[n]]
+        width = max((end[n] - start[n] for n in leaves), default=0)
+        dims = points.shape[1]
+        self.leaf_points = np.full((len(leaves), width, dims), np.inf)
+        self.leaf_index = np.full((len(leaves), width), -1, dtype=np.int64)
+        self.leaf_lo = np.empty((dims, len(leaves)))
+        self.leaf_hi = np.empty((dims, len(leaves)))
+        for j, n in enumerate(leaves):
+            s, e = start[n], end[n]
+            self.leaf_points[j, : e - s] = self.points[s:e]
+            self.leaf_index[j, : e - s] = self.order[s:e]
+            self.leaf_lo[:, j] = self.points[s:e].min(axis=0)
+            self.leaf_hi[:, j] = self.points[s:e].max(axis=0)
+
+    def query(
+        self, q: np.ndarray, k: int, max_distance2: float = np.inf
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Squared distances and indices of the (up to) k nearest points within max_distance2."""
+        # Plain floats for the traversal: numpy's per-call overhead dominates there
+        qt = q.tolist()
+        best_d = np.empty(0)
+        best_i = np.empty(0, dtype=np.int64)
+        bound = max_distance2
+        stack = [(0, 0.0)]
+        while stack:
+            node, plane = stack.pop()
+            if plane > bound:
+                continue
+            while self.left[node] >= 0:
+                dim, value = self.split[node]
+                gap = qt[dim] - value
+                if gap < 0:
+                    near, far = self.left[node], self.right[node]
+                else:
+                    near, far = self.right[node], self.left[node]
+                if gap * gap <= bound:
+                    stack.append((far, gap * gap))
+                node = near
+            s, e = self.start[node], self.end[node]
+            diff = self.points[s:e] - q
+            dist = np.einsum("ij,ij->i", diff, diff)
+            best_d = np.concatenate([best_d, dist])
+            best_i = np.concatenate([best_i, self.order[s:e]])
+            if len(best_d) > k:
+                top = np.argpartition(best_d, k - 1)[:k]
+                best_d, best_i = best_d[top], best_i[top]
+            if len(best_d) == k:
+                bound = min(bound, float(best_d.max()))
+        keep = best_d <= max_distance2
+        best_d, best_i = best_d[keep], best_i[keep]
+        order = np.argsort(best_d, kind="stable")
+        return best_d[order], best_i[order]
+
+    def query_many(
+        self, queries: np.ndarray, k: int, max_distance2: float = np.inf
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        query() for many points at once, as (m, k) squared distances and
+        indices (inf and -1 where fewer than k points are in range). Each
+        round scans, for every query still open, its next-nearest leaf by
+        bounding box, until no leaf box is closer than the k-th best point.
+        """
+        m = len(queries)
+        best_d = np.full((m, k), np.inf)
+        best_i = np.full((m, k), -1, dtype=np.int64)
+        if not m or not len(self.leaf_points):
+            return best_d, best_i
+        box_d = np.zeros((m, self.leaf_lo.shape[1]))
+        for dim in range(queries.shape[1]):
+            q = queries[:, dim, None]
+            gap = np.maximum(np.maximum(self.leaf_lo[dim] - q, q - self.leaf_hi[dim]), 0)
+            box_d += gap * gap
+        leaf_order = np.argsort(box_d, axis=1)
+        open_rows = np.arange(m)
+        for r in range(leaf_order.shape[1]):
+            leaf = leaf_order[open_rows, r]
+            bound = np.minimum(best_d[open_rows, -1], max_distance2)
+            still = box_d[open_rows, leaf] <= bound
+            open_rows, leaf = open_rows[still], leaf[still]
+            if not len(open_rows):
+                break
+            diff = self.leaf_points[leaf] - queries[open_rows, None]
+            dist = np.einsum("qpd,qpd->qp", diff, diff)
+            cand_d = np.concatenate([best_d[open_rows], dist], axis=1)
+            cand_i = np.concatenate([best_i[open_rows], self.leaf_index[leaf]], axis=1)
+            top = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            top_d = np.take_along_axis(cand_d, top, axis=1)
+            # Keep each row's k best sorted, so column -1 is the k-th best
+            ranked = np.take_along_axis(top, np.argsort(top_d, axis=1), axis=1)
+            best_d[open_rows] = np.take_along_axis(cand_d, ranked, axis=1)
+            best_i[open_rows] = np.take_along_axis(cand_i, ranked, axis=1)
+        outside = best_d > max_distance2
+        best_d[outside] = np.inf
+        best_i[outside] = -1
+        return best_d, best_i
+
+
+class PlaceLocator:
+    """Every catalog place with coordinates in a KDTree over the unit sphere."""
+
+    def __init__(self, version: CatalogVersion):
+        self.db_path = version.db_path
+        self.mtime = version.mtime
+        rows = usable_rows(version.place_rows(), coordinates=True)
+        self.places = [
+            {
+                "place_id": row.place_id,
+                "title": row.title,
+                "address": row.address,
+                "city_name": row.city_name,
+            }
+            for row in rows
+        ]
+        lat = np.array([float(row.lat) for row in rows])
+        lon = np.array([float(row.lon) for row in rows])
+        self.tree = KDTree(unit_vectors(lat, lon))
+        print(f"Loaded place locator: {len(rows)} places")
+
+    def nearest(
+        self, points: List[Tuple[float, float]], k: int = 5, max_distance_m: Optional[float] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        For each (lat, lon), (place index, distance in metres) of its k
+        nearest places (at most MAX_K), nearest first.
+        """
+        k = min(k, MAX_K)
+        bound = m_to_chord2(max_distance_m) if max_distance_m is not None else np.inf
+        if not points:
+            return []
+        queries = unit_vectors([p[0] for p in points], [p[1] for p in points])
+        if len(points) == 1:
+            dist2, idx = self.tree.query(queries[0], k, bound)
+            return [list(zip(idx.tolist(), chord_to_m(dist2).tolist()))]
+        dist2, idx = self.tree.query_many(queries, k, bound)
+        meters = chord_to_m(np.minimum(dist2, 4.0))
+        return [
+            [(i, d) for i, d in zip(row_i, row_m) if i >= 0]
+            for row_i, row_m in zip(idx.tolist(), meters.tolist())
+        ]
+
+    def city_of(self, neighbours: List[Tuple[int, float]]) -> Optional[str]:
+        """City most of the first CITY_VOTERS neighbours within CITY_MAX_DISTANCE_M belong to."""
+        votes = {}
+        for i, distance in neighbours[:CITY_VOTERS]:
+            city = self.places[i]["city_name"]
+            if city and distance <= CITY_MAX_DISTANCE_M:
+                votes[city] = votes.get(city, 0) + 1
+        # Ties go to the city of the nearer places (dicts keep insertion order)
+        return max(votes, key=votes.get) if votes else None
+
+    def reverse(self, points: List[Tuple[float, float]]) -> List[dict]:
+        """
+        Containing city and nearest place of each (lat, lon). display_name is
+        that place's address when it is close enough, else the city.
+        """
+        results = []
+        for (lat, lon), neighbours in zip(
+            points, self.nearest(points, CITY_VOTERS, CITY_MAX_DISTANCE_M)
+        ):
+            result = {
+                "lat": lat,
+                "lon": lon,
+                "city_name": None,
+                "display_name": None,
+                "source": "local",
+                "place": None,
+            }
+            if neighbours:
+                city = self.city_of(neighbours)
+                i, distance = neighbours[0]
+                place = self.places[i]
+                near = distance <= ADDRESS_MAX_DISTANCE_M and place["address"]
+                result.update(
+                    city_name=city,
+                    display_name=place["address"] if near else city,
+                    place={**place, "distance_m": distance},
+                )
+            results.append(result)
+        return results
+
+
+_loader = CatalogLoader("place locator", PlaceLocator)
+
+
+def get_locator() -> PlaceLocator:
+    """Return the current locator; a changed catalog DB file is reloaded in the background."""
+    return _loader.get()
+
+
+def nearest_places(
+    db,
+    points: List[Tuple[float, float]],
+    k: int,
+    max_distance_m: Optional[float],
+    columns: List[str],
+) -> List[dict]:
+    """
+    The k nearest catalog places of each (lat, lon), projected to `columns`
+    plus distance_m, with the point's city; one place lookup for all points.
+    """
+    locator = get_locator()
+    neighbours = locator.nearest(points, max(k, CITY_VOTERS))
+    ids = list(
+        dict.fromkeys(locator.places[i]["place_id"] for row in neighbours for i, _ in row)
+    )
+    fetch = columns if "place_id" in columns else [*columns, "place_id"]
+    found = {place["place_id"]: place for place in get_places_by_ids(db, ids, fetch)}
+    results = []
+    for (lat, lon), row in zip(points, neighbours):
+        places = []
+        for i, distance in row[:k]:
+            if max_distance_m is not None and distance > max_distance_m:
+                break
+            place = found.get(locator.places[i]["place_id"])
+            if place is not None:
+                places.append({**project(place, columns), "distance_m": distance})
+        results.append(
+            {
+                "latitude": lat,
+                "longitude": lon,
+                "city_name": locator.city_of(row),
+                "count": len(places),
+                "places": places,
+            }
+        )
+    return results
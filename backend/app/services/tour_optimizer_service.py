@@ -0,0 +1,172 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+import numpy as np
+from .route_cache_service import leg_key, route_cache
+
+EARTH_RADIUS_M = 6371000
+# Straight-line distances are turned into estimated driving seconds for pairs
+# that have no cached OSRM duration
+DETOUR_FACTOR = 1.3
+ESTIMATED_SPEED_MPS = 25 / 3.6
+# Cached durations are looked up for all n * (n - 1) pairs up to this many stops
+CACHED_DURATIONS_MAX_STOPS = 100
+# Improvement stops after this many 2-opt + Or-opt rounds without convergence
+MAX_ROUNDS = 50
+OR_OPT_SEGMENT = 3
+# Tours with at least this many stops are solved in a worker process so a
+# large request does not hold the GIL for the others
+POOL_MIN_STOPS = 80
+POOL_WORKERS = 2
+
+_pool = None
+
+
+def distance_matrix(points: List[dict]) -> np.ndarray:
+    """Pairwise great-circle distances (m) between {"lat", "lon"} points."""
+    lat = np.radians([float(p["lat"]) for p in points])
+    lon = np.radians([float(p["lon"]) for p in points])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = (
+        np.sin(dlat / 2) ** 2
+        + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def duration_matrix(points: List[dict], profile: str = "driving") -> np.ndarray:
+    """
+    Symmetric travel-time matrix (s): cached OSRM leg durations where both or
+    either direction is cached, estimates from straight-line distance elsewhere.
+    """
+    n = len(points)
+    durations = distance_matrix(points) * DETOUR_FACTOR / ESTIMATED_SPEED_MPS
+    if n > CACHED_DURATIONS_MAX_STOPS:
+        return durations
+    pairs = {
+        leg_key(profile, points[i], points[j]): (i, j)
+        for i in range(n)
+        for j in range(n)
+        if i != j
+    }
+    cached = route_cache.get_legs(list(pairs), track=False)
+    if cached:
+        known = np.full((n, n), np.nan)
+        for key, leg in cached.items():
+            i, j = pairs[key]
+            known[i, j] = leg["duration"]
+        # Use the mean of both directions when both are cached
+        both = np.where(np.isnan(known), known.T, known)
+        both = np.where(np.isnan(known.T), both, (both + known.T) / 2)
+        durations = np.where(np.isnan(both), durations, both)
+    return durations
+
+
+def _two_opt(cost: np.ndarray, nodes: np.ndarray) -> bool:
+    """Best 2-opt move for each i: reverse nodes[i+1..j]; first and last stay put."""
+    improved = False
+    m = len(nodes)
+    for i in range(m - 3):
+        a, b = nodes[i], nodes[i + 1]
+        j = np.arange(i + 2, m - 1)
+        c, e = nodes[j], nodes[j + 1]
+        delta = cost[a, c] + cost[b, e] - cost[a, b] - cost[c, e]
+        best = int(np.argmin(delta))
+        if delta[best] < -1e-9:
+            k = j[best]
+            nodes[i + 1 : k + 1] = nodes[i + 1 : k + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt(cost: np.ndarray, nodes: np.ndarray) -> bool:
+    """Move segments of 1..OR_OPT_SEGMENT stops (optionally reversed) elsewhere."""
+    improved = False
+    for length in range(1, OR_OPT_SEGMENT + 1):
+        s = 1
+        while s + length < len(nodes):
+            seg = nodes[s : s + length].copy()
+            prev, nxt = nodes[s - 1], nodes[s + length]
+            first, last = seg[0], seg[-1]
+            gain = cost[prev, first] + cost[last, nxt] - cost[prev, nxt]
+
+            rest = np.concatenate([nodes[:s], nodes[s + length :]])
+            k = np.arange(len(rest) - 1)  # insert between rest[k] and rest[k + 1]
+            u, v = rest[k], rest[k + 1]
+            forward = cost[u, first] + cost[last, v] - cost[u, v]
+            backward = cost[u, last] + cost[first, v] - cost[u, v]
+            insert = np.minimum(forward, backward)
+            insert[s - 1] = np.inf  # where the segment already is
+            best = int(np.argmin(insert))
+            if insert[best] - gain < -1e-9:
+                piece = seg if forward[best] <= backward[best] else seg[::-1]
+                nodes[:] = np.concatenate([rest[: best + 1], piece, rest[best + 1 :]])
+                improved = True
+            s += 1
+    return improved
+
+
+def solve_tour(cost: np.ndarray, start: int = 0, roundtrip: bool = False) -> List[int]:
+    """
+    Visiting order of all stops for a travel-cost matrix, beginning at
+    `start`: nearest-neighbour construction, then 2-opt and Or-opt until no
+    move improves the tour. With roundtrip=False the tour ends anywhere.
+    """
+    n = len(cost)
+    if n <= 2:
+        return [start] + [i for i in range(n) if i != start]
+
+    # Node n is a zero-cost end for open tours, so both cases become a path
+    # whose first and last nodes are fixed
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = cost
+
+    order = [start]
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+    for _ in range(n - 1):
+        row = np.where(unvisited, cost[order[-1]], np.inf)
+        nxt = int(np.argmin(row))
+        order.append(nxt)
+        unvisited[nxt] = False
+
+    nodes = np.asarray(order + [start if roundtrip else n])
+    for _ in range(MAX_ROUNDS):
+        improved = _two_opt(padded, nodes)
+        improved = _or_opt(padded, nodes) or improved
+        if not improved:
+            break
+    return nodes[:-1].tolist()
+
+
+def tour_cost(cost: np.ndarray, order: List[int], roundtrip: bool = False) -> float:
+    total = float(sum(cost[a, b] for a, b in zip(order, order[1:])))
+    if roundtrip and len(order) > 1:
+        total += float(cost[order[-1], order[0]])
+    return total
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def optimize_order(
+    points: List[dict],
+    profile: str = "driving",
+    roundtrip: bool = False,
+    cost: Optional[np.ndarray] = None,
+) -> List[int]:
+    """
+    Indices of `points` in visiting order, starting with the first point
+    (OSRM's source=first), using duration_matrix() unless `cost` is given.
+    """
+    if cost is None:
+        cost = duration_matrix(points, profile)
+    if len(points) >= POOL_MIN_STOPS:
+        return _get_pool().submit(solve_tour, cost, 0, roundtrip).result()
+    return solve_tour(cost, 0, roundtrip)
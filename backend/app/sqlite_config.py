@@ -0,0 +1,17 @@
+from sqlalchemy import event
+
+# Prepared statements kept per connection by the sqlite3 driver (default 128)
+STATEMENT_CACHE_SIZE = 512
+
+
+def apply_pragmas(engine, pragmas: dict):
+    """Run the given PRAGMAs on every new DBAPI connection of `engine`."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return engine
@@ -1,12 +1,47 @@
 # database.py
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from .user_models import UserBase
+from .sqlite_config import STATEMENT_CACHE_SIZE, apply_pragmas
+from .services.cost_service import ensure_cost_columns
 
 DATABASE_URL = "sqlite:///app/user.db"
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///app/user.db"
 
-engine = create_engine(DATABASE_URL)
+# WAL lets trip/auth reads proceed while a write is in flight; NORMAL is
+# durable across application crashes in WAL mode
+USER_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -8 * 1024,
+    "temp_store": "MEMORY",
+}
+
+engine = apply_pragmas(
+    create_engine(
+        DATABASE_URL,
+        connect_args={
+            "cached_statements": STATEMENT_CACHE_SIZE,
+            "check_same_thread": False,
+        },
+    ),
+    USER_PRAGMAS,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# asyncio (aiosqlite) engine for async def endpoints and dependencies.
+# expire_on_commit=False keeps returned objects (e.g. the current user)
+# readable after their session is closed.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"cached_statements": STATEMENT_CACHE_SIZE},
+)
+apply_pragmas(async_engine.sync_engine, USER_PRAGMAS)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 metadata = MetaData()
 
 
@@ -18,4 +53,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 UserBase.metadata.create_all(bind=engine)
+
+with engine.begin() as conn:
+    ensure_cost_columns(conn)
@@ -110,6 +110,9 @@ class Cost(UserBase):
     detail = Column(String, nullable=True)
     originalAmount = Column(String, default="0")
     originalCurrency = Column(String, default="USD")
+    # originalAmount parsed to numbers (see services.cost_service)
+    amount_min = Column(Float, nullable=True)
+    amount_max = Column(Float, nullable=True)
 
     # Relationship
     destination = relationship("Destination", back_populates="costs")
@@ -0,0 +1,87 @@
+"""
+Day planner benchmark: cluster_days + per-day ordering (plan_days) for 10-500
+catalog places of one city, compared with the client's previous split
+(consecutive slices of the candidate list, unordered within a day).
+
+Reports wall time, the largest/smallest day and the total straight-line
+length of all days.
+
+Usage (from backend/):
+    python benchmarks/bench_day_planner.py [path/to/merged.db] [city]
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Keep the benchmark away from the real route cache
+os.environ.setdefault("ROUTE_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "route_cache.db"))
+
+import numpy as np
+
+from app.services.itinerary_planner_service import plan_days
+from app.services.tour_optimizer_service import distance_matrix
+
+SIZES = [10, 25, 50, 100, 250, 500]
+
+
+def load_points(db_path: str, city: str) -> list:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    rows = conn.execute(
+        "SELECT place_id, gps_coordinates FROM places WHERE city_name = ?", (city,)
+    ).fetchall()
+    conn.close()
+    points = []
+    for place_id, gps in rows:
+        gps = json.loads(gps or "null") or {}
+        if gps.get("latitude") is not None and gps.get("longitude") is not None:
+            points.append({"place_id": place_id, "lat": gps["latitude"], "lon": gps["longitude"]})
+    return points
+
+
+def path_km(stops: list) -> float:
+    if len(stops) < 2:
+        return 0.0
+    return float(np.trace(distance_matrix(stops), offset=1)) / 1000
+
+
+def sliced_days(points: list, num_days: int) -> list:
+    per_day, remainder = divmod(len(points), num_days)
+    days, assigned = [], 0
+    for i in range(num_days):
+        count = per_day + (i < remainder)
+        days.append(points[assigned : assigned + count])
+        assigned += count
+    return days
+
+
+def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "app/merged.db"
+    city = sys.argv[2] if len(sys.argv) > 2 else "HCMC, Vietnam"
+    points = load_points(db_path, city)
+    rng = random.Random(0)
+    print(f"{len(points)} places with coordinates in {city}")
+    print(f"{'places':>6} {'days':>4} {'time':>9} {'sizes':>9} {'planned km':>11} {'sliced km':>10}")
+    for n in SIZES:
+        if n > len(points):
+            break
+        sample = rng.sample(points, n)
+        for num_days in (2, 3, 5):
+            start = time.perf_counter()
+            days = plan_days(sample, num_days)
+            elapsed = time.perf_counter() - start
+            sizes = [len(d["places"]) for d in days]
+            planned = sum(path_km(d["places"]) for d in days)
+            sliced = sum(path_km(d) for d in sliced_days(sample, num_days))
+            print(
+                f"{n:>6} {num_days:>4} {elapsed * 1000:>7.1f}ms {min(sizes):>4}-{max(sizes):<4}"
+                f" {planned:>11.1f} {sliced:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Local gazetteer lookups for queries naming catalog places: each sampled
+title is queried as written, without diacritics in lower case, and with a
+", <city>" suffix. Reports lookup latency, the share answered locally
+(coverage >= MIN_COVERAGE, so Nominatim is not called) and the share of
+those that resolve to a point within 100 m of the named place.
+
+Usage (from backend/):
+    python benchmarks/bench_gazetteer.py [samples]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from app.services.gazetteer_service import MIN_COVERAGE, get_gazetteer
+from app.services.place_search_service import normalize_text
+from app.services.tour_optimizer_service import distance_matrix
+
+CITY_SUFFIX = {
+    "HCMC, Vietnam": "Ho Chi Minh City",
+    "Dalat, Vietnam": "Da Lat",
+    "Hue, Vietnam": "Hue",
+}
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    start = time.perf_counter()
+    gazetteer = get_gazetteer()
+    print(f"index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(0)
+    picks = rng.sample(range(len(gazetteer.places)), min(samples, len(gazetteer.places)))
+    variants = {
+        "as written": lambda p: p["title"],
+        "no accents": lambda p: normalize_text(p["title"]),
+        "with city": lambda p: f"{p['title']}, {CITY_SUFFIX.get(p['city_name'], '')}",
+    }
+    for name, make in variants.items():
+        times, local, near = [], 0, 0
+        for i in picks:
+            place = gazetteer.places[i]
+            query = make(place)
+            start = time.perf_counter()
+            result = gazetteer.lookup(query)
+            times.append(time.perf_counter() - start)
+            if result and result["coverage"] >= MIN_COVERAGE:
+                local += 1
+                target = {"lat": gazetteer.lat[i], "lon": gazetteer.lon[i]}
+                if distance_matrix([target, result])[0, 1] <= 100:
+                    near += 1
+        times = np.array(times) * 1e6
+        print(
+            f"  {name:<11} p50 {np.percentile(times, 50):6.1f} us  p99 {np.percentile(times, 99):7.1f} us"
+            f"  local {local / len(picks):6.1%}  within 100 m {near / max(local, 1):6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Connection reuse of the shared HTTP client (app/services/http_client.py)
+under load, against a local fake upstream that counts TCP connections.
+
+- legacy: one requests.get() per call from host_limit threads, as the sync
+  endpoints did before; every call opens a new connection.
+- shared: the same calls through http_client.get() on the shared pool; the
+  connection count stays at the service's host_limit.
+- retry: an upstream answering 503 to the first attempt of every call; all
+  calls still succeed after one jittered retry.
+
+The upstream is the FakeUpstream of tests/test_http_client.py, which
+asserts the same connection bound on every test run; this script adds the
+legacy comparison and timings. Exits non-zero if the shared client opens
+more connections than host_limit.
+
+Usage (from backend/):
+    python benchmarks/bench_http_reuse.py [calls]
+
+The OSRM service settings are used (see the test module).
+"""
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import requests
+
+from app.services import http_client
+from tests.test_http_client import LATENCY_S, SERVICE, FakeUpstream
+
+
+def legacy(upstream, calls, threads):
+    def call(i):
+        r = requests.get(
+            f"{upstream.url}/search", params={"q": f"place {i}"}, timeout=10
+        )
+        r.raise_for_status()
+        return r.json()
+
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(call, range(calls)))
+
+
+async def shared(url, calls):
+    async def call(i):
+        try:
+            r = await http_client.get(SERVICE, f"{url}/search", params={"q": f"place {i}"})
+            r.raise_for_status()
+            return r.json()
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    try:
+        return await asyncio.gather(*(call(i) for i in range(calls)))
+    finally:
+        await http_client.aclose()
+
+
+def report(name, upstream, calls, results, elapsed):
+    ok = sum(1 for r in results if r and "error" not in r)
+    print(
+        f"  {name:<8} {calls:5d} calls {ok:5d} ok {upstream.requests:5d} requests"
+        f" {upstream.connections:5d} connections (peak {upstream.peak_open:3d} open)"
+        f" {elapsed:7.2f} s"
+    )
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    host_limit = http_client.SERVICES[SERVICE]["host_limit"]
+    print(f"{LATENCY_S * 1000:.0f} ms upstream latency, {SERVICE} host_limit {host_limit}")
+
+    upstream = FakeUpstream()
+
+    start = time.perf_counter()
+    results = legacy(upstream, calls, host_limit)
+    report("legacy", upstream, calls, results, time.perf_counter() - start)
+
+    upstream.reset()
+    start = time.perf_counter()
+    results = asyncio.run(shared(upstream.url, calls))
+    report("shared", upstream, calls, results, time.perf_counter() - start)
+    reused = upstream.connections <= host_limit
+    upstream.stop()
+
+    flaky = FakeUpstream(flaky=True)
+    start = time.perf_counter()
+    results = asyncio.run(shared(flaky.url, calls // 4))
+    report("retry", flaky, calls // 4, results, time.perf_counter() - start)
+    flaky.stop()
+
+    if not reused:
+        sys.exit(f"shared client opened more than {host_limit} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Nearest-place lookups: the in-memory k-d tree (one point at a time and in
+batches) against a brute-force haversine scan of every catalog place.
+Checks that all three return the same places.
+
+Usage (from backend/):
+    python benchmarks/bench_nearest.py [points] [k]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from app.services.spatial_index_service import EARTH_RADIUS_M, get_locator
+
+
+def haversine(lat, lon, plat, plon):
+    lat, lon, plat, plon = map(np.radians, (lat, lon, plat, plon))
+    a = (
+        np.sin((plat - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(plat) * np.sin((plon - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def brute_force(lat, lon, plat, plon, k):
+    dist = haversine(lat, lon, plat, plon)
+    top = np.argpartition(dist, k - 1)[:k]
+    return np.sort(dist[top])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    start = time.perf_counter()
+    locator = get_locator()
+    print(f"tree built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Points spread over the three cities' extents
+    rng = np.random.default_rng(0)
+    tree = locator.tree
+    inverse = np.empty(len(tree.order), dtype=np.int64)
+    inverse[tree.order] = np.arange(len(tree.order))
+    xyz = tree.points[inverse]
+    plat = np.degrees(np.arcsin(xyz[:, 2]))
+    plon = np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0]))
+    anchors = rng.integers(len(plat), size=n)
+    points = list(
+        zip(
+            (plat[anchors] + rng.normal(0, 0.01, n)).tolist(),
+            (plon[anchors] + rng.normal(0, 0.01, n)).tolist(),
+        )
+    )
+
+    start = time.perf_counter()
+    expected = [brute_force(lat, lon, plat, plon, k) for lat, lon in points]
+    brute = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [locator.nearest([p], k)[0] for p in points]
+    one_by_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = locator.nearest(points, k)
+    batched = time.perf_counter() - start
+
+    for name, got in (("single", single), ("batch", batch)):
+        # Compared by distance: co-located places may come in either order
+        mismatches = sum(
+            not np.allclose([d for _, d in row], want, rtol=0, atol=1e-3)
+            for row, want in zip(got, expected)
+        )
+        print(f"  {name:<6} results differing from brute force: {mismatches}")
+    for name, elapsed in (
+        ("brute force", brute),
+        ("k-d tree", one_by_one),
+        ("k-d tree batch", batched),
+    ):
+        print(f"  {name:<15} {elapsed / n * 1e6:8.1f} us/point")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Throughput of the read-only place endpoints under concurrent load, with a
+default SQLAlchemy engine (the old configuration) vs the tuned catalog engine
+from app.place_database.
+
+Usage (from backend/, with a catalog at app/merged.db):
+    python benchmarks/bench_places_concurrency.py [concurrency] [seconds]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.place_database import DATABASE_URL, engine as tuned_engine, get_db
+
+
+def sample_requests(n: int = 200) -> list:
+    """A reproducible mix of nearby/search/byid/batch requests over the catalog."""
+    rng = random.Random(42)
+    with tuned_engine.connect() as conn:
+        places = conn.execute(
+            text(
+                """
+                SELECT places.place_id,
+                    json_extract(gps_coordinates, '$.latitude'),
+                    json_extract(gps_coordinates, '$.longitude'),
+                    place_types.type_id
+                FROM places JOIN place_types ON place_types.place_id = places.id
+                WHERE json_extract(gps_coordinates, '$.latitude') IS NOT NULL
+                """
+            )
+        ).fetchall()
+    requests = []
+    for _ in range(n):
+        place_id, lat, lon, type_id = rng.choice(places)
+        kind = rng.choice(["nearby", "search", "byid", "batch"])
+        if kind == "nearby":
+            params = {"latitude": lat, "longitude": lon, "type": type_id, "radius_m": 2000}
+            requests.append(("GET", "/api/places/nearby", params, None))
+        elif kind == "search":
+            params = {"type": type_id, "latitude": lat, "longitude": lon, "limit": 20}
+            requests.append(("GET", "/api/places/search", params, None))
+        elif kind == "byid":
+            requests.append(("GET", "/api/places/byid", {"id": place_id}, None))
+        else:
+            ids = [rng.choice(places)[0] for _ in range(20)]
+            requests.append(("POST", "/api/places/batch", None, {"ids": ids, "view": "card"}))
+    return requests
+
+
+async def run_load(requests: list, concurrency: int, seconds: float) -> dict:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(offset: int):
+            i = offset
+            while time.perf_counter() < deadline:
+                method, url, params, body = requests[i % len(requests)]
+                start = time.perf_counter()
+                response = await client.request(method, url, params=params, json=body)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def use_engine(engine):
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    requests = sample_requests()
+    print(f"{concurrency} concurrent clients, {seconds:.0f}s per configuration")
+
+    configurations = [
+        ("default engine", create_engine(DATABASE_URL)),
+        ("tuned read-only engine", tuned_engine),
+    ]
+    for name, engine in configurations:
+        use_engine(engine)
+        asyncio.run(run_load(requests, concurrency, min(seconds, 2)))  # warm-up
+        result = asyncio.run(run_load(requests, concurrency, seconds))
+        print(
+            f"  {name:<24} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.2f} ms"
+            f"  p99 {result['p99_ms']:7.2f} ms  ({result['requests']} requests)"
+        )
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+CPU time and response size of OSRM route post-processing for a 15-stop day:
+the previous per-step decode/re-encode with the full overview and
+instructions, against leg splicing (with and without instructions) and
+server-side simplification at a tolerance or zoom level.
+
+The OSRM /trip response is synthetic (realistic point density: a vertex every
+~15 m along ~5-10 km legs, ~25 steps per leg), so no network is needed.
+
+Usage (from backend/):
+    python benchmarks/bench_route_geometry.py [repeats]
+"""
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("ROUTE_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "route_cache.db"))
+
+import polyline
+
+from app.services.geocode_service import _parse_leg, _route_result
+
+STOPS = 15
+
+
+def synthetic_trip(seed: int = 0):
+    rng = random.Random(seed)
+    stops = [
+        {"lat": 10.72 + rng.random() * 0.12, "lon": 106.62 + rng.random() * 0.12, "name": str(i)}
+        for i in range(STOPS)
+    ]
+    legs, overview = [], []
+    for a, b in zip(stops, stops[1:]):
+        # A wiggly street path from a to b with a vertex every ~15 m
+        length_m = math.dist((a["lat"], a["lon"]), (b["lat"], b["lon"])) * 111320 * 1.3
+        n = max(20, int(length_m / 15))
+        points = []
+        for i in range(n + 1):
+            t = i / n
+            wiggle = 0.0004 * math.sin(t * 40 + rng.random() * 0.3)
+            points.append(
+                (
+                    round(a["lat"] + (b["lat"] - a["lat"]) * t + wiggle, 5),
+                    round(a["lon"] + (b["lon"] - a["lon"]) * t - wiggle, 5),
+                )
+            )
+        bounds = sorted(rng.sample(range(1, n), 24))
+        cuts = [0] + bounds + [n]
+        steps = [
+            {
+                "geometry": polyline.encode(points[s : e + 1]),
+                "maneuver": {
+                    "type": "turn",
+                    "modifier": rng.choice(["left", "right", "straight"]),
+                    "location": [points[s][1], points[s][0]],
+                },
+                "name": f"Street {rng.randrange(500)}",
+                "distance": 100.0,
+                "duration": 10.0,
+            }
+            for s, e in zip(cuts, cuts[1:])
+        ]
+        steps.append(
+            {
+                "geometry": polyline.encode([points[-1], points[-1]]),
+                "maneuver": {"type": "arrive", "location": [points[-1][1], points[-1][0]]},
+                "name": "",
+            }
+        )
+        legs.append({"steps": steps, "distance": length_m, "duration": length_m / 7})
+        overview.extend(points if not overview else points[1:])
+    trip = {
+        "legs": legs,
+        "distance": sum(l["distance"] for l in legs),
+        "duration": sum(l["duration"] for l in legs),
+        "geometry": polyline.encode(overview),
+    }
+    return stops, trip
+
+
+def legacy(stops, trip):
+    # Post-processing before leg splicing: decode every step, re-encode per leg
+    segment_geometries = []
+    for leg in trip["legs"]:
+        all_coords = []
+        for step in leg.get("steps", []):
+            geom = step.get("geometry")
+            if geom:
+                all_coords.extend(polyline.decode(geom))
+        segment_geometries.append(polyline.encode(all_coords) if all_coords else None)
+    instructions = []
+    for leg in trip["legs"]:
+        instructions.append(
+            [
+                {
+                    "type": step["maneuver"].get("type", ""),
+                    "modifier": step["maneuver"].get("modifier", ""),
+                    "name": step.get("name", ""),
+                }
+                for step in leg.get("steps", [])
+            ]
+        )
+    return {
+        "success": True,
+        "optimized_route": stops,
+        "distance_km": trip["distance"] / 1000,
+        "duration_min": trip["duration"] / 60,
+        "geometry": trip["geometry"],
+        "segment_geometries": segment_geometries,
+        "instructions": instructions,
+    }
+
+
+def spliced(stops, trip, instructions=False, tolerance_m=None, zoom=None):
+    legs = [_parse_leg(leg) for leg in trip["legs"]]
+    return _route_result(stops, legs, (instructions, tolerance_m, zoom))
+
+
+def measure(name, fn, repeats):
+    start = time.process_time()
+    for _ in range(repeats):
+        result = fn()
+    cpu_ms = (time.process_time() - start) / repeats * 1000
+    size = len(json.dumps(result))
+    points = len(polyline.decode(result["geometry"]))
+    print(f"  {name:<34} {cpu_ms:8.2f} ms CPU  {size / 1024:8.1f} KiB  {points:6d} overview points")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    stops, trip = synthetic_trip()
+    print(f"{STOPS} stops, {sum(len(l['steps']) for l in trip['legs'])} steps")
+    measure("legacy decode/re-encode", lambda: legacy(stops, trip), repeats)
+    measure("spliced + instructions", lambda: spliced(stops, trip, True), repeats)
+    measure("spliced", lambda: spliced(stops, trip), repeats)
+    measure("spliced, tolerance 5 m", lambda: spliced(stops, trip, tolerance_m=5), repeats)
+    measure("spliced, zoom 15", lambda: spliced(stops, trip, zoom=15), repeats)
+    measure("spliced, zoom 12", lambda: spliced(stops, trip, zoom=12), repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: legacy per-cell place row decoding vs the compiled decoder.
+
+Usage (from backend/):
+    python benchmarks/bench_row_decoder.py [path/to/merged.db] [repeats]
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy.types import JSON, Float, Integer
+import orjson
+
+from app.place_models import Place
+from app.services.place_projection_service import (
+    PLACE_COLUMNS,
+    PLACE_VIEWS,
+    place_decoder,
+    select_columns,
+)
+
+
+def legacy_decode(rows):
+    # The loop previously copy-pasted into every place endpoint
+    columns = [col.name for col in Place.__table__.columns]
+    types = {col.name: col.type for col in Place.__table__.columns}
+    places_json = []
+    for row in rows:
+        place = {}
+        for idx, col in enumerate(columns):
+            value = row[idx]
+            col_type = types[col]
+            if isinstance(col_type, JSON):
+                try:
+                    value = json.loads(value) if value is not None else None
+                except Exception:
+                    pass
+            elif isinstance(col_type, Float):
+                value = float(value) if value is not None else None
+            elif isinstance(col_type, Integer):
+                value = int(value) if value is not None else None
+            place[col] = value
+        places_json.append(place)
+    return places_json
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "app/merged.db"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT {select_columns(PLACE_COLUMNS)} FROM places").fetchall()
+    summary_rows = conn.execute(
+        f"SELECT {select_columns(PLACE_VIEWS['summary'])} FROM places"
+    ).fetchall()
+    print(f"{len(rows)} rows from {db_path}, best of {repeats}")
+
+    decode = place_decoder()
+    decode_summary = place_decoder(PLACE_VIEWS["summary"])
+    cases = [
+        ("legacy loop, full", lambda: legacy_decode(rows)),
+        ("compiled, full", lambda: [decode(r) for r in rows]),
+        ("compiled, summary view", lambda: [decode_summary(r) for r in summary_rows]),
+    ]
+    baseline = None
+    for name, fn in cases:
+        elapsed, result = best_of(fn, repeats)
+        baseline = baseline or elapsed
+        print(
+            f"  decode  {name:<24} {elapsed * 1000:8.2f} ms"
+            f"  {len(rows) / elapsed:>10,.0f} rows/s  x{baseline / elapsed:.1f}"
+        )
+
+    places = [decode(r) for r in rows]
+    payload = {"status": "success", "count": len(places), "places": places}
+    for name, fn in [
+        ("json.dumps", lambda: json.dumps(payload).encode()),
+        ("orjson.dumps", lambda: orjson.dumps(payload)),
+    ]:
+        elapsed, body = best_of(fn, repeats)
+        print(f"  encode  {name:<24} {elapsed * 1000:8.2f} ms  {len(body):>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
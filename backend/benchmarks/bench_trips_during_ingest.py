@@ -0,0 +1,145 @@
+"""
+p50/p99 latency of GET /api/trips/ on its own and while /api/places/save
+ingests batches in parallel, with the async get_current_user and with the
+previous synchronous one (a blocking Session query inside an async def).
+
+The benchmark runs against copies: it copies app/merged.db into a temporary
+directory with a fresh user.db, so the real databases are not modified.
+
+Usage (from backend/):
+    python benchmarks/bench_trips_during_ingest.py [seconds] [clients] [batch]
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+# The app opens app/merged.db and app/user.db relative to the working directory
+_workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+os.makedirs(os.path.join(_workdir, "app"))
+shutil.copy(
+    os.path.join(BACKEND_DIR, "app", "merged.db"),
+    os.path.join(_workdir, "app", "merged.db"),
+)
+os.chdir(_workdir)
+
+import httpx
+import jwt
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.auth.auth_handler import ALGORITHM, SECRET_KEY, get_current_user, oauth2_scheme
+from app.main import app
+from app.user_database import get_db
+from app.user_models import User
+
+
+async def legacy_get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+):
+    # The pre-async dependency: a blocking query on the event loop
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    user = db.query(User).filter(User.username == payload.get("sub")).first()
+    if user is None:
+        raise HTTPException(status_code=401)
+    return user
+
+
+def make_places(batch: int, round_no: int) -> list:
+    return [
+        {
+            "place_id": f"bench-{round_no}-{i}",
+            "title": f"Bench place {round_no}-{i}",
+            "gps_coordinates": {
+                "latitude": 10.70 + (i % 100) * 0.001,
+                "longitude": 106.65 + (i // 100) * 0.001,
+            },
+            "type_ids": ["restaurant", "cafe"],
+            "rating": 4.0,
+            "reviews": i,
+            "POI_score": float(i % 50),
+        }
+        for i in range(batch)
+    ]
+
+
+async def run(client, headers, seconds: float, clients: int, batch: int, ingest: bool):
+    latencies = []
+    saved = 0
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get("/api/trips/", headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async def writer():
+        nonlocal saved
+        round_no = 0
+        while time.perf_counter() < deadline:
+            round_no += 1
+            response = await client.post(
+                "/api/places/save?on_conflict=update",
+                json={"places": make_places(batch, round_no)},
+            )
+            saved += response.json().get("count", 0)
+
+    tasks = [reader() for _ in range(clients)]
+    if ingest:
+        tasks.append(writer())
+    await asyncio.gather(*tasks)
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "saved": saved,
+    }
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        user = {"username": "bench", "email": "bench@example.com", "password": "bench"}
+        await client.post("/auth/register", json=user)
+        token = (
+            await client.post(
+                "/auth/token", data={"username": "bench", "password": "bench"}
+            )
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for i in range(5):
+            await client.post("/api/trips/", json={"name": f"Trip {i}"}, headers=headers)
+
+        print(f"GET /api/trips/ x{clients} clients, {seconds:.0f}s per case, save batches of {batch}")
+        cases = [
+            ("async auth, idle", False, False),
+            ("async auth, during save", False, True),
+            ("sync auth, during save", True, True),
+        ]
+        for name, legacy, ingest in cases:
+            if legacy:
+                app.dependency_overrides[get_current_user] = legacy_get_current_user
+            else:
+                app.dependency_overrides.clear()
+            result = await run(client, headers, seconds, clients, batch, ingest)
+            print(
+                f"  {name:<26} p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+                f"  ({result['requests']} requests, {result['saved']} places saved)"
+            )
+    app.dependency_overrides.clear()
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import sys
 import os
@@ -27,11 +28,12 @@ def save_json(data, filename):
 print("=" * 60)
 print("TEST 1: SEARCH PLACES")
 print("=" * 60)
-result = search_places(
+# The service functions are coroutines; run each one to completion
+result = asyncio.run(search_places(
     ll="10.7769,106.7009",  # Ho Chi Minh City
     query="hotel",
     limit=3
-)
+))
 
 if result.get("success"):
     print(f"Success! Found {len(result['data'].get('results', []))} places")
@@ -52,7 +54,7 @@ if result.get("success"):
         input("Press Enter to continue (or Ctrl+C to stop)...")
 
         # Test 2: Get place details
-        details = get_place_details(place_id)
+        details = asyncio.run(get_place_details(place_id))
         if details.get("success"):
             print("Success! Got place details")
             save_json(details, "test_2_details.json")
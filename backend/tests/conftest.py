@@ -0,0 +1,128 @@
+"""
+Shared fixtures. The app opens app/merged.db and app/user.db relative to the
+working directory, so the tests run in a temporary directory holding a small
+catalog built from the synthetic shard below; the real databases and caches
+are not touched.
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+HOURS = {day: "7 AM–6 PM" for day in ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")}
+
+# (place_id, title, lat, lon, type_ids, POI_score, en_names, vi_names, best_type_id_en, best_type_id_vi)
+SHARD_PLACES = [
+    ("p-ben-thanh", "Chợ Bến Thành", 10.7725, 106.6980, ["market", "tourist_attraction"], 50.0,
+     ["Ben Thanh Market"], ["Chợ Bến Thành"], "Market", "Chợ"),
+    ("p-street-food", "Bến Thành Street Food Market", 10.7735, 106.6970, ["food_court"], 30.0,
+     ["Ben Thanh Street Food Market"], None, "Food court", None),
+    ("p-opera", "Nhà hát Thành phố Hồ Chí Minh", 10.7767, 106.7031, ["tourist_attraction"], 40.0,
+     ["Saigon Opera House"], ["Nhà hát Lớn Sài Gòn"], None, None),
+    ("p-pho", "Phở Hòa Pasteur", 10.7880, 106.6890, ["restaurant"], 20.0, None, None, None, None),
+    ("p-post-office", "Bưu điện Trung tâm Sài Gòn", 10.7799, 106.6999, ["post_office", "tourist_attraction"], 45.0,
+     ["Saigon Central Post Office"], None, None, None),
+    ("p-dalat-market", "Chợ Đà Lạt", 11.9430, 108.4370, ["market"], 35.0,
+     ["Da Lat Market"], None, "Market", "Chợ"),
+    ("p-hue-citadel", "Đại Nội Huế", 16.4690, 107.5780, ["tourist_attraction"], 48.0,
+     ["Imperial City"], None, None, None),
+]
+CITIES = {"p-dalat-market": "Dalat, Vietnam", "p-hue-citadel": "Hue, Vietnam"}
+
+
+def _write_shard(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE places (
+            id INTEGER PRIMARY KEY, place_id TEXT, title TEXT, gps_coordinates TEXT,
+            rating REAL, reviews INTEGER, price TEXT, type TEXT, types TEXT, type_id TEXT,
+            type_ids TEXT, address TEXT, operating_hours TEXT, city_name TEXT,
+            POI_score REAL, en_names TEXT, vi_names TEXT, best_type_id_en TEXT,
+            best_type_id_vi TEXT
+        )
+        """
+    )
+    for place_id, title, lat, lon, type_ids, score, en, vi, type_en, type_vi in SHARD_PLACES:
+        conn.execute(
+            """
+            INSERT INTO places (place_id, title, gps_coordinates, rating, reviews, price,
+                type, types, type_id, type_ids, address, operating_hours, city_name,
+                POI_score, en_names, vi_names, best_type_id_en, best_type_id_vi)
+            VALUES (?, ?, ?, 4.5, 100, '₫20,000–200,000', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                place_id,
+                title,
+                json.dumps({"latitude": lat, "longitude": lon}),
+                type_ids[0].replace("_", " ").capitalize(),
+                json.dumps([t.replace("_", " ").capitalize() for t in type_ids]),
+                type_ids[0],
+                json.dumps(type_ids),
+                f"{title}, Vietnam",
+                json.dumps(HOURS),
+                CITIES.get(place_id, "HCMC, Vietnam"),
+                score,
+                json.dumps(en) if en else None,
+                json.dumps(vi) if vi else None,
+                type_en,
+                type_vi,
+            ),
+        )
+    conn.commit()
+    conn.close()
+
+
+def pytest_configure(config):
+    # Runs before any test module imports app.*
+    workdir = tempfile.mkdtemp(prefix="itp-tests-")
+    os.makedirs(os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    os.environ["ROUTE_CACHE_PATH"] = os.path.join(workdir, "route_cache.db")
+    os.environ["GEOCODE_CACHE_PATH"] = os.path.join(workdir, "geocode_cache.db")
+    shard = os.path.join(workdir, "shard1.db")
+    _write_shard(shard)
+
+    from app.build_catalog import build_catalog
+
+    build_catalog([shard], os.path.join(workdir, "app", "merged.db"))
+
+
+@pytest.fixture
+def shard_path():
+    return os.path.abspath("shard1.db")
+
+
+@pytest.fixture
+def catalog_path():
+    return os.path.abspath(os.path.join("app", "merged.db"))
+
+
+@pytest.fixture
+def write_db():
+    """A catalog write session; everything it did is rolled back afterwards."""
+    from app.place_database import WriteSessionLocal
+
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def read_db():
+    from app.place_database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
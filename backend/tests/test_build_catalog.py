@@ -0,0 +1,48 @@
+import sqlite3
+import sys
+
+from fastapi.testclient import TestClient
+
+from app import build_catalog
+
+
+def test_unique_top_types_served_from_built_catalog():
+    from app.main import app
+
+    response = TestClient(app).get("/api/places/unique-top-types")
+    assert response.status_code == 200
+    items = {item["id"]: item for item in response.json()}
+    assert set(items) == {"market", "tourist_attraction", "food_court", "restaurant", "post_office"}
+    # Labels come from best_type_id_en/_vi where a place has them...
+    assert items["market"] == {"id": "market", "labelEN": "Market", "labelVI": "Chợ"}
+    assert items["food_court"]["labelVI"] == "Food court"
+    # ...and from the type id otherwise
+    assert items["post_office"] == {
+        "id": "post_office", "labelEN": "post office", "labelVI": "post office"
+    }
+
+
+def test_type_stats_schema(catalog_path):
+    conn = sqlite3.connect(catalog_path)
+    try:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(type_stats)")]
+        counts = dict(
+            conn.execute(
+                "SELECT type_id, place_count FROM type_stats WHERE city_name = 'HCMC, Vietnam'"
+            ).fetchall()
+        )
+    finally:
+        conn.close()
+    assert {"city_name", "type_id", "type_id_en", "type_id_vi", "place_count", "type_score"} <= set(columns)
+    assert counts["tourist_attraction"] == 3
+
+
+def test_main_creates_output_directory(shard_path, tmp_path, monkeypatch):
+    output = tmp_path / "nested" / "dir" / "merged.db"
+    monkeypatch.setattr(sys, "argv", ["build_catalog", "--output", str(output), shard_path])
+    build_catalog.main()
+    conn = sqlite3.connect(output)
+    try:
+        assert conn.execute("SELECT count(*) FROM places").fetchone()[0] == 7
+    finally:
+        conn.close()
@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+
+from app.services import catalog_loader
+from app.services.catalog_loader import CatalogLoader
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+
+def test_changed_catalog_is_rebuilt_in_the_background(catalog_path):
+    release = threading.Event()
+    builds = []
+
+    def build(version):
+        if builds:
+            release.wait(5)
+        builds.append(version)
+        return len(version.place_rows())
+
+    loader = CatalogLoader("test index", build)
+    assert loader.get() == 7
+    first = builds[0]
+
+    _touch(catalog_path)
+    start = time.perf_counter()
+    # The rebuild is blocked on `release`, yet get() answers at once from the old build
+    assert loader.get() == 7
+    assert time.perf_counter() - start < 0.5
+    assert loader._version is first
+
+    release.set()
+    for _ in range(100):
+        if loader.rebuilds:
+            break
+        time.sleep(0.02)
+    assert loader.rebuilds == 1
+    assert loader._version is catalog_loader.current_version() is not first
+    assert loader.get() == 7
+
+
+def test_indexes_of_one_version_share_one_scan(catalog_path):
+    _touch(catalog_path)
+    version = catalog_loader.current_version()
+    assert version.place_rows() is version.place_rows()
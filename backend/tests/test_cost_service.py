@@ -0,0 +1,119 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app.services import cost_service
+from app.services.cost_service import (
+    cost_columns,
+    ensure_cost_columns,
+    parse_cost_amount,
+    trip_cost_summary,
+)
+from app.user_models import Cost, Day, Destination, Trip, User, UserBase
+
+
+# (amount, parseAmount() min, max) from frontend/src/utils/parseAmount.ts
+PARSE_AMOUNT_CASES = [
+    ("100,000", 100000, 100000),
+    ("1—100,000", 1, 100000),
+    ("₫20,000–200,000", 20000, 200000),
+    ("0.000037931545-3.7931545", 0.000037931545, 3.7931545),
+    ("$12.50", 12.5, 12.5),
+    ("12.5.3", 12.5, 12.5),
+    (".5", 0.5, 0.5),
+    ("5.", 5, 5),
+    ("-5", 5, 5),
+    ("5-", 5, 5),
+    ("1-2-3", 1, 2),
+    ("--", 0, 0),
+    ("abc", 0, 0),
+    ("  ", 0, 0),
+    ("", 0, 0),
+    (None, 0, 0),
+    (7, 7, 7),
+    (2.5, 2.5, 2.5),
+]
+
+
+@pytest.mark.parametrize("amount, low, high", PARSE_AMOUNT_CASES)
+def test_parse_cost_amount_matches_frontend(amount, low, high):
+    assert parse_cost_amount(amount) == (pytest.approx(low), pytest.approx(high))
+
+
+def test_ensure_cost_columns_backfills_old_databases(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'user.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE costs (id INTEGER PRIMARY KEY, "originalAmount" TEXT)'))
+        conn.execute(text("""INSERT INTO costs VALUES (1, '10-20'), (2, 'free'), (3, NULL)"""))
+        ensure_cost_columns(conn)
+        rows = conn.execute(text("SELECT id, amount_min, amount_max FROM costs ORDER BY id")).fetchall()
+    assert [tuple(row) for row in rows] == [(1, 10, 20), (2, 0, 0), (3, 0, 0)]
+
+
+def _add_trip(db):
+    trip = Trip(name="Saigon", user=User(username="traveller", email="t@example.com"))
+    costs = [
+        # (day, destination, originalAmount, originalCurrency)
+        (1, "Chợ Bến Thành", "100,000–200,000", "VND"),
+        (1, "Chợ Bến Thành", "$5", "USD"),
+        (1, "Nhà hát", "50,000", ""),
+        (2, "Bưu điện", "2-4", "usd"),
+        (2, "Bưu điện", "1,000", "XYZ"),
+    ]
+    days, destinations = {}, {}
+    for day_number, name, amount, currency in costs:
+        if day_number not in days:
+            days[day_number] = Day(trip=trip, day_number=day_number)
+        if name not in destinations:
+            destinations[name] = Destination(
+                day=days[day_number], name=name, order=len(destinations)
+            )
+        destinations[name].costs.append(
+            Cost(originalAmount=amount, originalCurrency=currency, **cost_columns(amount))
+        )
+    db.add(trip)
+    db.commit()
+    return trip.id
+
+
+def test_trip_cost_summary_rolls_up_days_destinations_and_currencies(tmp_path, monkeypatch):
+    path = tmp_path / "user.db"
+    engine = create_engine(f"sqlite:///{path}")
+    UserBase.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        trip_id = _add_trip(db)
+    monkeypatch.setattr(cost_service.rate_table, "rates", {"usd": Decimal(1), "vnd": Decimal(25000)})
+    monkeypatch.setattr(cost_service.rate_table, "date", "2026-10-01")
+
+    async def summarize():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with async_engine.connect() as conn:
+                return await trip_cost_summary(conn, trip_id, "VND", "usd")
+        finally:
+            await async_engine.dispose()
+
+    summary = asyncio.run(summarize())
+    approx = pytest.approx
+    assert summary["currency"] == "USD" and summary["rates_date"] == "2026-10-01"
+    # 4-8 USD for the market, 2 USD for the opera (blank currency: the
+    # default VND), 2-4 USD for the post office; XYZ has no rate
+    assert summary["total"] == {"min": approx(13), "max": approx(19)}
+    assert summary["unsupported_currencies"] == ["XYZ"]
+    day1, day2 = summary["days"]
+    assert (day1["day_number"], day1["min"], day1["max"]) == (1, approx(11), approx(15))
+    assert [(d["name"], d["count"], d["min"], d["max"]) for d in day1["destinations"]] == [
+        ("Chợ Bến Thành", 2, approx(9), approx(13)),
+        ("Nhà hát", 1, approx(2), approx(2)),
+    ]
+    assert [(d["name"], d["count"]) for d in day2["destinations"]] == [("Bưu điện", 1)]
+    by_currency = {c["currency"]: c for c in summary["by_currency"]}
+    assert set(by_currency) == {"VND", "USD"}
+    assert by_currency["VND"]["count"] == 2
+    assert by_currency["VND"]["original_min"] == approx(150000)
+    assert by_currency["USD"]["count"] == 2
+    assert (by_currency["USD"]["min"], by_currency["USD"]["max"]) == (approx(7), approx(9))
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.services.gazetteer_service import MIN_COVERAGE, get_gazetteer
+from app.services.geocode_service import geocode_location
+from app.services.place_search_service import normalized_words
+from app.services.spatial_index_service import get_locator
+
+
+def test_normalized_words():
+    assert normalized_words("Chợ Đà Lạt, Lâm Đồng") == ["cho", "da", "lat", "lam", "dong"]
+
+
+def test_lookup_scores_by_coverage():
+    gazetteer = get_gazetteer()
+    full = gazetteer.lookup("Cho Ben Thanh")
+    assert full["place_id"] == "p-ben-thanh" and full["coverage"] == 1.0
+    partial = gazetteer.lookup("opera")
+    assert partial["place_id"] == "p-opera" and partial["coverage"] < MIN_COVERAGE
+    # A trailing city restricts the match; a lone city is its centre
+    assert gazetteer.lookup("market, Da Lat")["place_id"] == "p-dalat-market"
+    center = gazetteer.lookup("Saigon, Vietnam")
+    assert center["place_id"] is None and center["city_name"] == "HCMC, Vietnam"
+    assert gazetteer.lookup("nowhere at all") is None
+
+
+def test_local_answers_name_their_source_and_coverage():
+    result = asyncio.run(geocode_location("Đại Nội Huế", source="local"))
+    assert result["source"] == "local" and result["coverage"] == 1.0
+    assert "score" not in result
+    reverse = get_locator().reverse([(10.7726, 106.6981)])[0]
+    assert reverse["source"] == "local" and reverse["city_name"] == "HCMC, Vietnam"
@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+
+from app.services import geocode_cache_service, geocode_service, http_client
+from app.services.geocode_cache_service import GeocodeCache, normalize_query
+
+RESULT = {"lat": 10.77, "lon": 106.7, "display_name": "Somewhere", "score": 0.5}
+
+
+def test_normalize_query():
+    assert normalize_query("  Chợ   Bến Thành, ") == normalize_query("chợ bến thành")
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = GeocodeCache(str(tmp_path / "cache.db"))
+    now = [1_000_000.0]
+    monkeypatch.setattr(geocode_cache_service.time, "time", lambda: now[0])
+    cache.put("found", RESULT)
+    cache.put("missing", None)
+    assert cache.get("found") == (True, RESULT)
+    assert cache.get("missing") == (True, None)
+
+    # Misses are retried after NOT_FOUND_TTL_SECONDS, answers after TTL_SECONDS
+    now[0] += geocode_cache_service.NOT_FOUND_TTL_SECONDS + 1
+    assert cache.get("missing") == (False, None)
+    assert cache.get("found") == (True, RESULT)
+    now[0] += geocode_cache_service.TTL_SECONDS
+    assert cache.get("found") == (False, None)
+
+    stats = cache.stats()
+    assert stats["expired"] == 2 and stats["entries"] == 0
+    assert stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_eviction_keeps_recently_used_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocode_cache_service, "MAX_ENTRIES", 10)
+    cache = GeocodeCache(str(tmp_path / "cache.db"))
+    now = [1_000_000.0]
+    monkeypatch.setattr(geocode_cache_service.time, "time", lambda: now[0])
+    for i in range(10):
+        now[0] += 1
+        cache.put(f"q{i}", RESULT)
+    now[0] += 1
+    cache.put("q9", RESULT)  # replacing a row does not grow the count
+    cache.get("q0")
+    assert cache.stats()["entries"] == 10 and cache.evictions == 0
+
+    now[0] += 1
+    cache.put("q10", RESULT)
+
+    assert cache.stats()["entries"] == 10
+    assert cache.get("q0")[0] and not cache.get("q1")[0]
+    # The tracked count matches the table after reopening
+    assert GeocodeCache(cache.path).stats()["entries"] == 10
+
+
+def test_concurrent_lookups_share_one_upstream_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocode_service, "geocode_cache", GeocodeCache(str(tmp_path / "cache.db")))
+    calls = []
+
+    async def fake_get(service, url, params=None, headers=None):
+        calls.append(params["q"])
+        await asyncio.sleep(0.05)
+        return httpx.Response(
+            200,
+            json=[{"lat": "10.77", "lon": "106.7", "display_name": "Somewhere", "importance": 0.5}],
+            request=httpx.Request("GET", url),
+        )
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+
+    async def lookups():
+        first = await asyncio.gather(
+            *(geocode_service._nominatim_lookup(q) for q in ["Somewhere"] * 4 + ["  somewhere "])
+        )
+        again = await geocode_service._nominatim_lookup("SOMEWHERE")
+        return first, again
+
+    first, again = asyncio.run(lookups())
+    assert calls == ["Somewhere"]
+    assert all(result == {**RESULT, "source": "nominatim"} for result in first + [again])
+    stats = geocode_service.geocode_cache.stats()
+    assert stats["coalesced"] == 4 and stats["hits"] == 1 and stats["in_flight"] == 0
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.services import http_client
+from app.services.http_client import SERVICES
+
+# OSRM settings: Nominatim's 1 request/s rate limit would make the tests slow
+SERVICE = "osrm"
+LATENCY_S = 0.02
+PLACE = [{"lat": "10.7769", "lon": "106.7009", "display_name": "Ho Chi Minh City"}]
+
+
+class FakeUpstream:
+    """
+    HTTP/1.1 keep-alive server on 127.0.0.1 in its own thread and loop,
+    counting TCP connections. Each request sleeps LATENCY_S to stand in for
+    a remote API; with flaky=True the first attempt of every URL gets a 503.
+    """
+
+    def __init__(self, flaky=False):
+        self.flaky = flaky
+        self.connections = 0
+        self.open = 0
+        self.peak_open = 0
+        self.requests = 0
+        self.seen = set()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle, "127.0.0.1", 0)
+        )
+        self.url = "http://127.0.0.1:%d" % self.server.sockets[0].getsockname()[1]
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def reset(self):
+        self.connections = self.peak_open = self.requests = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.open += 1
+        self.peak_open = max(self.peak_open, self.open)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                target = head.split(b" ", 2)[1]
+                first_attempt = target not in self.seen
+                self.seen.add(target)
+                await asyncio.sleep(LATENCY_S)
+                if self.flaky and first_attempt:
+                    status, body = "503 Service Unavailable", b"{}"
+                else:
+                    status, body = "200 OK", json.dumps(PLACE).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if b"connection: close" in head.lower():
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+
+    async def _close(self):
+        self.server.close()
+        # Clients have closed their ends; let the handlers see it
+        for _ in range(100):
+            if not self.open:
+                break
+            await asyncio.sleep(0.01)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+async def get_many(url, calls):
+    """`calls` concurrent http_client.get() calls; (status code, JSON body) of each."""
+
+    async def call(i):
+        response = await http_client.get(SERVICE, f"{url}/search", params={"q": f"place {i}"})
+        return response.status_code, response.json()
+
+    try:
+        return await asyncio.gather(*(call(i) for i in range(calls)))
+    finally:
+        await http_client.aclose()
+
+
+@pytest.fixture
+def upstream():
+    server = FakeUpstream()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def flaky_upstream():
+    server = FakeUpstream(flaky=True)
+    yield server
+    server.stop()
+
+
+def test_concurrent_calls_reuse_host_limit_connections(upstream):
+    calls = 200
+    results = asyncio.run(get_many(upstream.url, calls))
+    assert results == [(200, PLACE)] * calls
+    assert upstream.requests == calls
+    assert upstream.connections <= SERVICES[SERVICE]["host_limit"]
+    assert upstream.peak_open <= SERVICES[SERVICE]["host_limit"]
+
+
+def test_503_is_retried(flaky_upstream, monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF_BASE_S", 0.01)
+    calls = 40
+    results = asyncio.run(get_many(flaky_upstream.url, calls))
+    assert results == [(200, PLACE)] * calls
+    # One 503 and one successful retry per call
+    assert flaky_upstream.requests == 2 * calls
+    assert flaky_upstream.connections <= SERVICES[SERVICE]["host_limit"]
+
+
+def test_last_response_is_returned_when_retries_run_out(flaky_upstream, monkeypatch):
+    monkeypatch.setitem(SERVICES, "no-retry", {**SERVICES[SERVICE], "retries": 0})
+
+    async def once():
+        try:
+            return await http_client.get("no-retry", f"{flaky_upstream.url}/search")
+        finally:
+            await http_client.aclose()
+
+    assert asyncio.run(once()).status_code == 503
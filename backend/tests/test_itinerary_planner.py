@@ -0,0 +1,49 @@
+from app.services.groq_service import (
+    CategoryItem,
+    GeminiResult,
+    TripInfo,
+    plan_itinerary_days,
+    trip_day_count,
+)
+from app.services.itinerary_planner_service import candidate_places, plan_days
+
+
+def _itinerary(start_day, end_day, categories, city="HCMC, Vietnam"):
+    return GeminiResult(
+        trip_info=TripInfo(start_day=start_day, end_day=end_day),
+        starting_point=city,
+        categories=[CategoryItem(name=name, additional=extra) for name, extra in categories],
+    )
+
+
+def test_trip_day_count():
+    assert trip_day_count(TripInfo(start_day="2026-10-01", end_day="2026-10-03")) == 3
+    assert trip_day_count(TripInfo(start_day="", end_day="2026-10-03")) == 1
+    assert trip_day_count(TripInfo(start_day="2026-10-03", end_day="2026-10-01")) == 1
+
+
+def test_candidates_take_turns_between_types(read_db):
+    places = candidate_places(read_db, "HCMC, Vietnam", ["tourist_attraction", "market"], 3)
+    # Best attraction, then the market (also an attraction, so not repeated),
+    # then the next attraction
+    assert [p["place_id"] for p in places] == ["p-ben-thanh", "p-post-office", "p-opera"]
+    assert all(p["lat"] is not None and p["lon"] is not None for p in places)
+
+
+def test_create_itinerary_plan_is_split_into_days(read_db):
+    itinerary = _itinerary(
+        "2026-10-01", "2026-10-02", [("tourist_attraction", False), ("restaurant", True)]
+    )
+    days = plan_itinerary_days(itinerary, read_db)
+    assert [day["day"] for day in days] == [1, 2]
+    place_ids = [p["place_id"] for day in days for p in day["places"]]
+    # Three HCMC attractions, topped up with the restaurant; no other city
+    assert sorted(place_ids) == ["p-ben-thanh", "p-opera", "p-pho", "p-post-office"]
+    assert [len(day["places"]) for day in days] == [2, 2]
+
+
+def test_plan_days_keeps_empty_days():
+    points = [{"lat": 10.77, "lon": 106.70}, {"lat": 10.78, "lon": 106.69}]
+    days = plan_days(points, 3)
+    assert [len(day["places"]) for day in days] == [1, 1, 0]
+    assert days[2] == {"day": 3, "places": [], "distance_km": 0.0}
@@ -0,0 +1,61 @@
+from app.services.place_search_service import build_match_query, normalize_text, search_places_text
+from app.services.place_service import upsert_places
+
+
+def _ids(results):
+    return [place["place_id"] for place in results]
+
+
+def test_normalize_text_folds_diacritics():
+    assert normalize_text("Chợ Đà Lạt") == "cho da lat"
+    assert normalize_text('["Nhà hát Lớn", "Sài Gòn"]') == "nha hat lon sai gon"
+    assert build_match_query("Phở  H") == '"pho"* "h"'
+    assert build_match_query(" ,. ") is None
+
+
+def test_query_without_accents_matches_vietnamese_titles(read_db):
+    assert _ids(search_places_text(read_db, "cho ben thanh"))[0] == "p-ben-thanh"
+    assert _ids(search_places_text(read_db, "CHỢ BẾN THÀNH"))[0] == "p-ben-thanh"
+    assert _ids(search_places_text(read_db, "pho hoa")) == ["p-pho"]
+    assert _ids(search_places_text(read_db, "dai noi hue")) == ["p-hue-citadel"]
+
+
+def test_names_and_prefixes_match(read_db):
+    # English name only, typed as a prefix
+    assert _ids(search_places_text(read_db, "saigon oper")) == ["p-opera"]
+    assert _ids(search_places_text(read_db, "central post")) == ["p-post-office"]
+
+
+def test_poi_score_orders_equal_matches(read_db):
+    # Every address ends in "Vietnam": the matches only differ in length,
+    # which bm25 alone would rank shortest (Phở Hòa, POI_score 20) first
+    ranked = _ids(search_places_text(read_db, "vietnam"))
+    assert len(ranked) == 7
+    assert ranked[0] == "p-ben-thanh" and ranked.index("p-pho") > ranked.index("p-dalat-market")
+    assert ranked == [
+        "p-ben-thanh", "p-hue-citadel", "p-post-office", "p-opera",
+        "p-dalat-market", "p-street-food", "p-pho",
+    ]
+    assert _ids(search_places_text(read_db, "ben thanh")) == ["p-ben-thanh", "p-street-food"]
+    # Title ("Street Food Market") and English name ("Ben Thanh Market")
+    # matches are near-equal too
+    assert _ids(search_places_text(read_db, "market", city="HCMC, Vietnam")) == [
+        "p-ben-thanh", "p-street-food"
+    ]
+
+
+def test_title_match_beats_popular_address_match(write_db):
+    upsert_places(
+        write_db,
+        [{"place_id": "p-stall", "title": "Quán Ốc Oanh", "POI_score": 1000.0,
+          "address": "Lê Lai, gần Chợ Bến Thành, Quận 1"}],
+    )
+    assert _ids(search_places_text(write_db, "ben thanh")) == [
+        "p-ben-thanh", "p-street-food", "p-stall"
+    ]
+
+
+def test_city_filter_and_projection(read_db):
+    assert _ids(search_places_text(read_db, "market", city="Dalat, Vietnam")) == ["p-dalat-market"]
+    results = search_places_text(read_db, "post office", fields=["place_id", "city_name"])
+    assert results == [{"place_id": "p-post-office", "city_name": "HCMC, Vietnam"}]
@@ -0,0 +1,80 @@
+from sqlalchemy import text
+
+from app.services.place_service import upsert_places
+
+
+def _row(db, place_id):
+    return db.execute(
+        text(
+            """
+            SELECT title, types, type_ids, gps_coordinates, rating, price_min
+            FROM places WHERE place_id = :pid
+            """
+        ),
+        {"pid": place_id},
+    ).one()
+
+
+def _in_rtree(db, place_id):
+    return db.execute(
+        text(
+            """
+            SELECT count(*) FROM places_rtree
+            WHERE id = (SELECT id FROM places WHERE place_id = :pid)
+            """
+        ),
+        {"pid": place_id},
+    ).scalar()
+
+
+def test_skip_keeps_existing_rows_and_inserts_new_ones(write_db):
+    before = _row(write_db, "p-pho")
+    result = upsert_places(
+        write_db,
+        [
+            {"place_id": "p-pho", "title": "Renamed"},
+            {"place_id": "p-new", "title": "New place",
+             "gps_coordinates": {"latitude": 10.78, "longitude": 106.70}},
+            {"place_id": "p-new", "title": "Duplicate in the same batch"},
+        ],
+    )
+    assert result == {"inserted": 1, "updated": 0, "skipped": 2}
+    assert _row(write_db, "p-pho") == before
+    assert _row(write_db, "p-new").title == "New place"
+    assert _in_rtree(write_db, "p-new") == 1
+
+
+def test_partial_update_keeps_unsent_columns(write_db):
+    before = _row(write_db, "p-pho")
+    result = upsert_places(
+        write_db, [{"place_id": "p-pho", "title": "Renamed"}], on_conflict="update"
+    )
+    assert result == {"inserted": 0, "updated": 1, "skipped": 0}
+
+    after = _row(write_db, "p-pho")
+    assert after.title == "Renamed"
+    # JSON columns the update did not carry are kept, not overwritten with 'null'
+    assert after.types == before.types is not None
+    assert after.type_ids == before.type_ids is not None
+    assert after.gps_coordinates == before.gps_coordinates is not None
+    assert after.rating == before.rating
+    assert after.price_min == before.price_min
+    assert _in_rtree(write_db, "p-pho") == 1
+
+
+def test_update_overwrites_sent_values(write_db):
+    upsert_places(
+        write_db,
+        [{"place_id": "p-pho", "types": ["Noodle shop"], "price": "₫50,000"}],
+        on_conflict="update",
+    )
+    after = _row(write_db, "p-pho")
+    assert after.types == '["Noodle shop"]'
+    assert after.price_min == 50000
+    assert after.title == "Phở Hòa Pasteur"
+
+
+def test_inserted_rows_store_missing_json_as_null(write_db):
+    upsert_places(write_db, [{"place_id": "p-bare", "title": "Bare"}])
+    row = _row(write_db, "p-bare")
+    assert row.types is None and row.gps_coordinates is None
@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+
+HCMC = {"latitude": 10.7769, "longitude": 106.7009}
+
+
+def _search(client, **params):
+    response = client.get("/api/places/search", params={**HCMC, **params})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "success"
+    return body
+
+
+def test_following_next_cursor_returns_the_whole_radius():
+    from app.main import app
+
+    client = TestClient(app)
+    everything = _search(client, type="tourist_attraction", limit=200)
+    assert everything["next_cursor"] is None
+    ids = [p["place_id"] for p in everything["places"]]
+    # Hue and Dalat are outside the default 50 km radius
+    assert ids == ["p-ben-thanh", "p-post-office", "p-opera"]
+
+    pages, cursor = [], None
+    while True:
+        page = _search(client, type="tourist_attraction", limit=1, **({"cursor": cursor} if cursor else {}))
+        pages.append([p["place_id"] for p in page["places"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [[pid] for pid in ids]
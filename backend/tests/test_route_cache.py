@@ -0,0 +1,36 @@
+from app.services import route_cache_service
+from app.services.route_cache_service import RouteCache
+
+LEG = {"distance": 100.0, "duration": 60.0, "geometry": None, "instructions": []}
+
+
+def test_counts_track_inserts_expiry_and_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(route_cache_service, "MAX_LEGS", 10)
+    cache = RouteCache(str(tmp_path / "routes.db"))
+    now = [1_000_000.0]
+    monkeypatch.setattr(route_cache_service.time, "time", lambda: now[0])
+    for i in range(10):
+        now[0] += 1
+        cache.put_legs({f"leg{i}": LEG})
+    now[0] += 1
+    cache.put_legs({"leg9": LEG, "leg0": LEG})  # replacing rows does not grow the count
+    cache.get_legs(["leg1"])
+    assert cache.stats()["legs"] == 10 and cache.evictions == 0
+
+    now[0] += 1
+    cache.put_legs({"leg10": LEG})
+    assert cache.stats()["legs"] == 10 and cache.evictions == 1
+    assert set(cache.get_legs(["leg1", "leg2"])) == {"leg1"}
+
+    cache.put_order("order", ["a", "b"])
+    cache.put_order("order", ["b", "a"])
+    assert cache.get_order("order") == ["b", "a"]
+    assert cache.stats()["orders"] == 1
+
+    now[0] += route_cache_service.TTL_SECONDS + 1
+    assert cache.get_legs(["leg1", "leg3"]) == {}
+    stats = cache.stats()
+    assert stats["legs"] == 8 and stats["expired"] == 2
+    # The tracked counts match the tables after reopening
+    reopened = RouteCache(cache.path).stats()
+    assert (reopened["legs"], reopened["orders"]) == (8, 1)
@@ -0,0 +1,72 @@
+import numpy as np
+
+from app.services import tour_optimizer_service
+from app.services.route_cache_service import RouteCache, leg_key
+from app.services.tour_optimizer_service import (
+    distance_matrix,
+    duration_matrix,
+    optimize_order,
+    solve_tour,
+    tour_cost,
+)
+
+
+def _random_points(rng, n):
+    return [
+        {"lat": 10.7 + rng.random() * 0.2, "lon": 106.6 + rng.random() * 0.2}
+        for _ in range(n)
+    ]
+
+
+def _nearest_neighbour(cost, roundtrip):
+    order = [0]
+    while len(order) < len(cost):
+        row = [np.inf if i in order else cost[order[-1], i] for i in range(len(cost))]
+        order.append(int(np.argmin(row)))
+    return tour_cost(cost, order, roundtrip)
+
+
+def test_tours_are_valid_and_no_worse_than_nearest_neighbour():
+    rng = np.random.default_rng(7)
+    for n in (3, 5, 12, 40, 120):
+        cost = distance_matrix(_random_points(rng, n))
+        for roundtrip in (False, True):
+            order = solve_tour(cost, 0, roundtrip)
+            assert order[0] == 0 and sorted(order) == list(range(n))
+            assert tour_cost(cost, order, roundtrip) <= _nearest_neighbour(cost, roundtrip) + 1e-6
+
+
+def test_stops_on_a_line_are_visited_in_order():
+    positions = [0, 7, 2, 9, 4, 1, 8, 3, 6, 5]
+    points = [{"lat": 10.0, "lon": 106.0 + p * 0.01} for p in positions]
+    order = optimize_order(points, cost=distance_matrix(points))
+    assert [positions[i] for i in order] == list(range(10))
+
+
+def test_small_inputs():
+    assert solve_tour(np.zeros((1, 1))) == [0]
+    assert solve_tour(np.zeros((2, 2)), start=1) == [1, 0]
+
+
+def test_duration_matrix_prefers_cached_osrm_durations(tmp_path, monkeypatch):
+    cache = RouteCache(str(tmp_path / "routes.db"))
+    monkeypatch.setattr(tour_optimizer_service, "route_cache", cache)
+    points = _random_points(np.random.default_rng(1), 3)
+    leg = {"distance": 1.0, "geometry": None, "instructions": []}
+    cache.put_legs(
+        {
+            leg_key("driving", points[0], points[1]): {**leg, "duration": 100.0},
+            leg_key("driving", points[1], points[0]): {**leg, "duration": 200.0},
+            leg_key("driving", points[1], points[2]): {**leg, "duration": 50.0},
+        }
+    )
+    durations = duration_matrix(points)
+    estimate = distance_matrix(points) * tour_optimizer_service.DETOUR_FACTOR / (
+        tour_optimizer_service.ESTIMATED_SPEED_MPS
+    )
+    # Both directions cached: their mean; one direction: used both ways
+    assert durations[0, 1] == durations[1, 0] == 150.0
+    assert durations[1, 2] == durations[2, 1] == 50.0
+    assert durations[0, 2] == estimate[0, 2]
+    # Bulk probes do not count as cache lookups
+    assert cache.hits == cache.misses == 0
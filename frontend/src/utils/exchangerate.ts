@@ -10,42 +10,64 @@ export async function convertCurrency(amount: number, source: string, target: st
     return data.amount;
 }
 
-export async function convertAllDays(days, currency) {
-    return Promise.all(days.map(async (day) => ({
-        ...day,
-        destinations: await Promise.all(day.destinations.map(async (dest) => ({
-            ...dest,
-            costs: await Promise.all(dest.costs.map(async (cost) => {
-                const sourceCurrency = cost.originalCurrency || currency;
-                if (sourceCurrency !== currency) {
-                    const parsed = parseAmount(cost.originalAmount || "0");
-                    // Convert both min and max if it's a range
-                    const convertedMin = await convertCurrency(
-                        parsed.min,
-                        sourceCurrency.toLowerCase(),
-                        currency.toLowerCase()
-                    );
-                    const convertedMax = await convertCurrency(
-                        parsed.max,
-                        sourceCurrency.toLowerCase(),
-                        currency.toLowerCase()
-                    );
-                    // If it's an approximate/range, return as "min-max"
-                    const convertedAmount = parsed.isApprox
-                        ? `${convertedMin}-${convertedMax}`
-                        : String(convertedMin);
-                    return { ...cost, amount: convertedAmount };
-                } else {
-                    return { ...cost, amount: String(cost.originalAmount) };
-                }
-            }))
-        })))
-    })));
+// Converts many amounts to one target currency with a single request
+export async function convertCurrencyBatch(items: { amount: number, source: string }[], target: string) {
+    if (items.length === 0) return [];
+    const res = await fetch(`${API_HOST}/api/exchangerate/batch`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ target, items }),
+    });
+    const data = await res.json();
+    if (data.error) throw new Error(data.error);
+    return data.amounts;
 }
 
+// Every cost of every trip is converted in one batch request
 export async function convertAllTrips(trips, currency) {
-    return Promise.all(trips.map(async trip => ({
+    const target = currency.toLowerCase();
+    const items = [];
+    const pending = [];
+    for (const trip of trips) {
+        for (const day of trip.days) {
+            for (const dest of day.destinations) {
+                for (const cost of dest.costs) {
+                    const sourceCurrency = cost.originalCurrency || currency;
+                    if (sourceCurrency !== currency) {
+                        const parsed = parseAmount(cost.originalAmount || "0");
+                        const source = sourceCurrency.toLowerCase();
+                        // Convert both min and max if it's a range
+                        pending.push({ cost, parsed, index: items.length });
+                        items.push({ amount: parsed.min, source }, { amount: parsed.max, source });
+                    }
+                }
+            }
+        }
+    }
+    const amounts = await convertCurrencyBatch(items, target);
+    const converted = new Map();
+    for (const { cost, parsed, index } of pending) {
+        const [convertedMin, convertedMax] = [amounts[index], amounts[index + 1]];
+        if (convertedMin === null || convertedMax === null) throw new Error("Unsupported currency pair");
+        // If it's an approximate/range, return as "min-max"
+        converted.set(cost, parsed.isApprox ? `${convertedMin}-${convertedMax}` : String(convertedMin));
+    }
+    return trips.map(trip => ({
         ...trip,
-        days: await convertAllDays(trip.days, currency)
-    })));
-}
\ No newline at end of file
+        days: trip.days.map(day => ({
+            ...day,
+            destinations: day.destinations.map(dest => ({
+                ...dest,
+                costs: dest.costs.map(cost => ({
+                    ...cost,
+                    amount: converted.has(cost) ? converted.get(cost) : String(cost.originalAmount),
+                })),
+            })),
+        })),
+    }));
+}
+
+export async function convertAllDays(days, currency) {
+    const [trip] = await convertAllTrips([{ days }], currency);
+    return trip.days;
+}
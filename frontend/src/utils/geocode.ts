@@ -17,7 +17,7 @@ export async function geocodeDestination(name: string): Promise<{ latitude: numb
 
 export async function getOptimizedRoute(destinations: { lat: number; lon: number; name: string; }[]): Promise<any> {
     try {
-        const response = await fetch(`${API_HOST}/api/route/optimize`, {
+        const response = await fetch(`${API_HOST}/api/route/optimize?instructions=true`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(destinations), // <-- send array directly
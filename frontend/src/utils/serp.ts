@@ -21,22 +21,34 @@ export async function fetchSerpLocalResults(query: string, ll: string) {
     return data.local_results;
 }
 
-export async function fetchFilteredPlaces(type: string, latitude: number, longitude: number) {
-    const response = await fetch(
-        `${API_HOST}/api/places/search?type=${encodeURIComponent(type)}&latitude=${latitude}&longitude=${longitude}`,
-        {
-            method: "GET",
-            headers: {
-                "Accept": "application/json"
+// The search endpoint returns pages of at most 200 places (best POI_score
+// first); follow next_cursor until `limit` places have been collected
+const SEARCH_PAGE_MAX = 200;
+
+export async function fetchFilteredPlaces(type: string, latitude: number, longitude: number, limit: number = 50) {
+    const places: any[] = [];
+    let cursor: string | null = null;
+    do {
+        const pageSize = Math.max(1, Math.min(limit - places.length, SEARCH_PAGE_MAX));
+        const response: Response = await fetch(
+            `${API_HOST}/api/places/search?type=${encodeURIComponent(type)}&latitude=${latitude}&longitude=${longitude}&limit=${pageSize}` +
+            (cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""),
+            {
+                method: "GET",
+                headers: {
+                    "Accept": "application/json"
+                }
             }
+        );
+        if (!response.ok) {
+            console.error("API error:", response.status, await response.text());
+            return places;
         }
-    );
-    if (!response.ok) {
-        console.error("API error:", response.status, await response.text());
-        return [];
-    }
-    const data = await response.json();
-    return data.places || [];
+        const data: { places?: any[]; next_cursor?: string | null } = await response.json();
+        places.push(...(data.places || []));
+        cursor = data.next_cursor || null;
+    } while (cursor && places.length < limit);
+    return places;
 }
 
 export async function generatePlaces(result, userLocation) {
@@ -65,7 +77,8 @@ export async function generatePlaces(result, userLocation) {
     for (let i = 0; i < nonAdditionalItems.length; i++) {
         const item = nonAdditionalItems[i];
         const count = i < remainder ? baseLimit + 1 : baseLimit;
-        const places = await fetchFilteredPlaces(item.name, latitude, longitude);
+        // Enough for `count` new places even if every one already picked comes back
+        const places = await fetchFilteredPlaces(item.name, latitude, longitude, count + seenPlaceIDs.size);
         if (!Array.isArray(places)) {
             console.error("places is not iterable", places);
             continue; // Skip this iteration if places is not an array
@@ -83,7 +96,7 @@ export async function generatePlaces(result, userLocation) {
     let additionalIndex = 0;
     while (allPlaces.length < totalPlaces && additionalIndex < additionalItems.length) {
         const item = additionalItems[additionalIndex];
-        const places = await fetchFilteredPlaces(item.name, latitude, longitude);
+        const places = await fetchFilteredPlaces(item.name, latitude, longitude, 1 + seenPlaceIDs.size);
         if (!Array.isArray(places)) {
             console.error("places is not iterable", places);
             additionalIndex++;
@@ -176,6 +189,20 @@ export async function getPlaceById(id: string) {
     return await res.json();
 }
 
+export async function getPlacesByIds(ids: string[]) {
+    if (ids.length === 0) return [];
+    const res = await fetch(`${API_HOST}/api/places/batch`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ ids })
+    });
+    if (!res.ok) return [];
+    const data = await res.json();
+    return data.places || [];
+}
+
 export async function fetchUniqueTopTypes() {
     const response = await fetch(`${API_HOST}/api/places/unique-top-types`, {
         method: "GET",